@@ -3,20 +3,36 @@ FastAPI Backend for Adaptive Persuasion System
 """
 
 import os
-from fastapi import FastAPI, HTTPException
+import asyncio
+import time
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Dict, Optional, List
-from huggingface_hub import InferenceClient, login
+from typing import Awaitable, Callable, Dict, Optional, List
+from huggingface_hub import login
 import uvicorn
 
 from src.dialogue_manager import DialogueManager
 from src.config import Config
+from src.trackers import round_score
+from src.priors import get_registry
+from src.aggregates import LiveAggregates
+from src.admission import AdmissionController, Overloaded
+from src.llm_client import shared_client
+from src.session_ids import is_session_id
+from src.session_locks import SessionLocks
+from src.journal import Journal, journal_path
+from src.response_pool import get_pool_registry
+from src.local_model import get_local_generator, inference_mode, local_model_stats
+from src import speculation
+from src.serialization import FastJSONResponse, dumps_str, loads
 
 
 # Initialize FastAPI app
-app = FastAPI(title="Adaptive Persuasion System API")
+app = FastAPI(title="Adaptive Persuasion System API", default_response_class=FastJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -27,10 +43,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large payloads (session history, batch results)
+app.add_middleware(GZipMiddleware, minimum_size=Config.GZIP_MIN_SIZE)
+
 # Global state
 sessions: Dict[str, DialogueManager] = {}
 hf_client = None
 use_local_model = False
+admission = AdmissionController()
+# Speculative calls bypass admission, so they may only use idle slots
+speculation.set_capacity(lambda: admission.idle_slots)
+aggregates = LiveAggregates()
+session_locks = SessionLocks()
+journal: Optional[Journal] = None
 
 
 # Initialize HuggingFace client
@@ -42,7 +67,7 @@ def init_hf_client():
     
     try:
         login(token=HF_TOKEN, add_to_git_credential=False)
-        hf_client = InferenceClient(api_key=HF_TOKEN)
+        hf_client = shared_client(HF_TOKEN)
         print("✓ HuggingFace client initialized successfully")
     except Exception as e:
         print(f"✗ Failed to initialize HF client: {e}")
@@ -53,6 +78,7 @@ def init_hf_client():
 class SessionCreate(BaseModel):
     condition: str  # 'C1' for regular chatbot, 'C3' for adaptive
     donation_context: Dict
+    session_id: Optional[str] = None  # assigned by the router in sharded mode
 
 
 class MessageRequest(BaseModel):
@@ -60,6 +86,10 @@ class MessageRequest(BaseModel):
     message: str
 
 
+class BatchTurnsRequest(BaseModel):
+    turns: List[MessageRequest]
+
+
 class ScenarioSetup(BaseModel):
     organization: str
     cause: str
@@ -67,8 +97,109 @@ class ScenarioSetup(BaseModel):
     impact: str
 
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Server busy ({exc.reason}). Please retry shortly."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+# Initialize local CPU model (USE_LOCAL_MODEL=1)
+def init_local_model():
+    global use_local_model
+    if os.getenv("USE_LOCAL_MODEL", "0") != "1":
+        return
+    if inference_mode() is None:
+        print("USE_LOCAL_MODEL=1 needs LOCAL_INFERENCE_MODE (float, int8 or onnx); using the HF API")
+        return
+    # Load up front so the first conversation doesn't pay for it
+    get_local_generator()
+    use_local_model = True
+
+
+# Rebuild in-flight sessions from the journal, then keep it compact
+def init_journal():
+    global journal
+    journal = Journal(journal_path())
+    recovered = journal.recover(
+        priors_for=get_registry().for_campaign, pool_for=pool_for,
+        client=hf_client, use_local_model=use_local_model, aggregates=aggregates
+    )
+    sessions.update(recovered)
+    if recovered:
+        print(f"✓ Recovered {len(recovered)} session(s) from {journal.path}")
+    asyncio.ensure_future(compact_journal_periodically())
+
+
+async def compact_journal_periodically():
+    while True:
+        await asyncio.sleep(Config.JOURNAL_COMPACT_INTERVAL)
+        try:
+            await retire_sessions()
+        except Exception as e:
+            print(f"Journal compaction error: {e}")
+
+
+async def retire_sessions():
+    """
+    Save finished sessions to the dialogue log and drop sessions idle for
+    SESSION_IDLE_TTL (unfinished ones count as abandoned), then compact the
+    journal. Each session is handled under its lock, like any request.
+    """
+    for session_id in list(sessions):
+        async with session_locks.hold(session_id):
+            dm = sessions.get(session_id)   # may have been reset or deleted meanwhile
+            if dm is None:
+                continue
+            idle = time.monotonic() - dm.last_active >= Config.SESSION_IDLE_TTL
+            if dm.active and not idle:
+                continue
+            await run_in_threadpool(dm.save)   # no-op if already saved
+            if idle:
+                if dm.active:
+                    aggregates.session_abandoned(dm.condition)
+                del sessions[session_id]
+    if journal is not None:
+        await run_in_threadpool(journal.compact)
+
+
+# Pre-generate early replies while the LLM has spare capacity
+def pool_for(donation_ctx: Dict):
+    return get_pool_registry().for_campaign(donation_ctx) if Config.RESPONSE_POOL else None
+
+
+async def fill_response_pools():
+    registry = get_pool_registry()
+    while True:
+        job = None
+        if (hf_client is not None or use_local_model) and admission.idle_slots > Config.POOL_RESERVED_SLOTS:
+            job = registry.next_fill()
+        if job is None:
+            await asyncio.sleep(Config.POOL_IDLE_INTERVAL)
+            continue
+
+        pool, key = job
+        try:
+            # Holds a slot like any generation, so live turns see the real load
+            async with admission.admit():
+                ok = await run_in_threadpool(pool.fill, key, hf_client, use_local_model)
+        except Overloaded:
+            ok = False
+        except Exception as e:
+            print(f"Response pool fill error: {e}")
+            ok = False
+        if not ok:
+            await asyncio.sleep(Config.POOL_IDLE_INTERVAL)
+
+
 @app.on_event("startup")
 async def startup_event():
+    try:
+        init_local_model()
+    except Exception as e:
+        print(f"✗ Failed to load local model, using the HF API: {e}")
     try:
         init_hf_client()
         print("✓ Backend initialized successfully")
@@ -76,6 +207,9 @@ async def startup_event():
         print(f"✗ Backend initialization failed: {e}")
         print("The server will start but may not function correctly without HuggingFace token.")
         print("Please set HF_TOKEN environment variable and restart the server.")
+    init_journal()
+    if Config.RESPONSE_POOL:
+        asyncio.ensure_future(fill_response_pools())
 
 
 @app.get("/")
@@ -84,13 +218,42 @@ async def root():
     return {
         "message": "Adaptive Persuasion System API",
         "status": "running",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "llm": hf_client.snapshot()['breaker'] if hf_client is not None else None
     }
 
 @app.get("/health")
 async def health():
     """Health check endpoint for connection testing"""
-    return {"status": "healthy", "backend": "running"}
+    return {
+        "status": "healthy",
+        "backend": "running",
+        "llm": hf_client.snapshot()['breaker'] if hf_client is not None else None
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Operational metrics (LLM admission queue)"""
+    return {
+        "sessions": len(sessions),
+        "admission": admission.snapshot(),
+        "llm_client": hf_client.snapshot() if hf_client is not None else None,
+        "speculation": speculation.stats.snapshot(),
+        "local_model": local_model_stats(),
+        "journal": journal.snapshot() if journal is not None else None,
+        "session_locks": session_locks.snapshot(),
+        "response_pool": get_pool_registry().snapshot() if Config.RESPONSE_POOL else None
+    }
+
+
+@app.get("/api/aggregates")
+async def get_aggregates(raw: bool = False):
+    """Live aggregates over all sessions, per condition (maintained incrementally)"""
+    if raw:
+        # Summable running totals, for the sharded router
+        return {name: c.tolist() for name, c in aggregates.counters().items()}
+    return aggregates.snapshot()
 
 
 @app.post("/api/session/create")
@@ -108,8 +271,16 @@ async def create_session(data: SessionCreate):
         
         if condition not in ['C1', 'C3']:
             raise HTTPException(status_code=400, detail="Condition must be 'C1' or 'C3'")
+        if data.session_id is not None and not is_session_id(data.session_id):
+            raise HTTPException(status_code=400, detail="Malformed session_id")
+        if data.session_id in sessions:
+            raise HTTPException(status_code=409, detail="Session already exists")
         
-        dm = DialogueManager(condition, donation_ctx, hf_client, use_local_model)
+        dm = DialogueManager(condition, donation_ctx, hf_client, use_local_model,
+                             priors=get_registry().for_campaign(donation_ctx), aggregates=aggregates,
+                             journal=journal, pool=pool_for(donation_ctx))
+        if data.session_id is not None:
+            dm.session_id = data.session_id
         opening = dm.start()
         
         sessions[dm.session_id] = dm
@@ -129,34 +300,224 @@ async def create_session(data: SessionCreate):
 async def process_message(data: MessageRequest):
     """Process a user message and return agent response with metrics"""
     try:
-        if data.session_id not in sessions:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        dm = sessions[data.session_id]
-        
-        if not dm.active:
-            return {
-                "agent_msg": dm._closing(dm.outcome or "Session ended"),
-                "metrics": {
-                    "turn": dm.turn,
-                    "belief": round(dm.belief.get(), 3),
-                    "trust": round(dm.trust.get(), 3),
-                    "stop": True,
-                    "reason": dm.outcome
-                },
-                "stop": True
-            }
-        
-        result = dm.process(data.message)
-        
-        # Include history for frontend
-        result["history"] = dm.history
+        # Turns of one session run one at a time, in arrival order
+        async with session_locks.hold(data.session_id):
+            if data.session_id not in sessions:
+                raise HTTPException(status_code=404, detail="Session not found")
+            
+            dm = sessions[data.session_id]
+            
+            if not dm.active:
+                return FastJSONResponse(dm.ended_result())
+            
+            # Generation dominates the turn, so the whole turn holds one slot
+            async with admission.admit():
+                result = await run_in_threadpool(dm.process, data.message)
+            
+            # Include history for frontend
+            result["history"] = dm.history_dicts()
         
-        return result
+        return FastJSONResponse(result)
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _send(websocket: WebSocket, payload: Dict):
+    await websocket.send_text(dumps_str(payload))
+
+
+async def _settle(turn: asyncio.Future):
+    """
+    Wait until a threadpool turn has finished, even if this task is
+    cancelled meanwhile: the session lock must outlive dm.process.
+    """
+    cancelled = False
+    while not turn.done():
+        try:
+            await asyncio.shield(turn)
+        except asyncio.CancelledError:
+            cancelled = True
+        except Exception:
+            pass   # the turn's own error; the caller already has one
+    if not turn.cancelled():
+        turn.exception()   # mark retrieved
+    if cancelled:
+        raise asyncio.CancelledError()
+
+
+async def _process_streaming(dm: DialogueManager, message: str,
+                             send: Callable[[Dict], Awaitable[None]]) -> Dict:
+    """Run a turn in the threadpool, forwarding generated text as it arrives."""
+    loop = asyncio.get_running_loop()
+    deltas: asyncio.Queue = asyncio.Queue()
+
+    def on_delta(text: str):
+        loop.call_soon_threadsafe(deltas.put_nowait, text)
+
+    turn = asyncio.ensure_future(run_in_threadpool(dm.process, message, on_delta))
+    try:
+        while not turn.done():
+            getter = asyncio.ensure_future(deltas.get())
+            done, _ = await asyncio.wait({turn, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                await send({"type": "delta", "text": getter.result()})
+            else:
+                getter.cancel()
+        while not deltas.empty():
+            await send({"type": "delta", "text": deltas.get_nowait()})
+    finally:
+        # A dropped socket must not release the session while dm.process runs
+        await _settle(turn)
+    return turn.result()
+
+
+@app.websocket("/ws/session/{session_id}")
+async def session_socket(websocket: WebSocket, session_id: str):
+    """
+    Persistent conversation channel for one session.
+
+    Client -> server:
+      {"type": "message", "message": "...", "stream": false}
+      {"type": "ping"}
+    Server -> client:
+      {"type": "delta", "text": "..."}        (only when stream is true)
+      {"type": "reply", "agent_msg": ..., "metrics": ..., "stop": ..., "reason": ...}
+      {"type": "error", "status": 404|429|500, "detail": ..., "retry_after": ...}
+      {"type": "pong"}
+
+    Frames are read by their own task, so pings are answered while a turn
+    runs; messages queue up and are processed one at a time.
+    """
+    await websocket.accept()
+    if session_id not in sessions:
+        await _send(websocket, {"type": "error", "status": 404, "detail": "Session not found"})
+        await websocket.close(code=4404)
+        return
+
+    send_lock = asyncio.Lock()
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=Config.WS_MAX_PENDING_TURNS)
+
+    async def send(payload: Dict):
+        # The reader and the turn loop both send; one frame at a time
+        async with send_lock:
+            await _send(websocket, payload)
+
+    async def read_frames():
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                return
+            try:
+                data = loads(frame.get("text") or frame.get("bytes") or b"")
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await send({"type": "error", "status": 400, "detail": "Frames must be JSON objects"})
+                continue
+            kind = data.get("type")
+
+            if kind == "ping":
+                await send({"type": "pong"})
+                continue
+            if kind != "message":
+                await send({"type": "error", "status": 400, "detail": f"Unknown type: {kind}"})
+                continue
+            message = data.get("message", "")
+            if not isinstance(message, str):
+                await send({"type": "error", "status": 400, "detail": "message must be a string"})
+                continue
+            # Full queue: stop reading (and answering pings) until a turn finishes
+            await inbox.put((message, bool(data.get("stream"))))
+
+    async def run_turn(message: str, stream: bool):
+        try:
+            async with session_locks.hold(session_id):
+                # Look up on every turn: a reset replaces the DialogueManager
+                dm = sessions.get(session_id)
+                if dm is None:
+                    await send({"type": "error", "status": 404, "detail": "Session not found"})
+                    return
+                if not dm.active:
+                    await send({"type": "reply", **dm.ended_result()})
+                    return
+
+                async with admission.admit():
+                    if stream:
+                        result = await _process_streaming(dm, message, send)
+                    else:
+                        result = await run_in_threadpool(dm.process, message)
+            await send({"type": "reply", **result})
+        except Overloaded as e:
+            await send({
+                "type": "error", "status": 429,
+                "detail": f"Server busy ({e.reason}). Please retry shortly.",
+                "retry_after": e.retry_after
+            })
+        except WebSocketDisconnect:
+            raise
+        except Exception as e:
+            await send({"type": "error", "status": 500, "detail": str(e)})
+
+    reader = asyncio.ensure_future(read_frames())
+    try:
+        while True:
+            getter = asyncio.ensure_future(inbox.get())
+            done, _ = await asyncio.wait({getter, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                break   # client went away (or the reader failed); queued turns are dropped
+            try:
+                await run_turn(*getter.result())
+            except Exception:
+                if reader.done():
+                    break   # the client left mid-turn; the reply has nowhere to go
+                raise
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+
+
+@app.post("/api/batch/turns")
+async def process_batch(data: BatchTurnsRequest):
+    """Process many (session_id, message) turns in one request (scripted evaluation)"""
+    if len(data.turns) > Config.BATCH_MAX_TURNS:
+        raise HTTPException(status_code=400, detail=f"At most {Config.BATCH_MAX_TURNS} turns per batch")
+
+    results: List[Optional[Dict]] = [None] * len(data.turns)
+    batch = []
+    index = []
+    try:
+        # Every session in the batch is held for the whole batch; process_batch
+        # already orders repeated turns of one session
+        async with session_locks.hold_many(t.session_id for t in data.turns):
+            for i, t in enumerate(data.turns):
+                dm = sessions.get(t.session_id)
+                if dm is None:
+                    results[i] = {"session_id": t.session_id, "error": "Session not found", "status": 404}
+                else:
+                    batch.append((dm, t.message))
+                    index.append(i)
+
+            # One admission slot per concurrent generation: the fan-out is
+            # capped at the slots actually granted
+            want = max(1, min(Config.BATCH_MAX_WORKERS, len(batch)))
+            async with admission.admit(want) as slots:
+                processed = await run_in_threadpool(DialogueManager.process_batch, batch, slots)
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    for i, result in zip(index, processed):
+        results[i] = {"session_id": data.turns[i].session_id, **result}
+
+    return FastJSONResponse({"results": results})
+
+
 @app.get("/api/session/{session_id}/metrics")
 async def get_metrics(session_id: str):
     """Get current metrics for a session"""
@@ -170,14 +531,14 @@ async def get_metrics(session_id: str):
         last_rej_info = None
         if dm.history and len(dm.history) > 0:
             last_entry = dm.history[-1]
-            if last_entry.get('speaker') == 'user' and 'info' in last_entry:
-                last_rej_info = last_entry['info']
+            if last_entry.speaker == 'user':
+                last_rej_info = last_entry.info
         
         # Create metrics in the same format as process() returns
         metrics = {
             "turn": dm.turn,
-            "belief": round(dm.belief.get(), 3),
-            "trust": round(dm.trust.get(), 3),
+            "belief": round_score(dm.belief.get()),
+            "trust": round_score(dm.trust.get()),
             "delta_belief": 0.0,  # No delta for standalone metrics call
             "delta_trust": 0.0,
             "rejection_type": last_rej_info.get('rejection_type', 'none') if last_rej_info else 'none',
@@ -187,9 +548,7 @@ async def get_metrics(session_id: str):
             "trust_concern": last_rej_info.get('trust_concern', False) if last_rej_info else False,
             "is_curiosity": last_rej_info.get('is_curiosity', False) if last_rej_info else False,
             "recovery_mode": dm.trust.recovery_mode,
-            "strategy_weights": {
-                k: round(v, 3) for k, v in dm.strategy.weights.items()
-            },
+            "strategy_weights": dm.strategy.rounded_weights(),
             "consec_reject": dm.guard.consec_reject,
             "belief_history": dm.belief.history,
             "trust_history": dm.trust.history,
@@ -197,7 +556,7 @@ async def get_metrics(session_id: str):
             "outcome": dm.outcome
         }
         
-        return metrics
+        return FastJSONResponse(metrics)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -206,28 +565,33 @@ async def get_metrics(session_id: str):
 async def reset_session(session_id: str):
     """Reset a session (create new one with same ID)"""
     try:
-        if session_id not in sessions:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        old_dm = sessions[session_id]
-        condition = old_dm.condition
-        donation_ctx = old_dm.ctx
-        
-        # Save old session before resetting
-        old_dm.save()
-        
-        # Create new session
-        dm = DialogueManager(condition, donation_ctx, hf_client, use_local_model)
-        dm.session_id = session_id  # Keep same ID
-        opening = dm.start()
-        
-        sessions[session_id] = dm
-        
-        return {
-            "session_id": session_id,
-            "opening_message": opening,
-            "message": "Session reset"
-        }
+        async with session_locks.hold(session_id):
+            if session_id not in sessions:
+                raise HTTPException(status_code=404, detail="Session not found")
+            
+            old_dm = sessions[session_id]
+            condition = old_dm.condition
+            donation_ctx = old_dm.ctx
+            
+            # Save old session before resetting
+            old_dm.save()
+            if old_dm.active:
+                aggregates.session_abandoned(condition)
+            
+            # Create new session
+            dm = DialogueManager(condition, donation_ctx, hf_client, use_local_model,
+                                 priors=get_registry().for_campaign(donation_ctx), aggregates=aggregates,
+                                 journal=journal, pool=pool_for(donation_ctx))
+            dm.session_id = session_id  # Keep same ID
+            opening = dm.start()
+            
+            sessions[session_id] = dm
+            
+            return {
+                "session_id": session_id,
+                "opening_message": opening,
+                "message": "Session reset"
+            }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -236,14 +600,17 @@ async def reset_session(session_id: str):
 async def delete_session(session_id: str):
     """Delete a session"""
     try:
-        if session_id not in sessions:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        dm = sessions[session_id]
-        dm.save()  # Save before deleting
-        del sessions[session_id]
-        
-        return {"message": "Session deleted and saved"}
+        async with session_locks.hold(session_id):
+            if session_id not in sessions:
+                raise HTTPException(status_code=404, detail="Session not found")
+            
+            dm = sessions[session_id]
+            dm.save()  # Save before deleting
+            if dm.active:
+                aggregates.session_abandoned(dm.condition)
+            del sessions[session_id]
+            
+            return {"message": "Session deleted and saved"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,243 @@
+"""
+Session-Sharding Router for Multi-Worker Deployments
+"""
+
+import os
+import asyncio
+from typing import Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
+import httpx
+import uvicorn
+import websockets
+
+from src.aggregates import merge_counters, render_counters
+from src.config import Config
+from src.serialization import FastJSONResponse, dumps, dumps_str, loads
+from src.session_ids import new_session_id, shard_for
+
+
+# Worker base URLs, in shard order (set by start_backend_sharded.py)
+WORKERS: List[str] = [
+    u.strip().rstrip('/') for u in os.getenv("SHARD_URLS", "").split(",") if u.strip()
+]
+
+app = FastAPI(title="Adaptive Persuasion System Router", default_response_class=FastJSONResponse)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(GZipMiddleware, minimum_size=Config.GZIP_MIN_SIZE)
+
+client: Optional[httpx.AsyncClient] = None
+
+# Headers worth passing back from a worker
+PASS_HEADERS = ("retry-after",)
+
+
+@app.on_event("startup")
+async def startup_event():
+    global client
+    if not WORKERS:
+        raise RuntimeError("SHARD_URLS is not set (comma-separated worker URLs)")
+    client = httpx.AsyncClient(timeout=Config.ROUTER_TIMEOUT,
+                               limits=httpx.Limits(max_connections=None, max_keepalive_connections=256))
+    print(f"✓ Router ready: {len(WORKERS)} worker(s)")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if client is not None:
+        await client.aclose()
+
+
+def worker_for(session_id: str) -> str:
+    return WORKERS[shard_for(session_id, len(WORKERS))]
+
+
+async def _forward(base: str, method: str, path: str, body: Optional[Dict] = None) -> Response:
+    try:
+        r = await client.request(method, base + path, content=dumps(body) if body is not None else None,
+                                 headers={"content-type": "application/json"})
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Worker unavailable: {type(e).__name__}")
+    headers = {k: r.headers[k] for k in PASS_HEADERS if k in r.headers}
+    return Response(r.content, status_code=r.status_code, headers=headers,
+                    media_type=r.headers.get("content-type", "application/json"))
+
+
+async def _gather_json(path: str) -> List[Dict]:
+    async def one(base: str):
+        try:
+            r = await client.get(base + path)
+            return {"worker": base, "status": r.status_code, "body": loads(r.content)}
+        except (httpx.HTTPError, ValueError) as e:
+            return {"worker": base, "status": None, "error": type(e).__name__}
+    return list(await asyncio.gather(*(one(b) for b in WORKERS)))
+
+
+# ---- Health / fleet views ----
+@app.get("/")
+async def root():
+    return {"message": "Adaptive Persuasion System API (router)", "status": "running", "workers": len(WORKERS)}
+
+
+@app.get("/health")
+async def health():
+    workers = await _gather_json("/health")
+    healthy = sum(1 for w in workers if w["status"] == 200)
+    return {
+        "status": "healthy" if healthy == len(WORKERS) else "degraded",
+        "backend": "running",
+        "workers_healthy": healthy,
+        "workers": workers
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    return {"workers": await _gather_json("/metrics")}
+
+
+@app.get("/api/aggregates")
+async def aggregates():
+    """Fleet-wide aggregates: workers own disjoint sessions, so their counters add up"""
+    workers = await _gather_json("/api/aggregates?raw=true")
+    parts = [w["body"] for w in workers if w["status"] == 200]
+    return FastJSONResponse(render_counters(merge_counters(parts)),
+                            headers={"X-Workers-Reporting": f"{len(parts)}/{len(WORKERS)}"})
+
+
+# ---- Session routes ----
+@app.post("/api/session/create")
+async def create_session(request: Request):
+    body = loads(await request.body())
+    # The router names the session, so it knows the owning worker up front
+    body["session_id"] = new_session_id()
+    return await _forward(worker_for(body["session_id"]), "POST", "/api/session/create", body)
+
+
+@app.post("/api/session/message")
+async def process_message(request: Request):
+    body = loads(await request.body())
+    session_id = body.get("session_id")
+    if not isinstance(session_id, str):
+        raise HTTPException(status_code=422, detail="session_id is required")
+    return await _forward(worker_for(session_id), "POST", "/api/session/message", body)
+
+
+@app.get("/api/session/{session_id}/metrics")
+async def get_metrics(session_id: str):
+    return await _forward(worker_for(session_id), "GET", f"/api/session/{session_id}/metrics")
+
+
+@app.post("/api/session/{session_id}/reset")
+async def reset_session(session_id: str):
+    return await _forward(worker_for(session_id), "POST", f"/api/session/{session_id}/reset")
+
+
+@app.delete("/api/session/{session_id}")
+async def delete_session(session_id: str):
+    return await _forward(worker_for(session_id), "DELETE", f"/api/session/{session_id}")
+
+
+@app.post("/api/scenario/setup")
+async def setup_scenario(request: Request):
+    return await _forward(WORKERS[0], "POST", "/api/scenario/setup", loads(await request.body()))
+
+
+@app.post("/api/batch/turns")
+async def process_batch(request: Request):
+    """Split a batch by owning worker, forward the parts concurrently, merge in input order"""
+    turns = loads(await request.body()).get("turns", [])
+    if len(turns) > Config.BATCH_MAX_TURNS:
+        raise HTTPException(status_code=400, detail=f"At most {Config.BATCH_MAX_TURNS} turns per batch")
+
+    if not all(isinstance(t, dict) and isinstance(t.get("session_id"), str) for t in turns):
+        raise HTTPException(status_code=422, detail="Every turn needs a session_id")
+
+    parts: Dict[str, List[int]] = {}
+    for i, t in enumerate(turns):
+        parts.setdefault(worker_for(t["session_id"]), []).append(i)
+
+    results: List[Optional[Dict]] = [None] * len(turns)
+
+    async def run(base: str, idxs: List[int]):
+        try:
+            r = await client.post(base + "/api/batch/turns", content=dumps({"turns": [turns[i] for i in idxs]}),
+                                  headers={"content-type": "application/json"})
+        except httpx.HTTPError as e:
+            r = None
+            detail, status = f"Worker unavailable: {type(e).__name__}", 502
+        if r is not None and r.status_code == 200:
+            for i, res in zip(idxs, loads(r.content)["results"]):
+                results[i] = res
+            return
+        if r is not None:
+            status = r.status_code
+            detail = loads(r.content).get("detail", "Worker error") if r.content else "Worker error"
+        for i in idxs:
+            results[i] = {"session_id": turns[i]["session_id"], "error": detail, "status": status}
+
+    await asyncio.gather(*(run(base, idxs) for base, idxs in parts.items()))
+    return FastJSONResponse({"results": results})
+
+
+@app.websocket("/ws/session/{session_id}")
+async def session_socket(websocket: WebSocket, session_id: str):
+    """Relay frames both ways between the client and the owning worker"""
+    await websocket.accept()
+    url = worker_for(session_id).replace("http", "ws", 1) + f"/ws/session/{session_id}"
+    try:
+        upstream = await websockets.connect(url, max_size=None)
+    except (OSError, websockets.WebSocketException):
+        await websocket.send_text(dumps_str({"type": "error", "status": 502, "detail": "Worker unavailable"}))
+        await websocket.close(code=1011)
+        return
+
+    async def client_to_worker():
+        try:
+            while True:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    return
+                text = frame.get("text")
+                await upstream.send(text if text is not None else frame.get("bytes") or b"")
+        except (WebSocketDisconnect, websockets.ConnectionClosed):
+            pass
+
+    async def worker_to_client():
+        try:
+            async for frame in upstream:
+                if isinstance(frame, str):
+                    await websocket.send_text(frame)
+                else:
+                    await websocket.send_bytes(frame)
+        except (WebSocketDisconnect, websockets.ConnectionClosed):
+            pass
+
+    tasks = [asyncio.ensure_future(client_to_worker()), asyncio.ensure_future(worker_to_client())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await upstream.close()
+        # Pass the worker's close on (e.g. 4404 for an unknown session).
+        # 1005/1006 are never sent on the wire, so they map to plain codes
+        code = upstream.close_code
+        code = {None: 1000, 1005: 1000, 1006: 1011}.get(code, code)
+        try:
+            await websocket.close(code=code, reason=upstream.close_reason or "")
+        except RuntimeError:
+            pass   # already closed by the client
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,53 @@
+"""
+Benchmark the local CPU generator
+
+Loads Config.LOCAL_MODEL_NAME in the given inference mode and reports load
+time, resident memory and generation throughput on typical turns. Run once
+per mode (separate processes give clean memory numbers).
+
+Usage:
+  python benchmark_local_model.py --mode int8 [--model Qwen/Qwen2.5-0.5B-Instruct] [--turns 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config import Config
+from src.experiment import DEFAULT_CTX
+from src.llm_agent import LLMAgent
+from src.local_model import INFERENCE_MODES, LocalGenerator
+
+
+SAMPLE_TURNS = [
+    ("Empathy", "Tell me more about it.", False, "neutral"),
+    ("Impact", "How does the money get used?", False, "neutral"),
+    ("Transparency", "How do I know this isn't a scam?", True, "negative"),
+    ("SocialProof", "Hmm, okay.", False, "neutral"),
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark local model inference modes")
+    parser.add_argument("--mode", choices=INFERENCE_MODES, default=Config.LOCAL_INFERENCE_MODE or "int8")
+    parser.add_argument("--model", default=Config.LOCAL_MODEL_NAME)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    gen = LocalGenerator(args.model, args.mode)
+    print(f"Loaded {args.model} ({args.mode}) in {gen.load_sec:.1f}s")
+
+    agent = LLMAgent(DEFAULT_CTX)
+    for i in range(args.turns):
+        strategy, msg, recovery, sentiment = SAMPLE_TURNS[i % len(SAMPLE_TURNS)]
+        prompt = agent.build_prompt(strategy, msg, i + 1, recovery, sentiment)
+        reply = gen.generate(agent._messages(prompt))
+        agent.remember(msg, reply)
+        if i == 0:
+            print(f"Sample reply: {reply}")
+
+    print(json.dumps(gen.stats(), indent=2))
@@ -1,6 +1,13 @@
 // Frontend Application Logic
 
 const API_BASE = 'http://localhost:8000';
+const WS_BASE = API_BASE.replace(/^http/, 'ws');
+const STREAM_REPLIES = true;      // stream agent replies over the WebSocket
+const HEARTBEAT_MS = 25000;       // ping interval on the open socket
+const PONG_TIMEOUT_MS = 10000;
+const RECONNECT_BASE_MS = 1000;    // first retry delay, doubled per failed attempt
+const RECONNECT_MAX_MS = 30000;
+const RECONNECT_MAX_ATTEMPTS = 8;  // then stay on the POST fallback
 
 let currentSessionId = null;
 let currentMode = 'C3'; // 'C1' for regular, 'C3' for adaptive
@@ -231,8 +238,8 @@ async function createSession() {
         // Update metrics
         updateMetrics();
         
-        // Start periodic connection check
-        startConnectionMonitoring();
+        // Open the conversation channel (also replaces health polling)
+        connectSocket(currentSessionId);
     } catch (error) {
         console.error('Session creation error:', error);
         if (error.message.includes('fetch') || error.message.includes('Failed to fetch') || error.name === 'TypeError') {
@@ -245,23 +252,134 @@ async function createSession() {
     }
 }
 
-let connectionMonitorInterval = null;
+// ---- WebSocket conversation channel ----
+let socket = null;
+let socketSessionId = null;
+let pendingTurn = null;      // { resolve, reject, bubble }
+let heartbeatInterval = null;
+let pongTimer = null;
+let reconnectTimer = null;
+let reconnectAttempts = 0;
 
-function startConnectionMonitoring() {
-    // Clear any existing interval
-    if (connectionMonitorInterval) {
-        clearInterval(connectionMonitorInterval);
-    }
+function connectSocket(sessionId, isRetry = false) {
+    closeSocket();
+    socketSessionId = sessionId;
+    if (!isRetry) reconnectAttempts = 0;
     
-    // Check connection every 30 seconds
-    connectionMonitorInterval = setInterval(async () => {
-        const connected = await checkBackendConnection();
-        if (connected) {
-            updateConnectionStatus('connected');
-        } else {
-            updateConnectionStatus('disconnected');
+    const ws = new WebSocket(`${WS_BASE}/ws/session/${sessionId}`);
+    socket = ws;
+    
+    ws.onopen = () => {
+        reconnectAttempts = 0;
+        updateConnectionStatus('connected');
+        startHeartbeat();
+    };
+    
+    ws.onmessage = (event) => handleSocketMessage(JSON.parse(event.data));
+    
+    ws.onclose = (event) => {
+        if (ws !== socket) return;  // replaced by a newer socket
+        socket = null;
+        stopHeartbeat();
+        updateConnectionStatus('disconnected');
+        if (pendingTurn) {
+            pendingTurn.reject(new TypeError('Connection lost'));
+            pendingTurn = null;
         }
-    }, 30000);
+        // 4xxx: the server rejected this session (e.g. 4404 unknown); retrying won't help
+        if (event.code >= 4000 && event.code < 5000) return;
+        if (reconnectAttempts >= RECONNECT_MAX_ATTEMPTS) return;
+
+        // Try to reconnect to the same session, backing off with jitter
+        const delay = Math.min(RECONNECT_MAX_MS, RECONNECT_BASE_MS * 2 ** reconnectAttempts);
+        reconnectAttempts += 1;
+        reconnectTimer = setTimeout(() => {
+            if (socketSessionId === currentSessionId) connectSocket(currentSessionId, true);
+        }, delay / 2 + Math.random() * delay / 2);
+    };
+}
+
+function closeSocket() {
+    clearTimeout(reconnectTimer);
+    stopHeartbeat();
+    if (socket) {
+        const ws = socket;
+        socket = null;
+        ws.close();
+    }
+}
+
+function socketReady() {
+    return socket && socket.readyState === WebSocket.OPEN && socketSessionId === currentSessionId;
+}
+
+function startHeartbeat() {
+    stopHeartbeat();
+    heartbeatInterval = setInterval(() => {
+        if (!socketReady()) return;
+        socket.send(JSON.stringify({ type: 'ping' }));
+        pongTimer = setTimeout(() => {
+            updateConnectionStatus('disconnected');
+            if (socket) socket.close();
+        }, PONG_TIMEOUT_MS);
+    }, HEARTBEAT_MS);
+}
+
+function stopHeartbeat() {
+    clearInterval(heartbeatInterval);
+    clearTimeout(pongTimer);
+}
+
+function handleSocketMessage(data) {
+    switch (data.type) {
+        case 'pong':
+            clearTimeout(pongTimer);
+            updateConnectionStatus('connected');
+            break;
+        case 'delta':
+            if (!pendingTurn) return;
+            if (!pendingTurn.bubble) pendingTurn.bubble = addMessage('agent', '');
+            pendingTurn.bubble.textContent += data.text;
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+            break;
+        case 'reply':
+            if (!pendingTurn) return;
+            data.streamedBubble = pendingTurn.bubble;
+            pendingTurn.resolve(data);
+            pendingTurn = null;
+            break;
+        case 'error':
+            if (!pendingTurn) {
+                console.error('Socket error:', data.detail);
+                return;
+            }
+            if (pendingTurn.bubble) pendingTurn.bubble.parentElement.remove();
+            pendingTurn.reject(new Error(data.detail));
+            pendingTurn = null;
+            break;
+    }
+}
+
+function sendOverSocket(message) {
+    return new Promise((resolve, reject) => {
+        pendingTurn = { resolve, reject, bubble: null };
+        socket.send(JSON.stringify({ type: 'message', message: message, stream: STREAM_REPLIES }));
+    });
+}
+
+async function sendOverHttp(message) {
+    const response = await fetch(`${API_BASE}/api/session/message`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            session_id: currentSessionId,
+            message: message
+        })
+    });
+    
+    if (!response.ok) throw new Error('Failed to send message');
+    
+    return await response.json();
 }
 
 async function handleModeChange() {
@@ -291,21 +409,15 @@ async function handleSendMessage() {
     sendBtn.disabled = true;
     
     try {
-        const response = await fetch(`${API_BASE}/api/session/message`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                session_id: currentSessionId,
-                message: message
-            })
-        });
+        // Prefer the open socket; fall back to a plain POST
+        const data = socketReady() ? await sendOverSocket(message) : await sendOverHttp(message);
         
-        if (!response.ok) throw new Error('Failed to send message');
-        
-        const data = await response.json();
-        
-        // Add agent response
-        addMessage('agent', data.agent_msg);
+        // Add agent response (or finalize the streamed bubble)
+        if (data.streamedBubble) {
+            data.streamedBubble.textContent = data.agent_msg;
+        } else {
+            addMessage('agent', data.agent_msg);
+        }
         
         // Update metrics
         updateMetricsDisplay(data.metrics);
@@ -401,6 +513,8 @@ function addMessage(sender, text) {
     
     // Scroll to bottom
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    
+    return bubble;
 }
 
 async function updateMetrics() {
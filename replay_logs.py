@@ -0,0 +1,43 @@
+"""
+Replay logged sessions offline and report divergences
+
+Re-runs every user turn in dialogue_log.jsonl through the current
+detector, trackers, strategy adapter and guardrails, using the logged
+agent replies instead of the LLM.
+
+Usage:
+  python replay_logs.py [--log notebooks/dialogue_log.jsonl] [--workers 8] [--out divergences.jsonl]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config import Config
+from src.replay import replay_log, summarize
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay logged sessions without the LLM")
+    parser.add_argument("--log", default=os.path.join("notebooks", Config.LOG_FILE))
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=Config.REPLAY_CHUNK_SIZE)
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N sessions")
+    parser.add_argument("--tol", type=float, default=1e-6, help="tolerance for float comparisons")
+    parser.add_argument("--out", default=None, help="write diverging sessions to this JSONL file")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        print(f"Log file not found: {args.log}")
+        sys.exit(1)
+
+    print(f"Replaying {args.log} ...")
+    results = replay_log(args.log, args.workers, args.chunk_size, args.limit, args.tol)
+    summary = summarize(results, args.out)
+
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary['diverged'] or summary['errors'] else 0)
@@ -0,0 +1,49 @@
+"""
+Run condition-balanced simulated-donor experiments offline
+
+Drives many real DialogueManager sessions concurrently, each against a
+simulated donor and a local stand-in LLM (no HF token needed). Results
+are appended to a JSONL file as sessions finish; rerun the same command
+to resume after an interruption.
+
+Usage:
+  python run_experiments.py --sessions 3000 [--concurrency 64] [--donor rule|corpus] [--out notebooks/experiments.jsonl]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config import Config
+from src.experiment import CONDITIONS, run_experiment
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated-donor experiments over the real dialogue manager")
+    parser.add_argument("--sessions", type=int, default=300, help="total sessions (including already completed)")
+    parser.add_argument("--concurrency", type=int, default=32, help="sessions running at once")
+    parser.add_argument("--seed", type=int, default=0, help="experiment seed (keep fixed when resuming)")
+    parser.add_argument("--conditions", nargs="+", default=list(CONDITIONS), choices=CONDITIONS)
+    parser.add_argument("--donor", choices=["rule", "corpus"], default="rule")
+    parser.add_argument("--corpus", default=os.path.join("notebooks", Config.LOG_FILE),
+                        help="dialogue log to sample donor turns from (--donor corpus)")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated LLM latency per call (seconds)")
+    parser.add_argument("--out", default=os.path.join("notebooks", "experiments.jsonl"))
+    args = parser.parse_args()
+
+    if args.donor == "corpus" and not os.path.exists(args.corpus):
+        print(f"Corpus log not found: {args.corpus}")
+        sys.exit(1)
+
+    print(f"Running {args.sessions} sessions ({', '.join(args.conditions)}) -> {args.out}")
+    summary = asyncio.run(run_experiment(
+        args.sessions, args.out, args.concurrency, args.seed,
+        args.conditions, args.donor, args.corpus, args.latency
+    ))
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary['errors'] else 0)
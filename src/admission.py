@@ -0,0 +1,126 @@
+"""
+Admission Control for LLM Generation
+"""
+
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+import asyncio
+import math
+import time
+from src.config import Config
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds in-flight generation calls for one event loop.
+
+    - At most `max_concurrency` requests run at once
+    - Up to `max_queue` more wait, each for at most `deadline` seconds
+    - Anything beyond that is rejected immediately (HTTP 429)
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None,
+                 deadline: Optional[float] = None):
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.max_queue = Config.LLM_MAX_QUEUE if max_queue is None else max_queue
+        self.deadline = deadline or Config.LLM_QUEUE_DEADLINE
+
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+
+        # ---- Metrics ----
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.service_avg = 0.0   # EWMA of time a slot is held
+
+    @property
+    def sem(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._sem
+
+    @property
+    def idle_slots(self) -> int:
+        return max(0, self.max_concurrency - self.in_flight - self.waiting)
+
+    def retry_after(self) -> int:
+        # Rough time for the current queue to drain
+        per_slot = self.service_avg or 1.0
+        backlog = (self.waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(per_slot * backlog))
+
+    @asynccontextmanager
+    async def admit(self, slots: int = 1):
+        """
+        Hold up to `slots` slots and yield how many were granted (>= 1).
+
+        Only the first slot is waited for; extra ones are taken only if
+        free right now, so multi-slot holders can never deadlock each
+        other or jump ahead of queued requests.
+        """
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise Overloaded("queue full", self.retry_after())
+
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.sem.acquire(), self.deadline)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise Overloaded("queue deadline exceeded", self.retry_after())
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+        granted = 1
+        while granted < slots and not self.sem.locked():
+            await self.sem.acquire()   # free: returns without suspending
+            granted += 1
+
+        self.in_flight += granted
+        held = time.monotonic()
+        try:
+            yield granted
+        finally:
+            self.in_flight -= granted
+            for _ in range(granted):
+                self.sem.release()
+            dt = time.monotonic() - held
+            self.service_avg = dt if not self.service_avg else 0.9 * self.service_avg + 0.1 * dt
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and self.waiting == 0
+
+    def snapshot(self) -> Dict:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'in_flight': self.in_flight,
+            'queue_depth': self.waiting,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'wait_avg_ms': round(1000 * self.wait_total / self.admitted, 1) if self.admitted else 0.0,
+            'wait_max_ms': round(1000 * self.wait_max, 1),
+            'service_avg_ms': round(1000 * self.service_avg, 1)
+        }
@@ -0,0 +1,138 @@
+"""
+Live Cross-Session Aggregates
+"""
+
+from typing import Dict, List, Optional
+import threading
+import numpy as np
+from src.config import Config
+from src.serialization import round_floats
+
+
+CONDITIONS = ('C1', 'C2', 'C3')
+
+# Guardrail stop reason -> outcome bucket
+OUTCOME_BUCKETS = {
+    "User accepted": 'accepted',
+    "User declined donation": 'declined',
+    "User ended conversation": 'declined',
+    "Trust too low": 'trust_collapse',
+}
+OUTCOMES = ('accepted', 'declined', 'trust_collapse', 'max_turns', 'abandoned')
+
+# Raw running totals; sums of these across processes are still valid totals
+COUNTERS = ('started', 'outcomes', 'turns', 'recovery_turns', 'strategy_counts',
+            'turn_n', 'belief_sum', 'trust_sum')
+
+
+class LiveAggregates:
+    """
+    Running totals over every session in this process.
+
+    Each DialogueManager reports its own turns (O(1) per call), so reading
+    the aggregates never has to walk the session table.
+    """
+
+    def __init__(self):
+        n_cond = len(CONDITIONS)
+        n_turns = Config.MAX_TURNS + 1
+        self._lock = threading.Lock()
+
+        self.started = np.zeros(n_cond, dtype=np.int64)
+        self.outcomes = np.zeros((n_cond, len(OUTCOMES)), dtype=np.int64)
+        self.turns = np.zeros(n_cond, dtype=np.int64)
+        self.recovery_turns = np.zeros(n_cond, dtype=np.int64)
+        self.strategy_counts = np.zeros((n_cond, len(Config.STRATEGIES)), dtype=np.int64)
+
+        # By turn index (0 = state at session start)
+        self.turn_n = np.zeros((n_cond, n_turns), dtype=np.int64)
+        self.belief_sum = np.zeros((n_cond, n_turns))
+        self.trust_sum = np.zeros((n_cond, n_turns))
+
+    def session_started(self, condition: str, belief: float, trust: float):
+        c = CONDITIONS.index(condition)
+        with self._lock:
+            self.started[c] += 1
+            self.turn_n[c, 0] += 1
+            self.belief_sum[c, 0] += belief
+            self.trust_sum[c, 0] += trust
+
+    def record_turn(self, condition: str, turn: int, belief: float, trust: float,
+                    recovery: bool, strategy_idx: Optional[int] = None, outcome: Optional[str] = None):
+        c = CONDITIONS.index(condition)
+        t = min(turn, Config.MAX_TURNS)
+        with self._lock:
+            self.turns[c] += 1
+            self.recovery_turns[c] += recovery
+            self.turn_n[c, t] += 1
+            self.belief_sum[c, t] += belief
+            self.trust_sum[c, t] += trust
+            if strategy_idx is not None:
+                self.strategy_counts[c, strategy_idx] += 1
+            if outcome is not None:
+                bucket = OUTCOME_BUCKETS.get(outcome, 'max_turns')
+                self.outcomes[c, OUTCOMES.index(bucket)] += 1
+
+    def session_abandoned(self, condition: str):
+        """Session deleted or reset before it ended."""
+        c = CONDITIONS.index(condition)
+        with self._lock:
+            self.outcomes[c, OUTCOMES.index('abandoned')] += 1
+
+    def counters(self) -> Dict[str, np.ndarray]:
+        with self._lock:
+            return {name: getattr(self, name).copy() for name in COUNTERS}
+
+    def snapshot(self) -> Dict:
+        return render_counters(self.counters())
+
+
+def merge_counters(parts: List[Dict]) -> Dict[str, np.ndarray]:
+    """Sum counters reported by several processes (each owns disjoint sessions)."""
+    total = LiveAggregates().counters()
+    for part in parts:
+        for name in COUNTERS:
+            total[name] = total[name] + np.asarray(part[name], dtype=total[name].dtype)
+    return total
+
+
+def render_counters(counts: Dict[str, np.ndarray]) -> Dict:
+    """Per-condition rates and per-turn means from raw counters."""
+    started = counts['started']
+    outcomes = counts['outcomes']
+    turns = counts['turns']
+    recovery = counts['recovery_turns']
+    strategies = counts['strategy_counts']
+    turn_n = counts['turn_n']
+    belief = counts['belief_sum']
+    trust = counts['trust_sum']
+
+    ended = outcomes.sum(axis=1)
+    finished = ended - outcomes[:, OUTCOMES.index('abandoned')]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = outcomes / finished[:, None]
+        mean_belief = belief / turn_n
+        mean_trust = trust / turn_n
+        recovery_rate = recovery / turns
+
+    result = {}
+    for c, cond in enumerate(CONDITIONS):
+        seen = turn_n[c] > 0
+        result[cond] = {
+            'sessions_started': int(started[c]),
+            'sessions_active': int(started[c] - ended[c]),
+            'sessions_ended': int(ended[c]),
+            'outcomes': dict(zip(OUTCOMES, outcomes[c].tolist())),
+            'acceptance_rate': round(float(rates[c, 0]), 3) if finished[c] else None,
+            'decline_rate': round(float(rates[c, 1]), 3) if finished[c] else None,
+            'trust_collapse_rate': round(float(rates[c, 2]), 3) if finished[c] else None,
+            'turns': int(turns[c]),
+            'recovery_turn_rate': round(float(recovery_rate[c]), 3) if turns[c] else None,
+            'strategy_counts': dict(zip(Config.STRATEGIES, strategies[c].tolist())),
+            'by_turn': {
+                'sessions': turn_n[c, seen].tolist(),
+                'mean_belief': round_floats(mean_belief[c, seen]),
+                'mean_trust': round_floats(mean_trust[c, seen])
+            }
+        }
+    return result
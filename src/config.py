@@ -7,6 +7,55 @@ class Config:
     TEMPERATURE = 0.8
     MAX_NEW_TOKENS = 64
 
+    # ---- Local model (use_local_model=True) ----
+    # None keeps the API path; opt in to an in-process model with
+    # "float" | "int8" (torch dynamic) | "onnx" (optimum + onnxruntime)
+    # here or through the LOCAL_INFERENCE_MODE environment variable
+    LOCAL_INFERENCE_MODE = None
+    LOCAL_MODEL_NAME = "Qwen/Qwen2.5-0.5B-Instruct"
+    LOCAL_ONNX_CACHE_DIR = "notebooks/onnx_models"   # exported graphs, reused across loads
+    LOCAL_NUM_THREADS = None      # torch intra-op threads (None = torch default)
+
+    # ---- LLM admission control ----
+    LLM_MAX_CONCURRENCY = 8       # generation calls in flight
+    LLM_MAX_QUEUE = 32            # requests allowed to wait for a slot
+    LLM_QUEUE_DEADLINE = 10.0     # seconds a request may wait
+
+    # ---- LLM client resilience ----
+    LLM_TIMEOUT = 30.0            # seconds per HTTP call
+    LLM_MAX_RETRIES = 2           # retries for transient errors (429/5xx/timeouts)
+    LLM_BACKOFF_BASE = 0.25       # seconds; doubled per attempt, full jitter
+    LLM_BACKOFF_CAP = 2.0
+    BREAKER_FAILURE_THRESHOLD = 5 # consecutive transient failures to open
+    BREAKER_RESET_TIMEOUT = 30.0  # seconds before a half-open probe
+
+    # ---- Speculative generation ----
+    SPECULATIVE_GENERATION = False
+    SPECULATION_MIN_WEIGHT = 0.4  # top strategy weight needed to speculate
+    SPECULATION_WORKERS = 16
+
+    # ---- Pre-generated response pools (generic first turns) ----
+    RESPONSE_POOL = False
+    POOL_DEPTH = 3                # replies kept per (strategy, sentiment, recovery)
+    POOL_MAX_WORDS = 6            # longer messages and questions always go live
+    POOL_MAX_DUPLICATES = 3       # duplicate draws in a row before a slot stops refilling
+    POOL_RESERVED_SLOTS = 2       # admission slots the filler leaves to live turns
+    POOL_IDLE_INTERVAL = 1.0      # seconds between checks when nothing can be filled
+
+    # ---- Batch turn API ----
+    BATCH_MAX_TURNS = 500         # turns per /api/batch/turns request
+    BATCH_MAX_WORKERS = 8         # concurrent generations per batch
+
+    # ---- Sharded deployment (start_backend_sharded.py) ----
+    SHARD_BASE_PORT = 8100        # worker i listens on SHARD_BASE_PORT + i
+    ROUTER_TIMEOUT = 60.0         # seconds per proxied request
+
+    # ---- WebSocket sessions ----
+    WS_MAX_PENDING_TURNS = 4      # messages queued behind the running turn; then reading pauses
+
+    # ---- API responses ----
+    GZIP_MIN_SIZE = 2048          # bytes; smaller responses are sent uncompressed
+
     # ---- Initial states ----
     INITIAL_BELIEF = 0.15    # start higher so drops are visible
     INITIAL_TRUST = 0.9     # not perfect trust at start
@@ -22,11 +71,34 @@ class Config:
     SOFT_REJECTION_PENALTY = 0.35
     MIN_STRATEGY_WEIGHT = 0.05
 
+    # ---- Population priors (shared across sessions of a campaign) ----
+    PRIOR_MIN_OBSERVATIONS = 30   # below this, sessions start uniform
+    PRIOR_BATCH_SIZE = 4          # events buffered per session before hand-off
+    PRIOR_FLUSH_INTERVAL = 2.0    # seconds
+    PRIOR_PERSIST_INTERVAL = 60.0
+    PRIORS_FILE = "strategy_priors.json"
+
     # ---- Conversation limits ----
     MAX_TURNS = 15
     MAX_CONSECUTIVE_REJECTIONS = 3
 
+    # ---- Conversation memory (prompt context) ----
+    MEMORY_TOKEN_BUDGET = 240     # verbatim recent exchanges
+    SUMMARY_TOKEN_BUDGET = 120    # rolling summary of older exchanges
+    SUMMARY_WORDS_PER_MSG = 12
+    SUMMARY_MAX_TOPICS = 64       # words tracked per side for the topic line
+
+    # ---- Rejection detection ----
+    DETECTOR_BACKEND = "rules"    # "rules" (regex + TextBlob) | "learned" (override per campaign: donation_context['detector_backend'])
+    INTENT_MODEL_FILE = "intent_model.npz"
+    INTENT_HASH_BITS = 18         # hashed n-gram feature space = 2**bits
+
     LOG_FILE = "dialogue_log.jsonl"
+    JOURNAL_FILE = "session_journal.jsonl"   # per-turn write-ahead journal
+    JOURNAL_COMPACT_INTERVAL = 300.0  # seconds between folding finished sessions into LOG_FILE
+    SESSION_IDLE_TTL = 3600.0     # seconds without a turn before a session is saved and dropped
+    JOURNAL_FSYNC = False         # fsync every record (survives power loss, not just process crashes)
+    REPLAY_CHUNK_SIZE = 256       # logged sessions per worker task
 
     STRATEGIES = [
         "Empathy",
@@ -2,59 +2,156 @@
 Dialogue Manager - Main Orchestrator
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
-import json
+from typing import Callable, Dict, List, Optional, Tuple
 import os
+import time
 
-from src.rejection_detector import RejectionDetector
-from src.trackers import BeliefTracker, TrustTracker
+from src.rejection_detector import make_detector
+from src.trackers import BeliefTracker, TrustTracker, round_score
 from src.strategy_adapter import StrategyAdapter
 from src.guardrails import Guardrails
 from src.llm_agent import LLMAgent
 from src.config import Config
+from src.records import AgentTurn, UserTurn, RejectionInfo, Strategy, SentimentLabel
+from src import speculation
+from src.priors import StrategyPriors, classify_outcome
+from src.aggregates import LiveAggregates
+from src.session_ids import new_session_id
+from src.serialization import append_jsonl
+
+
+class TurnPlan:
+    """State of one turn between analysis and generation."""
+
+    __slots__ = ('user_msg', 'rej_info', 'delta_p', 'delta_t', 'stop', 'result',
+                 'chosen', 'is_recovery')
+
+    def __init__(self, user_msg: str, rej_info: RejectionInfo, delta_p: float, delta_t: float):
+        self.user_msg = user_msg
+        self.rej_info = rej_info
+        self.delta_p = delta_p
+        self.delta_t = delta_t
+        self.stop = False
+        self.result = None
+        self.chosen = None
+        self.is_recovery = False
+
+    def key(self):
+        # What the generation prompt depends on besides the message/history
+        return (self.chosen, self.is_recovery, self.rej_info['sentiment_label'])
 
 
 class DialogueManager:
-    def __init__(self, condition: str, donation_ctx: Dict, client=None, use_local_model: bool = False):
+    def __init__(self, condition: str, donation_ctx: Dict, client=None, use_local_model: bool = False,
+                 seed: Optional[int] = None, priors: Optional[StrategyPriors] = None,
+                 speculative: Optional[bool] = None, aggregates: Optional[LiveAggregates] = None,
+                 journal=None, pool=None):
         self.condition = condition
-        self.session_id = f"sess_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.session_id = new_session_id()
         self.ctx = donation_ctx
 
-        self.agent = LLMAgent(donation_ctx, use_local_model, client)
-        self.detector = RejectionDetector()
+        self.agent = LLMAgent(donation_ctx, use_local_model, client, pool)
+        self.detector = make_detector(donation_ctx)
         self.belief = BeliefTracker()
         self.trust = TrustTracker()
-        self.strategy = StrategyAdapter()
         self.guard = Guardrails()
 
+        # ---- Population priors: warm-start adaptive weights ----
+        self.priors = priors
+        self._outcomes = []          # pending (recovery, strategy_idx, outcome)
+        self._last_recovery = False  # recovery state when prev strategy was chosen
+        init_w = None
+        if priors is not None and condition in ['C2', 'C3']:
+            init_w = priors.initial_weights(condition)
+        self.strategy = StrategyAdapter(seed, init_w)
+
         self.history = []
         self.turn = 0
         self.active = True
         self.outcome = None
 
+        # ---- Speculative generation ----
+        self.speculative = Config.SPECULATIVE_GENERATION if speculative is None else speculative
+        self._last_sentiment = SentimentLabel.NEUTRAL
+
+        # ---- Cross-session live aggregates ----
+        self.aggregates = aggregates
+
+        # ---- Write-ahead journal (crash recovery) ----
+        self.journal = journal
+        self.journal_id = None
+        self._saved = False
+
+        # ---- Idle tracking (the backend retires stale sessions) ----
+        self.last_active = time.monotonic()
+
         if condition == 'C1':
-            self.static_strat = 'Empathy'
+            self.static_strat = Strategy.Empathy
 
-    def start(self) -> str:
-        opening = (
-            f"Hello! I'm from {self.ctx['organization']}. "
-            f"We're working on {self.ctx['cause']}. "
+    @staticmethod
+    def opening_message(donation_ctx: Dict) -> str:
+        return (
+            f"Hello! I'm from {donation_ctx['organization']}. "
+            f"We're working on {donation_ctx['cause']}. "
             f"Would you like to learn more about what we do?"
         )
-        self.history.append(
-            {'turn': 0, 'speaker': 'agent', 'msg': opening, 'strategy': 'Empathy'}
-        )
+
+    def start(self) -> str:
+        opening = self.opening_message(self.ctx)
+        self.history.append(AgentTurn(0, opening, Strategy.Empathy))
+        if self.aggregates is not None:
+            self.aggregates.session_started(self.condition, self.belief.get(), self.trust.get())
+        if self.journal is not None:
+            self.journal_id = self.journal.session_started(self)
         return opening
 
-    def process(self, user_msg: str) -> Dict:
+    def process(self, user_msg: str, on_delta: Optional[Callable[[str], None]] = None) -> Dict:
         self.turn += 1
 
+        # ---- Speculate: start generating before analysis finishes ----
+        spec = None
+        if self.speculative and on_delta is None:
+            spec = self._speculate(user_msg)
+
         # ---- Analyze ----
         rej_info = self.detector.detect(user_msg)
 
+        plan = self._advance(user_msg, rej_info)
+        if plan.stop:
+            if spec is not None:
+                spec[1].cancel()
+                speculation.stats.incr('discarded')
+            return plan.result
+
+        # ---- Generate response ----
+        if spec is not None and spec[0] == plan.key():
+            speculation.stats.incr('hits')
+            agent_resp = spec[1].result()
+            self.agent.remember(user_msg, agent_resp)
+        else:
+            if spec is not None:
+                spec[1].cancel()
+                speculation.stats.incr('misses')
+            agent_resp = self.agent.generate(
+                plan.chosen,
+                user_msg,
+                self.turn,
+                plan.is_recovery,
+                rej_info['sentiment_label'],
+                on_delta
+            )
+
+        return self._finish(plan, agent_resp)
+
+    def _advance(self, user_msg: str, rej_info: RejectionInfo) -> 'TurnPlan':
+        """Everything in a turn up to generation: trackers, guardrails, strategy."""
+        self.last_active = time.monotonic()
+        self._last_sentiment = rej_info['sentiment_label']
+
         # ---- Update belief FIRST (needs trust) ----
-        prev_strat = self.history[-1]['strategy'] if self.history else 'Empathy'
+        prev_strat = self.history[-1].strategy if self.history else Strategy.Empathy
         delta_p = self.belief.update(rej_info, self.trust.get())
 
         # ---- Update trust ----
@@ -69,15 +166,27 @@ class DialogueManager:
             self.belief.get()
         )
 
+        self._record_outcome(prev_strat, rej_info)
+
+        plan = TurnPlan(user_msg, rej_info, delta_p, delta_t)
+
         if should_stop:
             self.active = False
             self.outcome = reason
-            return {
+            self._flush_outcomes()
+            # Keep the turn that ended the session so logs can be replayed
+            self.history.append(UserTurn(self.turn, user_msg, rej_info))
+            plan.stop = True
+            plan.result = {
                 'agent_msg': self._closing(reason),
                 'metrics': self._metrics(rej_info, delta_p, delta_t),
                 'stop': True,
                 'reason': reason
             }
+            self._aggregate()
+            if self.journal is not None:
+                self.journal.turn(self, plan)
+            return plan
 
         # ---- Strategy selection ----
         if self.condition == 'C1':
@@ -85,40 +194,117 @@ class DialogueManager:
         else:
             in_recovery = self.condition == 'C3' and self.trust.recovery_mode
             chosen = self.strategy.select(in_recovery)
+        self._last_recovery = self.trust.recovery_mode
 
         # ---- Adapt strategy ----
         if self.condition in ['C2', 'C3']:
             self.strategy.adapt(prev_strat, rej_info)
 
-        # ---- Generate response ----
-        agent_resp = self.agent.generate(
-            chosen,
-            user_msg,
-            self.turn,
-            self.trust.recovery_mode,
-            rej_info['sentiment_label']
-        )
+        plan.chosen = chosen
+        plan.is_recovery = self.trust.recovery_mode
+        return plan
 
+    def _finish(self, plan: 'TurnPlan', agent_resp: str) -> Dict:
         # ---- Log ----
-        self.history.append(
-            {'turn': self.turn, 'speaker': 'user', 'msg': user_msg, 'info': rej_info}
-        )
-        self.history.append(
-            {'turn': self.turn, 'speaker': 'agent', 'msg': agent_resp, 'strategy': chosen}
-        )
+        self.history.append(UserTurn(self.turn, plan.user_msg, plan.rej_info))
+        self.history.append(AgentTurn(self.turn, agent_resp, plan.chosen))
+        self._aggregate(plan.chosen)
+        if self.journal is not None:
+            self.journal.turn(self, plan, agent_resp)
 
         return {
             'agent_msg': agent_resp,
-            'metrics': self._metrics(rej_info, delta_p, delta_t),
+            'metrics': self._metrics(plan.rej_info, plan.delta_p, plan.delta_t),
             'stop': False,
             'reason': None
         }
 
+    @staticmethod
+    def process_batch(turns: List[Tuple['DialogueManager', str]],
+                      max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Process many (manager, message) turns together.
+
+        Detection runs as one batch, then all generations are fanned out
+        concurrently. Several turns for the same manager are processed in
+        order, one wave at a time. Results come back in input order.
+        """
+        results: List[Optional[Dict]] = [None] * len(turns)
+
+        # ---- Split into waves with at most one turn per session ----
+        waves: List[List[int]] = []
+        depth: Dict[int, int] = {}
+        for i, (dm, _) in enumerate(turns):
+            d = depth.get(id(dm), 0)
+            depth[id(dm)] = d + 1
+            if d == len(waves):
+                waves.append([])
+            waves[d].append(i)
+
+        workers = max_workers or Config.BATCH_MAX_WORKERS
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for wave in waves:
+                live = [i for i in wave if turns[i][0].active]
+                for i in wave:
+                    if not turns[i][0].active:
+                        results[i] = turns[i][0].ended_result()
+
+                if not live:
+                    continue
+
+                # ---- Analyze (batched per detector backend) ----
+                infos = {}
+                groups: Dict[object, List[int]] = {}
+                for i in live:
+                    groups.setdefault(turns[i][0].detector.batch_key, []).append(i)
+                for idxs in groups.values():
+                    batch = turns[idxs[0]][0].detector.detect_batch([turns[i][1] for i in idxs])
+                    infos.update(zip(idxs, batch))
+
+                plans = {}
+                for i in live:
+                    info = infos[i]
+                    dm, msg = turns[i]
+                    dm.turn += 1
+                    plan = dm._advance(msg, info)
+                    if plan.stop:
+                        results[i] = plan.result
+                    else:
+                        plans[i] = plan
+
+                # ---- Generate (concurrent fan-out) ----
+                futures = {
+                    i: pool.submit(
+                        turns[i][0].agent.generate,
+                        plan.chosen, plan.user_msg, turns[i][0].turn,
+                        plan.is_recovery, plan.rej_info['sentiment_label']
+                    )
+                    for i, plan in plans.items()
+                }
+                for i, fut in futures.items():
+                    results[i] = turns[i][0]._finish(plans[i], fut.result())
+
+        return results
+
+    def ended_result(self) -> Dict:
+        """Response for a message sent to a session that has already ended."""
+        return {
+            'agent_msg': self._closing(self.outcome or "Session ended"),
+            'metrics': {
+                'turn': self.turn,
+                'belief': round_score(self.belief.get()),
+                'trust': round_score(self.trust.get()),
+                'stop': True,
+                'reason': self.outcome
+            },
+            'stop': True
+        }
+
     def _metrics(self, rej_info: Dict, dp: float, dt: float) -> Dict:
         return {
             'turn': self.turn,
-            'belief': round(self.belief.get(), 3),
-            'trust': round(self.trust.get(), 3),
+            'belief': round_score(self.belief.get()),
+            'trust': round_score(self.trust.get()),
             'delta_belief': round(dp, 3),
             'delta_trust': round(dt, 3),
             'rejection_type': rej_info['rejection_type'],
@@ -128,12 +314,70 @@ class DialogueManager:
             'trust_concern': rej_info['trust_concern'],
             'is_curiosity': rej_info['is_curiosity'],
             'recovery_mode': self.trust.recovery_mode,
-            'strategy_weights': {
-                k: round(v, 3) for k, v in self.strategy.weights.items()
-            },
+            'strategy_weights': self.strategy.rounded_weights(),
             'consec_reject': self.guard.consec_reject
         }
 
+    def _speculate(self, user_msg: str):
+        """
+        Start generation for the most likely (strategy, recovery, sentiment).
+
+        Only for the common case: not in recovery and one strategy clearly
+        dominant (always true for C1), and only while the LLM has idle
+        capacity (speculation.has_capacity). The sentiment is predicted
+        from the previous turn. Returns (predicted_key, future) or None. A
+        cancelled request that already started still runs to completion
+        upstream; its result is simply dropped.
+        """
+        if self.trust.recovery_mode or not speculation.has_capacity():
+            speculation.stats.incr('skipped')
+            return None
+
+        if self.condition == 'C1':
+            strat = self.static_strat
+        else:
+            w = self.strategy._w
+            idx = int(w.argmax())
+            if w[idx] < Config.SPECULATION_MIN_WEIGHT:
+                speculation.stats.incr('skipped')
+                return None
+            strat = StrategyAdapter.MEMBERS[idx]
+
+        key = (strat, False, self._last_sentiment)
+        prompt = self.agent.build_prompt(strat, user_msg, self.turn, False, self._last_sentiment)
+        speculation.stats.incr('started')
+        return key, speculation.submit(self.agent.complete, prompt, strat, False)
+
+    def _aggregate(self, chosen: Optional[Strategy] = None):
+        if self.aggregates is None:
+            return
+        self.aggregates.record_turn(
+            self.condition, self.turn, self.belief.get(), self.trust.get(),
+            self.trust.recovery_mode,
+            StrategyAdapter.STRATEGY_INDEX[chosen] if chosen is not None else None,
+            self.outcome if not self.active else None
+        )
+
+    def _record_outcome(self, strategy: str, rej_info: Dict):
+        if self.priors is None:
+            return
+        outcome = classify_outcome(rej_info)
+        if outcome is None:
+            return
+        self._outcomes.append(
+            (int(self._last_recovery), StrategyAdapter.STRATEGY_INDEX[strategy], outcome)
+        )
+        if len(self._outcomes) >= Config.PRIOR_BATCH_SIZE:
+            self._flush_outcomes()
+
+    def _flush_outcomes(self):
+        if self.priors is not None and self._outcomes:
+            self.priors.submit(self.condition, self._outcomes)
+            self._outcomes = []
+
+    def history_dicts(self) -> List[Dict]:
+        return [h.to_dict() for h in self.history]
+
     def _closing(self, reason: str) -> str:
         if 'accepted' in reason.lower():
             return "Thank you so much! Your donation will make a real difference."
@@ -141,12 +385,16 @@ class DialogueManager:
             return "Thank you for your time. I respect your decision."
 
     def save(self):
+        # Once per session: journal compaction may already have folded it in
+        if self._saved:
+            return
+        self._flush_outcomes()
         log = {
             'session_id': self.session_id,
             'condition': self.condition,
             'timestamp': datetime.now().isoformat(),
             'context': self.ctx,
-            'history': self.history,
+            'history': self.history_dicts(),
             'final_belief': self.belief.get(),
             'final_trust': self.trust.get(),
             'turns': self.turn,
@@ -154,5 +402,7 @@ class DialogueManager:
         }
         log_file = os.path.join("notebooks", Config.LOG_FILE)
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log) + '\n')
+        append_jsonl(log_file, log)
+        self._saved = True
+        if self.journal is not None:
+            self.journal.session_ended(self)
@@ -0,0 +1,299 @@
+"""
+Simulated-Donor Experiment Runner
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Set
+import asyncio
+import os
+import re
+import time
+import numpy as np
+
+from src.config import Config
+from src.dialogue_manager import DialogueManager
+from src.serialization import dumps, loads
+
+
+CONDITIONS = ('C1', 'C2', 'C3')
+
+DEFAULT_CTX = {
+    "organization": "Children's Education Fund",
+    "cause": "providing education to underprivileged children",
+    "amounts": "200, 500, 1000",
+    "impact": "₹200 provides school supplies for 5 children for a month"
+}
+
+
+# ---- Local stand-in LLM ----
+class StandInClient:
+    """
+    Offline replacement for the chat-completions client.
+
+    Returns a short templated reply for the strategy named in the prompt,
+    optionally sleeping to mimic endpoint latency.
+    """
+
+    REPLIES = {
+        "Empathy": "I completely understand. Many people feel the same way. What matters most to you here?",
+        "Impact": "Even a small gift goes a long way: {impact}.",
+        "SocialProof": "Quite a few people from your area have joined in this month.",
+        "Transparency": "Happy to be open: most of every donation goes directly to the program.",
+        "EthicalUrgency": "The need is pressing this month, but there's truly no pressure.",
+        "Recovery": "I'm sorry if that felt pushy. No pressure at all - happy to answer any questions."
+    }
+    STRATEGY_RE = re.compile(r'YOUR STRATEGY: (\w+)')
+
+    def __init__(self, donation_ctx: Dict, latency: float = 0.0):
+        self.ctx = donation_ctx
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages: List[Dict], **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = messages[-1]['content']
+        if 'TRUST RECOVERY' in prompt:
+            key = 'Recovery'
+        else:
+            m = self.STRATEGY_RE.search(prompt)
+            key = m.group(1) if m else 'Empathy'
+        text = self.REPLIES.get(key, self.REPLIES['Empathy']).format(**self.ctx)
+        message = SimpleNamespace(content=text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+# ---- Simulated donors ----
+class RuleBasedDonor:
+    """
+    Persona-driven donor: hidden interest and trust levels react to the
+    strategy the agent used; the reply is drawn from canned phrasings.
+    """
+
+    PHRASES = {
+        'accept': ["Okay, I'll donate.", "Sign me up!", "How do I donate?", "I want to donate ₹200."],
+        'curious': ["Tell me more about it.", "How does the money get used?", "Who are you exactly?",
+                    "Can you explain the program?"],
+        'neutral': ["Hmm, okay.", "I see.", "Interesting.", "Right."],
+        'soft': ["Maybe later.", "I'm not sure.", "Not right now, money is tight.", "Let me think about it."],
+        'trust': ["This feels a bit pushy.", "How do I know this isn't a scam?", "Sounds suspicious to me."],
+        'explicit': ["No thanks, not interested.", "Nope.", "Please stop asking."],
+        'exit': ["Okay thanks.", "That's all, thank you."],
+    }
+
+    # How each persona type responds to each strategy (interest delta)
+    AFFINITY = {
+        'warm':      {'Empathy': 0.15, 'Impact': 0.10, 'SocialProof': 0.10, 'Transparency': 0.05, 'EthicalUrgency': 0.00},
+        'analytic':  {'Empathy': 0.00, 'Impact': 0.15, 'SocialProof': -0.05, 'Transparency': 0.15, 'EthicalUrgency': -0.10},
+        'skeptical': {'Empathy': 0.05, 'Impact': 0.00, 'SocialProof': -0.10, 'Transparency': 0.20, 'EthicalUrgency': -0.20},
+    }
+
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+        self.persona = str(rng.choice(list(self.AFFINITY)))
+        self.interest = float(rng.uniform(0.1, 0.6))
+        self.trust = float(rng.uniform(0.4, 0.9))
+        self.patience = int(rng.integers(3, Config.MAX_TURNS + 1))
+        self.turn = 0
+
+    def describe(self) -> Dict:
+        return {'type': 'rule', 'persona': self.persona, 'interest': round(self.interest, 3),
+                'trust': round(self.trust, 3), 'patience': self.patience}
+
+    def reply(self, agent_msg: str, strategy: str) -> str:
+        self.turn += 1
+        self.interest += self.AFFINITY[self.persona].get(strategy, 0.0) + self.rng.normal(0, 0.05)
+        if strategy == 'EthicalUrgency':
+            self.trust -= 0.1
+        elif strategy == 'Transparency':
+            self.trust += 0.05
+        self.interest = min(1.0, max(0.0, self.interest))
+        self.trust = min(1.0, max(0.0, self.trust))
+
+        if self.turn >= self.patience:
+            kind = 'exit' if self.interest > 0.3 else 'explicit'
+        elif self.trust < 0.35 and self.rng.random() < 0.6:
+            kind = 'trust'
+        elif self.interest > 0.8 and self.rng.random() < 0.7:
+            kind = 'accept'
+        elif self.interest > 0.45:
+            kind = 'curious' if self.rng.random() < 0.6 else 'neutral'
+        elif self.interest > 0.2:
+            kind = 'soft' if self.rng.random() < 0.6 else 'neutral'
+        else:
+            kind = 'explicit' if self.rng.random() < 0.5 else 'soft'
+
+        options = self.PHRASES[kind]
+        return options[int(self.rng.integers(len(options)))]
+
+
+class CorpusDonor:
+    """Samples real user turns from logged sessions, by turn index."""
+
+    def __init__(self, rng: np.random.Generator, corpus: List[List[str]]):
+        self.rng = rng
+        self.corpus = corpus
+        self.turn = 0
+
+    def describe(self) -> Dict:
+        return {'type': 'corpus'}
+
+    def reply(self, agent_msg: str, strategy: str) -> str:
+        pool = self.corpus[min(self.turn, len(self.corpus) - 1)]
+        self.turn += 1
+        return pool[int(self.rng.integers(len(pool)))]
+
+
+def load_corpus(path: str) -> List[List[str]]:
+    """User messages from dialogue_log.jsonl, grouped by turn index."""
+    by_turn: List[List[str]] = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            log = loads(line)
+            for h in log.get('history', []):
+                if h.get('speaker') == 'user':
+                    t = h['turn'] - 1
+                    while len(by_turn) <= t:
+                        by_turn.append([])
+                    by_turn[t].append(h['msg'])
+    by_turn = [msgs for msgs in by_turn if msgs]
+    if not by_turn:
+        raise ValueError(f"No user turns found in {path}")
+    return by_turn
+
+
+# ---- Single simulated session ----
+def assign_condition(index: int, seed: int, conditions=CONDITIONS) -> str:
+    # Permuted blocks: every consecutive block of len(conditions) runs is balanced
+    block, pos = divmod(index, len(conditions))
+    order = np.random.default_rng([seed, block]).permutation(len(conditions))
+    return conditions[int(order[pos])]
+
+
+def simulate_session(index: int, seed: int, conditions=CONDITIONS, donor: str = 'rule',
+                     corpus: Optional[List[List[str]]] = None, latency: float = 0.0,
+                     donation_ctx: Optional[Dict] = None) -> Dict:
+    ctx = donation_ctx or DEFAULT_CTX
+    rng = np.random.default_rng([seed, index, 1])
+    condition = assign_condition(index, seed, conditions)
+
+    sim = CorpusDonor(rng, corpus) if donor == 'corpus' else RuleBasedDonor(rng)
+    dm = DialogueManager(condition, ctx, StandInClient(ctx, latency),
+                         seed=int(rng.integers(2**31)), speculative=False)
+
+    start = time.monotonic()
+    agent_msg = dm.start()
+    strategies = []
+    result = None
+    while dm.active:
+        user_msg = sim.reply(agent_msg, dm.history[-1].strategy)
+        result = dm.process(user_msg)
+        agent_msg = result['agent_msg']
+        if not result['stop']:
+            strategies.append(str(dm.history[-1].strategy))
+
+    return {
+        'run_id': f"run_{index:07d}",
+        'index': index,
+        'seed': seed,
+        'condition': condition,
+        'donor': sim.describe(),
+        'outcome': dm.outcome,
+        'accepted': dm.outcome == "User accepted",
+        'turns': dm.turn,
+        'final_belief': dm.belief.get(),
+        'final_trust': dm.trust.get(),
+        'strategies': strategies,
+        'belief_history': dm.belief.history,
+        'trust_history': dm.trust.history,
+        'history': dm.history_dicts(),
+        'elapsed_sec': round(time.monotonic() - start, 4)
+    }
+
+
+# ---- Runner ----
+def completed_runs(out_path: str) -> Set[int]:
+    """Indices already present in the results file (the checkpoint)."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path) as f:
+        for line in f:
+            try:
+                done.add(loads(line)['index'])
+            except (ValueError, KeyError):
+                continue   # partially written last line after a crash
+    return done
+
+
+async def run_experiment(n_sessions: int, out_path: str, concurrency: int = 32, seed: int = 0,
+                         conditions: Iterable[str] = CONDITIONS, donor: str = 'rule',
+                         corpus_path: Optional[str] = None, latency: float = 0.0,
+                         progress_every: int = 100) -> Dict:
+    """
+    Run n_sessions simulated conversations, `concurrency` at a time.
+
+    Each session is a real DialogueManager driven from a worker thread.
+    Results are appended to out_path as they complete; rerunning with the
+    same arguments skips sessions already in the file.
+    """
+    conditions = tuple(conditions)
+    corpus = load_corpus(corpus_path) if donor == 'corpus' else None
+
+    # Indices past n_sessions (from an earlier, larger run) don't count here
+    done = completed_runs(out_path) & set(range(n_sessions))
+    todo = [i for i in range(n_sessions) if i not in done]
+    print(f"{len(done)} session(s) already completed, {len(todo)} to run")
+
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    sem = asyncio.Semaphore(concurrency)
+    counts = {c: 0 for c in conditions}
+    accepted = {c: 0 for c in conditions}
+    finished = 0
+    errors = 0
+    start = time.monotonic()
+
+    # Own pool: the default executor caps threads at min(32, cpu + 4)
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="experiment")
+
+    with open(out_path, 'ab') as out, pool:
+        async def one(i: int):
+            nonlocal finished, errors
+            try:
+                rec = await loop.run_in_executor(pool, simulate_session, i, seed, conditions,
+                                                 donor, corpus, latency)
+            except Exception as e:
+                errors += 1
+                print(f"Session {i} failed: {e}")
+                return
+            finally:
+                sem.release()
+            # Written from the event loop thread only, one line per session
+            out.write(dumps(rec) + b'\n')
+            out.flush()
+            finished += 1
+            counts[rec['condition']] += 1
+            accepted[rec['condition']] += rec['accepted']
+            if progress_every and finished % progress_every == 0:
+                rate = finished / (time.monotonic() - start)
+                print(f"  {finished}/{len(todo)} done ({rate:.1f} sessions/sec)")
+
+        tasks = []
+        for i in todo:
+            await sem.acquire()
+            tasks.append(asyncio.create_task(one(i)))
+        await asyncio.gather(*tasks)
+
+    elapsed = time.monotonic() - start
+    return {
+        'completed': finished,
+        'errors': errors,
+        'previously_completed': len(done),
+        'by_condition': counts,
+        'acceptance_rate': {c: round(accepted[c] / counts[c], 3) if counts[c] else None for c in conditions},
+        'elapsed_sec': round(elapsed, 2)
+    }
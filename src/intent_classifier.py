@@ -0,0 +1,258 @@
+"""
+Learned Intent Classifier (hashed n-grams + linear heads)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import re
+import threading
+import zlib
+import numpy as np
+
+from src.config import Config
+from src.records import RejectionInfo, RejectionType, SentimentLabel
+from src.rejection_detector import resolve_rejection
+
+
+REJECTION_TYPES = tuple(RejectionType)
+BINARY_HEADS = ('trust_concern', 'is_acceptance', 'is_curiosity', 'is_polite_exit')
+
+# Output columns: rejection-type logits | binary logits | sentiment
+N_REJ = len(REJECTION_TYPES)
+BIN_SLICE = slice(N_REJ, N_REJ + len(BINARY_HEADS))
+SENT_COL = N_REJ + len(BINARY_HEADS)
+N_OUT = SENT_COL + 1
+
+TOKEN_RE = re.compile(r"[a-z0-9₹']+|[?!]")
+SENTIMENT_DEADBAND = 0.05   # |score| below this is labelled neutral
+
+
+# ---- Features ----
+def _hash(s: str, dim: int) -> int:
+    # crc32 is stable across processes (unlike hash())
+    return zlib.crc32(s.encode('utf-8')) % dim
+
+
+def featurize(msgs: Sequence[str], dim: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hashed word uni/bigrams and in-word character 4-grams, L2-normalised.
+
+    Returns a CSR-style (cols, vals, indptr) triple: row i owns
+    cols[indptr[i]:indptr[i+1]].
+    """
+    cols: List[int] = []
+    vals: List[float] = []
+    indptr = [0]
+    for msg in msgs:
+        toks = TOKEN_RE.findall(msg.lower())
+        feats = {0}   # bias
+        feats.update(_hash('w:' + t, dim) for t in toks)
+        feats.update(_hash('b:' + a + ' ' + b, dim) for a, b in zip(toks, toks[1:]))
+        for t in toks:
+            if len(t) > 4:
+                padded = f'<{t}>'
+                feats.update(_hash('c:' + padded[i:i + 4], dim) for i in range(len(padded) - 3))
+        cols.extend(feats)
+        vals.extend([1.0 / np.sqrt(len(feats))] * len(feats))
+        indptr.append(len(cols))
+    return np.array(cols, dtype=np.int64), np.array(vals, dtype=np.float32), np.array(indptr, dtype=np.int64)
+
+
+def _scores(W: np.ndarray, b: np.ndarray, cols: np.ndarray, vals: np.ndarray,
+            indptr: np.ndarray) -> np.ndarray:
+    # Sparse (rows x dim) @ dense (dim x N_OUT), one gather + segmented sum
+    contrib = W[cols] * vals[:, None]
+    return np.add.reduceat(contrib, indptr[:-1], axis=0) + b
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+# ---- Model ----
+class IntentModel:
+    """All heads share one weight matrix, so a message is scored in one pass."""
+
+    def __init__(self, W: np.ndarray, b: np.ndarray):
+        self.W = W
+        self.b = b
+        self.dim = W.shape[0]
+
+    @classmethod
+    def empty(cls, dim: Optional[int] = None) -> 'IntentModel':
+        dim = dim or 2 ** Config.INTENT_HASH_BITS
+        return cls(np.zeros((dim, N_OUT), dtype=np.float32), np.zeros(N_OUT, dtype=np.float32))
+
+    def predict(self, msgs: Sequence[str]) -> Dict[str, np.ndarray]:
+        cols, vals, indptr = featurize(msgs, self.dim)
+        z = _scores(self.W, self.b, cols, vals, indptr)
+        return {
+            'rejection': _softmax(z[:, :N_REJ]),
+            'binary': _sigmoid(z[:, BIN_SLICE]),
+            'sentiment': np.tanh(z[:, SENT_COL])
+        }
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path, W=self.W, b=self.b,
+            rejection_types=np.array([str(r) for r in REJECTION_TYPES]),
+            binary_heads=np.array(BINARY_HEADS)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'IntentModel':
+        data = np.load(path)
+        if (data['rejection_types'].tolist() != [str(r) for r in REJECTION_TYPES]
+                or data['binary_heads'].tolist() != list(BINARY_HEADS)):
+            raise ValueError(f"{path} was trained for a different label set; retrain it")
+        return cls(data['W'], data['b'])
+
+
+# ---- Training ----
+def _targets(infos: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rej = np.array([REJECTION_TYPES.index(RejectionType(i['rejection_type'])) for i in infos])
+    binary = np.array([[float(bool(i.get(h, False))) for h in BINARY_HEADS] for i in infos])
+    sent = np.array([float(i['sentiment_score']) for i in infos])
+    return rej, binary, sent
+
+
+def train(msgs: Sequence[str], infos: Sequence[Dict], epochs: int = 8, lr: float = 0.5,
+          l2: float = 1e-6, batch_size: int = 64, seed: int = 0,
+          dim: Optional[int] = None) -> IntentModel:
+    """
+    Fit all heads jointly with mini-batch Adagrad.
+
+    Losses: softmax cross-entropy (rejection type), logistic (binary flags),
+    squared error on tanh output (sentiment score).
+    """
+    model = IntentModel.empty(dim)
+    W, b = model.W, model.b
+    G = np.full_like(W, 1e-8)
+    Gb = np.full_like(b, 1e-8)
+    rej, binary, sent = _targets(infos)
+    cols, vals, indptr = featurize(msgs, model.dim)
+    rng = np.random.default_rng(seed)
+
+    n = len(msgs)
+    for _ in range(epochs):
+        order = rng.permutation(n)
+        for start in range(0, n, batch_size):
+            rows = order[start:start + batch_size]
+            # Gather this batch's sparse rows
+            lens = indptr[rows + 1] - indptr[rows]
+            idx = np.concatenate([np.arange(indptr[r], indptr[r + 1]) for r in rows])
+            bcols, bvals = cols[idx], vals[idx]
+            bptr = np.concatenate([[0], np.cumsum(lens)])
+
+            z = _scores(W, b, bcols, bvals, bptr)
+            grad = np.empty_like(z)
+            p = _softmax(z[:, :N_REJ])
+            p[np.arange(len(rows)), rej[rows]] -= 1.0
+            grad[:, :N_REJ] = p
+            grad[:, BIN_SLICE] = _sigmoid(z[:, BIN_SLICE]) - binary[rows]
+            t = np.tanh(z[:, SENT_COL])
+            grad[:, SENT_COL] = (t - sent[rows]) * (1.0 - t * t)
+            grad /= len(rows)
+
+            # Scatter back onto the touched weight rows
+            row_of = np.repeat(np.arange(len(rows)), lens)
+            gW = grad[row_of] * bvals[:, None]
+            uniq, inv = np.unique(bcols, return_inverse=True)
+            g = np.zeros((len(uniq), N_OUT), dtype=np.float32)
+            np.add.at(g, inv, gW)
+            g += l2 * W[uniq]
+            G[uniq] += g * g
+            W[uniq] -= lr * g / np.sqrt(G[uniq])
+
+            gb = grad.sum(axis=0)
+            Gb += gb * gb
+            b -= lr * gb / np.sqrt(Gb)
+    return model
+
+
+def evaluate(model: IntentModel, msgs: Sequence[str], infos: Sequence[Dict]) -> Dict:
+    rej, binary, sent = _targets(infos)
+    out = model.predict(msgs)
+    result = {'n': len(msgs), 'rejection_type_acc': round(float((out['rejection'].argmax(1) == rej).mean()), 3)}
+    pred_bin = out['binary'] > 0.5
+    for j, head in enumerate(BINARY_HEADS):
+        result[f'{head}_acc'] = round(float((pred_bin[:, j] == binary[:, j].astype(bool)).mean()), 3)
+    result['sentiment_mae'] = round(float(np.abs(out['sentiment'] - sent).mean()), 3)
+    return result
+
+
+# ---- Detector backend ----
+class IntentDetector:
+    """
+    Drop-in alternative to RejectionDetector: same detect / detect_batch
+    interface and RejectionInfo output, one matrix pass per batch.
+    """
+
+    def __init__(self, model: IntentModel, path: str = ''):
+        self.model = model
+        # Managers sharing a model can be classified in one batch
+        self.batch_key = ('learned', path)
+
+    def detect(self, user_message: str) -> RejectionInfo:
+        return self.detect_batch([user_message])[0]
+
+    def detect_batch(self, user_messages: List[str]) -> List[RejectionInfo]:
+        if not user_messages:
+            return []
+        out = self.model.predict([m.strip() for m in user_messages])
+        probs = out['rejection']
+        types = probs.argmax(axis=1)
+        flags = out['binary'] > 0.5
+        sentiment = out['sentiment']
+
+        infos = []
+        for i in range(len(user_messages)):
+            trust, accept, curious, polite = flags[i].tolist()
+            if accept:
+                # Same shape as the rule-based acceptance result
+                infos.append(RejectionInfo(RejectionType.NONE, 0.0, False, 0.9,
+                                           SentimentLabel.POSITIVE, True, False, False))
+                continue
+
+            rtype = REJECTION_TYPES[types[i]]
+            conf = 0.0
+            if rtype in (RejectionType.EXPLICIT, RejectionType.SOFT, RejectionType.AMBIGUOUS):
+                conf = round(float(probs[i, types[i]]), 3)
+            if rtype == RejectionType.CURIOSITY or (curious and rtype == RejectionType.AMBIGUOUS):
+                # Derived from the curiosity flag below, as the rules do
+                rtype, conf = RejectionType.NONE, 0.0
+
+            score = float(sentiment[i])
+            if score > SENTIMENT_DEADBAND:
+                label = SentimentLabel.POSITIVE
+            elif score < -SENTIMENT_DEADBAND:
+                label = SentimentLabel.NEGATIVE
+            else:
+                label = SentimentLabel.NEUTRAL
+
+            rtype, conf, score = resolve_rejection(rtype, conf, curious, score)
+            infos.append(RejectionInfo(rtype, conf, trust, score, label, False, curious, polite))
+        return infos
+
+
+_models: Dict[str, IntentModel] = {}
+_models_lock = threading.Lock()
+
+
+def load_detector(path: Optional[str] = None) -> IntentDetector:
+    """IntentDetector over a process-wide cached model (loaded once per path)."""
+    path = path or os.path.join("notebooks", Config.INTENT_MODEL_FILE)
+    model = _models.get(path)
+    if model is None:
+        with _models_lock:
+            model = _models.get(path)
+            if model is None:
+                model = _models[path] = IntentModel.load(path)
+    return IntentDetector(model, path)
@@ -0,0 +1,207 @@
+"""
+Per-Turn Write-Ahead Journal (crash recovery)
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import threading
+
+from src.config import Config
+from src.dialogue_manager import DialogueManager
+from src.records import RejectionInfo
+from src.replay import ReplayStrategyAdapter
+from src.serialization import dumps, loads
+
+
+def journal_path() -> str:
+    # One journal per worker process in sharded deployments
+    shard = os.getenv("SHARD_ID")
+    name = Config.JOURNAL_FILE
+    if shard:
+        root, ext = os.path.splitext(name)
+        name = f"{root}.{shard}{ext}"
+    return os.path.join("notebooks", name)
+
+
+class Journal:
+    """
+    Append-only JSONL of session events:
+
+      {"t": "start", "jid", "sid", "condition", "ctx", "weights"}
+      {"t": "turn",  "jid", "turn", "user", "info", "dp", "dt", "strategy", "agent", "reason"}
+      {"t": "end",   "jid"}   (session written to the dialogue log)
+
+    `jid` identifies one DialogueManager; a reset session keeps its
+    session_id but gets a new jid.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._f = None
+        self.appended = 0
+        self.compactions = 0
+
+    def _append(self, rec: Dict):
+        line = dumps(rec) + b'\n'
+        with self._lock:
+            if self._f is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._f = open(self.path, 'ab')
+                if self._f.tell() and not self._ends_with_newline():
+                    self._f.write(b'\n')   # seal a torn record from a crash
+            self._f.write(line)
+            self._f.flush()
+            if Config.JOURNAL_FSYNC:
+                os.fsync(self._f.fileno())
+            self.appended += 1
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    # ---- Writers (called by DialogueManager) ----
+    def session_started(self, dm: DialogueManager) -> str:
+        jid = os.urandom(8).hex()
+        self._append({
+            't': 'start', 'jid': jid, 'sid': dm.session_id,
+            'condition': dm.condition, 'ctx': dm.ctx,
+            'weights': dm.strategy._w
+        })
+        return jid
+
+    def turn(self, dm: DialogueManager, plan, agent_resp: Optional[str] = None):
+        self._append({
+            't': 'turn', 'jid': dm.journal_id, 'turn': dm.turn,
+            'user': plan.user_msg, 'info': plan.rej_info.to_dict(),
+            'dp': plan.delta_p, 'dt': plan.delta_t,
+            'strategy': plan.chosen, 'agent': agent_resp,
+            'reason': dm.outcome if plan.stop else None
+        })
+
+    def session_ended(self, dm: DialogueManager):
+        if dm.journal_id is not None:
+            self._append({'t': 'end', 'jid': dm.journal_id})
+
+    # ---- Recovery ----
+    def read(self) -> Tuple[Dict[str, Dict], Dict[str, List[Dict]], set]:
+        starts: Dict[str, Dict] = {}
+        turns: Dict[str, List[Dict]] = {}
+        ended = set()
+        if not os.path.exists(self.path):
+            return starts, turns, ended
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    rec = loads(line)
+                except ValueError:
+                    continue   # torn last line from a crash mid-write
+                jid = rec.get('jid')
+                if rec.get('t') == 'start':
+                    starts[jid] = rec
+                    turns[jid] = []
+                elif rec.get('t') == 'turn' and jid in turns:
+                    turns[jid].append(rec)
+                elif rec.get('t') == 'end':
+                    ended.add(jid)
+        return starts, turns, ended
+
+    def recover(self, priors_for: Optional[Callable[[Dict], object]] = None,
+                pool_for: Optional[Callable[[Dict], object]] = None,
+                **dm_kwargs) -> Dict[str, DialogueManager]:
+        """
+        Rebuild every session that had not been written to the dialogue log.
+
+        dm_kwargs are passed to DialogueManager (client, aggregates, ...);
+        priors_for(donation_ctx) and pool_for(donation_ctx) supply each
+        session's campaign priors and response pool.
+        """
+        starts, turns, ended = self.read()
+        sessions: Dict[str, DialogueManager] = {}
+        for jid, start in starts.items():   # file order: a reset's newer jid wins
+            if jid in ended:
+                sessions.pop(start['sid'], None)
+                continue
+            try:
+                priors = priors_for(start['ctx']) if priors_for is not None else None
+                pool = pool_for(start['ctx']) if pool_for is not None else None
+                sessions[start['sid']] = restore_session(start, turns[jid], self, priors,
+                                                         pool=pool, **dm_kwargs)
+            except Exception as e:
+                print(f"Could not recover session {start.get('sid')}: {e}")
+        return sessions
+
+    # ---- Compaction ----
+    def compact(self) -> int:
+        """
+        Drop every journal record of sessions already written to the
+        dialogue log. Returns the records kept.
+
+        Sessions are saved by their owner (under the session's lock) before
+        this runs; see retire_sessions in backend/main.py.
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                return 0
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+            with open(self.path, 'rb') as f:
+                lines = f.readlines()
+
+            recs = []
+            ended = set()
+            for line in lines:
+                try:
+                    rec = loads(line)
+                except ValueError:
+                    continue
+                recs.append((rec.get('jid'), line))
+                if rec.get('t') == 'end':
+                    ended.add(rec.get('jid'))
+
+            kept = [line for jid, line in recs if jid not in ended]
+            tmp = self.path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.writelines(kept)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.compactions += 1
+            return len(kept)
+
+    def snapshot(self) -> Dict:
+        return {'path': self.path, 'appended': self.appended, 'compactions': self.compactions}
+
+
+def restore_session(start: Dict, turns: List[Dict], journal: Optional[Journal] = None,
+                    priors=None, **dm_kwargs) -> DialogueManager:
+    """
+    Re-apply journaled turns to a fresh DialogueManager.
+
+    Logged rejection info and strategies are applied directly (no detector,
+    sampling or LLM calls), so trackers, weights and guardrails end up in
+    the same state as before the crash.
+    """
+    dm = DialogueManager(start['condition'], start['ctx'], **dm_kwargs)
+    dm.session_id = start['sid']
+    if start['condition'] != 'C1':
+        dm.strategy = ReplayStrategyAdapter(
+            [t['strategy'] for t in turns if t.get('strategy')], start.get('weights')
+        )
+    dm.start()
+
+    for t in turns:
+        dm.turn += 1
+        plan = dm._advance(t['user'], RejectionInfo.from_dict(t['info']))
+        if plan.stop:
+            break
+        dm._finish(plan, t['agent'])
+        dm.agent.remember(t['user'], t['agent'])
+
+    # Outcomes were already reported to the priors before the crash
+    dm.priors = priors
+    dm.journal = journal
+    dm.journal_id = start['jid']
+    return dm
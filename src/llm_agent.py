@@ -2,51 +2,72 @@
 LLM Agent for Response Generation
 """
 
-from typing import Dict
+from typing import Callable, Dict, Optional
 import os
 from huggingface_hub import InferenceClient
 from src.config import Config
+from src.local_model import get_local_generator, inference_mode
+from src.memory import ConversationMemory
 
 
 class LLMAgent:
-    def __init__(self, donation_ctx: Dict, use_local_model: bool = False, client=None):
+    def __init__(self, donation_ctx: Dict, use_local_model: bool = False, client=None, pool=None):
         self.ctx = donation_ctx
-        self.conversation_memory = []
+        self.memory = ConversationMemory()
         self.use_local_model = use_local_model
         self.client = client
+        self.pool = pool   # optional ResponsePool (src/response_pool.py)
 
     def generate(self, strategy: str, user_msg: str, turn: int,
-                is_recovery: bool, sentiment: str) -> str:
+                is_recovery: bool, sentiment: str,
+                on_delta: Optional[Callable[[str], None]] = None) -> str:
+        # Early generic turns may already have a pre-generated reply
+        response = None
+        if self.pool is not None:
+            response = self.pool.take(strategy, user_msg, turn, is_recovery, sentiment)
+        if response is None:
+            prompt = self.build_prompt(strategy, user_msg, turn, is_recovery, sentiment)
+            response = self.complete(prompt, strategy, is_recovery, on_delta)
+        elif on_delta is not None:
+            on_delta(response)
+        self.remember(user_msg, response)
+        return response
 
-        # Build conversation context
-        recent_history = self.conversation_memory[-3:] if len(self.conversation_memory) > 0 else []
-        history_str = ""
-        for h in recent_history:
-            history_str += f"User: {h['user']}\nAgent: {h['agent']}\n"
+    # ---- Generation stages (used separately for speculative generation) ----
+    def build_prompt(self, strategy: str, user_msg: str, turn: int,
+                     is_recovery: bool, sentiment: str) -> str:
+        # Build conversation context (summary of older turns + recent window)
+        history_str = self.memory.render()
 
-        # Build prompt
         if is_recovery:
-            prompt = self._recovery_prompt(user_msg, history_str, sentiment)
-        else:
-            prompt = self._strategy_prompt(strategy, user_msg, history_str, turn, sentiment)
-
-        # Generate
+            return self._recovery_prompt(user_msg, history_str, sentiment)
+        return self._strategy_prompt(strategy, user_msg, history_str, turn, sentiment)
+
+    def complete(self, prompt: str, strategy: str, is_recovery: bool,
+                 on_delta: Optional[Callable[[str], None]] = None,
+                 fallback: bool = True) -> Optional[str]:
+        # No side effects on the agent, so it is safe to run speculatively.
+        # on_delta (optional) receives text chunks as they are generated.
+        # On a failed call: the canned fallback reply, or None if fallback=False.
         try:
             if self.use_local_model:
-                response = self._generate_local(prompt)
-            else:
-                response = self._generate_api(prompt)
+                text = self._generate_local(prompt)
+                if on_delta is not None:
+                    on_delta(text)
+                return text
+            if on_delta is not None:
+                return self._stream_api(prompt, on_delta)
+            return self._generate_api(prompt)
         except Exception as e:
             print(f"Generation error: {e}")
-            response = self._fallback(strategy, is_recovery)
+            return self._fallback(strategy, is_recovery) if fallback else None
 
-        # Store in memory
-        self.conversation_memory.append({
-            'user': user_msg,
-            'agent': response
-        })
+    def remember(self, user_msg: str, response: str):
+        self.memory.add(user_msg, response)
 
-        return response
+    @property
+    def conversation_memory(self):
+        return self.memory.recent()
 
     def _strategy_prompt(self, strategy: str, user_msg: str, history: str,
                         turn: int, sentiment: str) -> str:
@@ -104,9 +125,17 @@ Keep under 40 words. Rebuild trust, NOT donation.
 Your response:"""
 
     def _generate_local(self, prompt: str) -> str:
-        # This would use local model if available
-        # For now, fallback to API
-        return self._generate_api(prompt)
+        if inference_mode() is None:
+            # No in-process model opted in; fallback to API
+            return self._generate_api(prompt)
+        # Loaded once per process (see Config.LOCAL_INFERENCE_MODE)
+        return get_local_generator().generate(self._messages(prompt))
+
+    def _messages(self, prompt: str):
+        return [
+            {"role": "system", "content": "You are a helpful, polite fundraising assistant."},
+            {"role": "user", "content": prompt}
+        ]
 
     def _generate_api(self, prompt: str) -> str:
         if not self.client:
@@ -114,15 +143,33 @@ Your response:"""
         
         response = self.client.chat.completions.create(
             model=Config.MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are a helpful, polite fundraising assistant."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=self._messages(prompt),
             max_tokens=Config.MAX_NEW_TOKENS,
             temperature=Config.TEMPERATURE,
         )
         return response.choices[0].message.content.strip()
 
+    def _stream_api(self, prompt: str, on_delta: Callable[[str], None]) -> str:
+        if not self.client:
+            raise ValueError("Client not initialized")
+
+        stream = self.client.chat.completions.create(
+            model=Config.MODEL_NAME,
+            messages=self._messages(prompt),
+            max_tokens=Config.MAX_NEW_TOKENS,
+            temperature=Config.TEMPERATURE,
+            stream=True,
+        )
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                parts.append(text)
+                on_delta(text)
+        return "".join(parts).strip()
+
     def _fallback(self, strategy: str, is_recovery: bool) -> str:
         if is_recovery:
             return "I apologize if I seemed pushy. There's no pressure at all - I'm happy to answer any questions you have."
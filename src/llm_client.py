@@ -0,0 +1,189 @@
+"""
+Resilient LLM Client (shared connection pool, retries, circuit breaker)
+"""
+
+from types import SimpleNamespace
+from typing import Dict, Optional
+import os
+import random
+import threading
+import time
+from src.config import Config
+
+
+TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the endpoint while the breaker is open."""
+
+
+def is_transient(err: Exception) -> bool:
+    status = getattr(getattr(err, 'response', None), 'status_code', None)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    if isinstance(err, (TimeoutError, ConnectionError)):
+        return True
+    # requests / httpx transport errors, without importing either
+    name = type(err).__name__
+    return 'Timeout' in name or 'Connect' in name or 'Protocol' in name
+
+
+class CircuitBreaker:
+    """
+    closed    -> calls go through; consecutive transient failures are counted
+    open      -> calls fail fast for `reset_timeout` seconds
+    half_open -> one probe call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.failure_threshold = failure_threshold or Config.BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or Config.BREAKER_RESET_TIMEOUT
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.trips = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self.probe_in_flight = False
+            if self.state == 'half_open' and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def release(self):
+        # Call finished without saying anything about endpoint health
+        # (e.g. a 4xx); let the next call probe again if half-open
+        with self._lock:
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.probe_in_flight = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            retry_in = 0.0
+            if self.state == 'open':
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'trips': self.trips,
+                'short_circuited': self.short_circuited,
+                'retry_in_sec': round(retry_in, 1)
+            }
+
+
+class ResilientClient:
+    """
+    Wraps a chat-completions client (same `client.chat.completions.create`
+    interface) with jittered-backoff retries and a circuit breaker.
+    """
+
+    def __init__(self, client, breaker: Optional[CircuitBreaker] = None,
+                 max_retries: Optional[int] = None):
+        self.client = client
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.retries = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter" exponential backoff
+        cap = min(Config.LLM_BACKOFF_CAP, Config.LLM_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def create(self, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpen("LLM endpoint circuit is open")
+
+        attempt = 0
+        while True:
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    # Caller error (bad request, auth etc.); not an endpoint health signal
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or self.breaker.state == 'open':
+                    raise
+                self.retries += 1
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            if kwargs.get('stream'):
+                # The outcome is only known once the stream has been read
+                return self._watch_stream(response)
+            self.breaker.record_success()
+            return response
+
+    def _watch_stream(self, stream):
+        received = False
+        try:
+            for chunk in stream:
+                received = True
+                yield chunk
+        except GeneratorExit:
+            # Caller stopped reading early
+            if received:
+                self.breaker.record_success()
+            else:
+                self.breaker.release()
+            raise
+        except Exception as e:
+            if is_transient(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        self.breaker.record_success()
+
+    def snapshot(self) -> Dict:
+        return {'breaker': self.breaker.snapshot(), 'retries': self.retries}
+
+
+# ---- One pooled client per process ----
+_shared: Dict[int, ResilientClient] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_client(api_key: str) -> ResilientClient:
+    """
+    Return this process's ResilientClient, creating it on first use.
+
+    Keyed by pid so forked workers never reuse the parent's connections.
+    """
+    pid = os.getpid()
+    client = _shared.get(pid)
+    if client is None:
+        with _shared_lock:
+            client = _shared.get(pid)
+            if client is None:
+                from huggingface_hub import InferenceClient
+                inner = InferenceClient(api_key=api_key, timeout=Config.LLM_TIMEOUT)
+                client = _shared[pid] = ResilientClient(inner)
+    return client
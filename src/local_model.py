@@ -0,0 +1,174 @@
+"""
+Local CPU Generator (float / int8 / ONNX)
+"""
+
+from typing import Dict, List, Optional
+import os
+import shutil
+import tempfile
+import threading
+import time
+from src.config import Config
+
+
+INFERENCE_MODES = ('float', 'int8', 'onnx')
+
+
+def inference_mode() -> Optional[str]:
+    """The opted-in mode (env LOCAL_INFERENCE_MODE, else Config); None = use the API."""
+    return os.getenv("LOCAL_INFERENCE_MODE") or Config.LOCAL_INFERENCE_MODE
+
+
+def onnx_cache_path(model_name: str) -> str:
+    return os.path.join(Config.LOCAL_ONNX_CACHE_DIR, model_name.replace('/', '--'))
+
+
+def _rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        import resource
+        # Peak RSS (kilobytes on Linux); good enough when psutil is missing
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LocalGenerator:
+    """
+    Small instruction model run in-process on CPU.
+
+    mode:
+      float -> plain float32 weights
+      int8  -> torch dynamic quantization of every nn.Linear (qint8)
+      onnx  -> exported ONNX graph on onnxruntime (needs `optimum[onnxruntime]`)
+    """
+
+    def __init__(self, model_name: Optional[str] = None, mode: Optional[str] = None):
+        self.model_name = model_name or Config.LOCAL_MODEL_NAME
+        self.mode = mode or inference_mode()
+        if self.mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown LOCAL_INFERENCE_MODE '{self.mode}' (expected one of {INFERENCE_MODES})")
+
+        # One generate() at a time: torch already uses every intra-op thread,
+        # so concurrent calls only thrash the cores.
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.new_tokens = 0
+        self.gen_seconds = 0.0
+
+        rss_before = _rss_mb()
+        start = time.monotonic()
+        self._load()
+        self.load_sec = time.monotonic() - start
+        self.rss_mb = _rss_mb()
+        self.model_mb = self.rss_mb - rss_before
+
+    def _load(self):
+        import torch
+        from transformers import AutoTokenizer
+
+        if Config.LOCAL_NUM_THREADS:
+            torch.set_num_threads(Config.LOCAL_NUM_THREADS)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        if self.tokenizer.pad_token_id is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        if self.mode == 'onnx':
+            try:
+                from optimum.onnxruntime import ORTModelForCausalLM
+            except ImportError:
+                raise ImportError("LOCAL_INFERENCE_MODE='onnx' requires `pip install optimum[onnxruntime]`")
+            self.model = self._load_onnx(ORTModelForCausalLM)
+            return
+
+        from transformers import AutoModelForCausalLM
+        model = AutoModelForCausalLM.from_pretrained(self.model_name, torch_dtype=torch.float32)
+        model.eval()
+        if self.mode == 'int8':
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def _load_onnx(self, model_cls):
+        # Exporting takes minutes; do it once and load the saved graph after
+        path = onnx_cache_path(self.model_name)
+        if os.path.isdir(path):
+            return model_cls.from_pretrained(path)
+
+        model = model_cls.from_pretrained(self.model_name, export=True)
+        os.makedirs(Config.LOCAL_ONNX_CACHE_DIR, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=Config.LOCAL_ONNX_CACHE_DIR)
+        try:
+            model.save_pretrained(tmp)
+            os.replace(tmp, path)
+        except OSError as e:
+            # Another process got there first, or the disk is read-only
+            print(f"Could not cache ONNX export at {path}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+        return model
+
+    def generate(self, messages: List[Dict], max_new_tokens: Optional[int] = None,
+                 temperature: Optional[float] = None) -> str:
+        import torch
+
+        max_new_tokens = max_new_tokens or Config.MAX_NEW_TOKENS
+        temperature = Config.TEMPERATURE if temperature is None else temperature
+
+        inputs = self.tokenizer.apply_chat_template(
+            messages, add_generation_prompt=True, return_tensors='pt', return_dict=True
+        )
+        kwargs = dict(max_new_tokens=max_new_tokens, pad_token_id=self.tokenizer.pad_token_id)
+        if temperature > 0:
+            kwargs.update(do_sample=True, temperature=temperature)
+        else:
+            kwargs.update(do_sample=False)
+
+        with self._lock:
+            start = time.monotonic()
+            with torch.inference_mode():
+                output = self.model.generate(**inputs, **kwargs)
+            dt = time.monotonic() - start
+
+            new = output[0, inputs['input_ids'].shape[1]:]
+            self.calls += 1
+            self.new_tokens += int(new.shape[0])
+            self.gen_seconds += dt
+
+        return self.tokenizer.decode(new, skip_special_tokens=True).strip()
+
+    def stats(self) -> Dict:
+        return {
+            'model': self.model_name,
+            'mode': self.mode,
+            'load_sec': round(self.load_sec, 2),
+            'rss_mb': round(self.rss_mb, 1),
+            'model_mb': round(self.model_mb, 1),
+            'calls': self.calls,
+            'new_tokens': self.new_tokens,
+            'tokens_per_sec': round(self.new_tokens / self.gen_seconds, 1) if self.gen_seconds else None
+        }
+
+
+# ---- One loaded model, shared by forked workers ----
+_generator: Optional[LocalGenerator] = None
+_generator_lock = threading.Lock()
+
+
+def get_local_generator() -> LocalGenerator:
+    """
+    Return the LocalGenerator, loading it on first use.
+
+    Weights are read-only, so workers forked after loading (see
+    start_backend_prefork.py) keep sharing the parent's pages.
+    """
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = LocalGenerator()
+                print(f"✓ Local model loaded: {_generator.stats()}")
+    return _generator
+
+
+def local_model_stats() -> Optional[Dict]:
+    return _generator.stats() if _generator is not None else None
@@ -0,0 +1,173 @@
+"""
+Conversation Memory Module
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+from src.config import Config
+
+
+# Words that carry no topic; left out of the rolling summary
+STOPWORDS = frozenset("""
+a an the and or but if so to of in on for with at by from as into about
+is are was were be been am do does did have has had will would can could should
+i me my you your we our us they them their he she it its this that these those
+not no yes just very really also more some any all what how why when where which who
+im i'm it's don't dont there here then than whether ok okay
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; cheap and tokenizer-free
+    return max(1, (len(text) + 3) // 4)
+
+
+def content_words(text: str) -> List[str]:
+    words = (w.strip(".,!?;:\"'()[]").lower() for w in text.split())
+    return [w for w in words if len(w) > 1 and w not in STOPWORDS]
+
+
+class ConversationMemory:
+    """
+    Token-budgeted window of recent exchanges plus a rolling summary.
+
+    Recent exchanges are kept verbatim while they fit in
+    Config.MEMORY_TOKEN_BUDGET. When the window slides, the evicted
+    exchanges are compacted into one-line digests. When the digests
+    outgrow Config.SUMMARY_TOKEN_BUDGET, the oldest are folded into a
+    rolling topic line: content words of both sides, counted over every
+    folded exchange, most frequent first, then oldest (newer words are
+    still in the digests). Only the lowest-ranked words fall off that
+    line, never whole exchanges. Each side tracks at most
+    Config.SUMMARY_MAX_TOPICS words; the rarest, least recently seen
+    ones are forgotten first, so memory stays constant per session.
+    An exchange that alone exceeds the token budget is clipped.
+    The rendered summary is cached and only rebuilt after an eviction.
+    """
+
+    def __init__(self, token_budget: int = None, summary_budget: int = None):
+        self.token_budget = Config.MEMORY_TOKEN_BUDGET if token_budget is None else token_budget
+        self.summary_budget = Config.SUMMARY_TOKEN_BUDGET if summary_budget is None else summary_budget
+
+        self.window: Deque[Tuple[str, str, int]] = deque()
+        self.window_tokens = 0
+
+        # (digest, cost, user content words, agent content words)
+        self.digests: Deque[Tuple[str, int, List[str], List[str]]] = deque()
+        self.digest_tokens = 0
+
+        # ---- Rolling topic summary: word -> (count, first, last folded exchange) ----
+        self.user_topics: Dict[str, Tuple[int, int, int]] = {}
+        self.agent_topics: Dict[str, Tuple[int, int, int]] = {}
+        self.folded = 0          # exchanges merged into the topic line
+        self._topics = ""
+        self._topics_tokens = 0
+        self.total = 0
+
+        self._summary = ""
+        self._dirty = False
+
+    def add(self, user_msg: str, agent_msg: str):
+        cost = estimate_tokens(user_msg) + estimate_tokens(agent_msg)
+        if cost > self.token_budget:
+            # The newest exchange is always kept, so it must fit on its own
+            user_msg = self._fit(user_msg, max(self.token_budget // 2,
+                                               self.token_budget - estimate_tokens(agent_msg)))
+            agent_msg = self._fit(agent_msg, self.token_budget - estimate_tokens(user_msg))
+            cost = estimate_tokens(user_msg) + estimate_tokens(agent_msg)
+        self.window.append((user_msg, agent_msg, cost))
+        self.window_tokens += cost
+        self.total += 1
+
+        # ---- Slide the window (always keep the newest exchange) ----
+        while self.window_tokens > self.token_budget and len(self.window) > 1:
+            old_user, old_agent, old_cost = self.window.popleft()
+            self.window_tokens -= old_cost
+            self._compact(old_user, old_agent)
+
+    def _compact(self, user_msg: str, agent_msg: str):
+        digest = f"- User: {self._clip(user_msg)} / Agent: {self._clip(agent_msg)}"
+        cost = estimate_tokens(digest)
+        self.digests.append((digest, cost, content_words(user_msg), content_words(agent_msg)))
+        self.digest_tokens += cost
+
+        while self.digest_tokens + self._topics_tokens > self.summary_budget and len(self.digests) > 1:
+            _, dropped, user_words, agent_words = self.digests.popleft()
+            self.digest_tokens -= dropped
+            self._fold(user_words, agent_words)
+
+        self._dirty = True
+
+    def _fold(self, user_words: List[str], agent_words: List[str]):
+        self.folded += 1
+        for topics, words in ((self.user_topics, user_words), (self.agent_topics, agent_words)):
+            for w in words:
+                count, first, _ = topics.get(w, (0, self.folded, 0))
+                topics[w] = (count + 1, first, self.folded)
+            if len(topics) > Config.SUMMARY_MAX_TOPICS:
+                keep = sorted(topics, key=lambda w: (-topics[w][0], -topics[w][2]))
+                for w in keep[Config.SUMMARY_MAX_TOPICS:]:
+                    del topics[w]
+        self._topics = self._render_topics()
+        self._topics_tokens = estimate_tokens(self._topics)
+
+    def _render_topics(self) -> str:
+        # The topic line gets at most half of the summary budget
+        budget = self.summary_budget // 2
+        line = f"- Topics of {self.folded} earlier exchange(s)"
+        ranked = [
+            sorted(topics, key=lambda w: (-topics[w][0], topics[w][1]))
+            for topics in (self.user_topics, self.agent_topics)
+        ]
+        kept = [[], []]
+        for i in range(max(len(r) for r in ranked)):
+            for side in (0, 1):
+                if i < len(ranked[side]):
+                    kept[side].append(ranked[side][i])
+                    text = self._topic_text(line, kept)
+                    if estimate_tokens(text) > budget:
+                        kept[side].pop()
+                        return self._topic_text(line, kept)
+        return self._topic_text(line, kept)
+
+    @staticmethod
+    def _topic_text(line: str, kept: List[List[str]]) -> str:
+        user, agent = kept
+        return f"{line}: user - {', '.join(user) or 'n/a'}; agent - {', '.join(agent) or 'n/a'}"
+
+    @staticmethod
+    def _fit(text: str, tokens: int) -> str:
+        max_chars = 4 * max(1, tokens)
+        if len(text) <= max_chars:
+            return text
+        return text[:max_chars - 4].rsplit(' ', 1)[0] + " ..."
+
+    def _clip(self, text: str) -> str:
+        words = text.split()
+        n = Config.SUMMARY_WORDS_PER_MSG
+        return " ".join(words[:n]) + (" ..." if len(words) > n else "")
+
+    def summary(self) -> str:
+        if self._dirty:
+            lines = []
+            if self.folded:
+                lines.append(self._topics)
+            lines.extend(d for d, _, _, _ in self.digests)
+            self._summary = "\n".join(lines)
+            self._dirty = False
+        return self._summary
+
+    def render(self) -> str:
+        parts = []
+        summary = self.summary()
+        if summary:
+            parts.append(f"Earlier in the conversation:\n{summary}\n")
+        for user_msg, agent_msg, _ in self.window:
+            parts.append(f"User: {user_msg}\nAgent: {agent_msg}\n")
+        return "".join(parts)
+
+    def recent(self) -> List[Dict]:
+        return [{'user': u, 'agent': a} for u, a, _ in self.window]
+
+    def __len__(self) -> int:
+        return self.total
@@ -0,0 +1,264 @@
+"""
+Population-Level Strategy Priors
+"""
+
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import numpy as np
+from src.config import Config
+
+try:
+    import fcntl
+except ImportError:   # Windows: single-process deployments only
+    fcntl = None
+
+
+CONDITIONS = ('C1', 'C2', 'C3')
+OUTCOMES = ('accept', 'curiosity', 'soft', 'explicit')
+
+# (recovery flag, strategy index, outcome index)
+Event = Tuple[int, int, int]
+
+
+def campaign_key(donation_ctx: Dict) -> str:
+    return f"{donation_ctx.get('organization', '')}|{donation_ctx.get('cause', '')}"
+
+
+def classify_outcome(rejection_info: Dict) -> Optional[int]:
+    if rejection_info['is_acceptance']:
+        return 0
+    if rejection_info['is_curiosity']:
+        return 1
+    if rejection_info['rejection_type'] == 'soft':
+        return 2
+    if rejection_info['rejection_type'] == 'explicit':
+        return 3
+    return None
+
+
+def floor_weights(w: np.ndarray, floor: float) -> np.ndarray:
+    """
+    Normalize w to sum to 1 with every entry >= floor. Entries below the
+    floor are pinned to it; the rest share what is left in proportion.
+    """
+    pinned = np.zeros(len(w), dtype=bool)
+    while True:
+        free_mass = 1.0 - floor * pinned.sum()
+        out = np.where(pinned, floor, w * free_mass / w[~pinned].sum())
+        below = ~pinned & (out < floor)
+        if not below.any():
+            return out
+        pinned |= below
+
+
+class StrategyPriors:
+    """
+    Campaign-scoped counts of strategy outcomes across all sessions.
+
+    counts[condition, recovery, strategy, outcome]
+
+    Sessions hand over batches of events through a queue (no lock on the
+    request path); the background flusher folds them in and swaps in a
+    fresh counts array, so readers always see a consistent snapshot.
+    """
+
+    def __init__(self, campaign: str, counts: Optional[np.ndarray] = None):
+        self.campaign = campaign
+        shape = (len(CONDITIONS), 2, len(Config.STRATEGIES), len(OUTCOMES))
+        self.counts = counts if counts is not None else np.zeros(shape, dtype=np.int64)
+        self.persisted = self.counts.copy()   # what the file held when last read
+        self._pending: "queue.SimpleQueue[Tuple[int, List[Event]]]" = queue.SimpleQueue()
+        self.dirty = False
+
+    def submit(self, condition: str, events: List[Event]):
+        if events and condition in CONDITIONS:
+            self._pending.put((CONDITIONS.index(condition), events))
+
+    def flush(self) -> int:
+        batches = []
+        while True:
+            try:
+                batches.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        if not batches:
+            return 0
+
+        cond, rec, strat, out = [], [], [], []
+        for c, events in batches:
+            for r, s, o in events:
+                cond.append(c)
+                rec.append(r)
+                strat.append(s)
+                out.append(o)
+
+        counts = self.counts.copy()
+        np.add.at(counts, (cond, rec, strat, out), 1)
+        self.counts = counts
+        self.dirty = True
+        return len(out)
+
+    def initial_weights(self, condition: str, in_recovery: bool = False) -> Optional[np.ndarray]:
+        if condition not in CONDITIONS:
+            return None
+        c = self.counts[CONDITIONS.index(condition), int(in_recovery)]
+        if c.sum() < Config.PRIOR_MIN_OBSERVATIONS:
+            return None
+
+        accept, curious, soft, explicit = c.T.astype(float)
+        success = accept + 0.5 * curious
+        # Laplace-smoothed success rate per strategy
+        rate = (success + 1.0) / (accept + curious + soft + explicit + 2.0)
+
+        return floor_weights(rate, Config.MIN_STRATEGY_WEIGHT)
+
+    def to_json(self) -> Dict:
+        return {
+            'conditions': list(CONDITIONS),
+            'strategies': list(Config.STRATEGIES),
+            'outcomes': list(OUTCOMES),
+            'counts': self.counts.tolist()
+        }
+
+    @classmethod
+    def from_json(cls, campaign: str, data: Dict) -> 'StrategyPriors':
+        counts = np.array(data['counts'], dtype=np.int64)
+        if (data.get('strategies') != list(Config.STRATEGIES)
+                or data.get('conditions') != list(CONDITIONS)
+                or data.get('outcomes') != list(OUTCOMES)):
+            # Strategy set changed since the file was written; start fresh
+            counts = None
+        return cls(campaign, counts)
+
+
+@contextmanager
+def _file_lock(path: str):
+    # Serializes read-merge-write of the priors file across worker processes
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class PriorRegistry:
+    """
+    Process-wide registry of campaign priors with periodic flush/persist.
+
+    Several worker processes may share one file: persist() re-reads it under
+    a file lock and adds only the counts this process gathered since its
+    last write, then picks up what the other workers added.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.campaigns: Dict[str, StrategyPriors] = {}
+        self._io_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._last_persist = time.monotonic()
+        self._load()
+
+    def for_campaign(self, donation_ctx: Dict) -> StrategyPriors:
+        key = campaign_key(donation_ctx)
+        priors = self.campaigns.get(key)
+        if priors is None:
+            priors = self.campaigns.setdefault(key, StrategyPriors(key))
+        self._ensure_flusher()
+        return priors
+
+    def _ensure_flusher(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+                    atexit.register(self.persist)
+
+    def _run(self):
+        while True:
+            time.sleep(Config.PRIOR_FLUSH_INTERVAL)
+            try:
+                self.flush()
+                if time.monotonic() - self._last_persist >= Config.PRIOR_PERSIST_INTERVAL:
+                    self.persist()
+            except Exception as e:
+                print(f"Strategy prior flush error: {e}")
+
+    def flush(self):
+        with self._io_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        # Only one thread folds batches in at a time (see StrategyPriors)
+        for priors in list(self.campaigns.values()):
+            priors.flush()
+
+    def persist(self):
+        with self._io_lock:
+            self._flush_locked()
+            self._last_persist = time.monotonic()
+            if not any(p.dirty for p in self.campaigns.values()):
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with _file_lock(self.path):
+                on_disk = self._read()
+                for key, priors in list(self.campaigns.items()):
+                    merged = priors.counts - priors.persisted
+                    if key in on_disk:
+                        merged += on_disk[key].counts
+                    else:
+                        merged += priors.persisted   # file missing or reset
+                    # Only the flusher thread (held off by _io_lock) swaps counts
+                    priors.counts = merged
+                    priors.persisted = merged.copy()
+                    on_disk[key] = priors
+                for key, priors in on_disk.items():
+                    self.campaigns.setdefault(key, priors)
+
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump({k: p.to_json() for k, p in on_disk.items()}, f)
+                os.replace(tmp, self.path)
+            for p in self.campaigns.values():
+                p.dirty = False
+
+    def _read(self) -> Dict[str, StrategyPriors]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return {key: StrategyPriors.from_json(key, entry) for key, entry in data.items()}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load strategy priors from {self.path}: {e}")
+            return {}
+
+    def _load(self):
+        self.campaigns.update(self._read())
+
+
+_registry: Optional[PriorRegistry] = None
+
+
+def get_registry() -> PriorRegistry:
+    global _registry
+    if _registry is None:
+        _registry = PriorRegistry(os.path.join("notebooks", Config.PRIORS_FILE))
+    return _registry
+
+
+def persist_registry():
+    """Persist the process-wide registry, if this process made one (for exits that skip atexit)"""
+    if _registry is not None:
+        _registry.persist()
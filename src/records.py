@@ -0,0 +1,126 @@
+"""
+Compact Turn Records and Interned Labels
+"""
+
+from enum import Enum
+from typing import Dict
+from src.config import Config
+
+
+class _StrEnum(str, Enum):
+    # Members compare, hash and serialize exactly like their string value,
+    # so they can be used anywhere the plain strings were used before.
+    __hash__ = str.__hash__
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __format__(self, spec: str) -> str:
+        return format(self.value, spec)
+
+
+class RejectionType(_StrEnum):
+    NONE = 'none'
+    EXPLICIT = 'explicit'
+    SOFT = 'soft'
+    AMBIGUOUS = 'ambiguous'
+    CURIOSITY = 'curiosity'
+
+
+class SentimentLabel(_StrEnum):
+    POSITIVE = 'positive'
+    NEUTRAL = 'neutral'
+    NEGATIVE = 'negative'
+
+
+Strategy = _StrEnum('Strategy', {s: s for s in Config.STRATEGIES})
+
+
+class RejectionInfo:
+    """
+    Slotted replacement for the rejection_info dict.
+
+    Supports item access (info['rejection_type'], info.get(...)) so the
+    trackers, adapter and guardrails read it exactly as before.
+    """
+
+    __slots__ = (
+        'rejection_type',
+        'rejection_confidence',
+        'trust_concern',
+        'sentiment_score',
+        'sentiment_label',
+        'is_acceptance',
+        'is_curiosity',
+        'is_polite_exit',
+    )
+
+    def __init__(self, rejection_type: RejectionType, rejection_confidence: float,
+                 trust_concern: bool, sentiment_score: float,
+                 sentiment_label: SentimentLabel, is_acceptance: bool,
+                 is_curiosity: bool, is_polite_exit: bool):
+        self.rejection_type = rejection_type
+        self.rejection_confidence = rejection_confidence
+        self.trust_concern = trust_concern
+        self.sentiment_score = sentiment_score
+        self.sentiment_label = sentiment_label
+        self.is_acceptance = is_acceptance
+        self.is_curiosity = is_curiosity
+        self.is_polite_exit = is_polite_exit
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> 'RejectionInfo':
+        return cls(
+            RejectionType(d['rejection_type']),
+            d.get('rejection_confidence', 0.0),
+            d['trust_concern'],
+            d['sentiment_score'],
+            SentimentLabel(d['sentiment_label']),
+            d['is_acceptance'],
+            d['is_curiosity'],
+            d.get('is_polite_exit', False),
+        )
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def to_dict(self) -> Dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"RejectionInfo({self.to_dict()!r})"
+
+
+class UserTurn:
+    __slots__ = ('turn', 'msg', 'info')
+    speaker = 'user'
+
+    def __init__(self, turn: int, msg: str, info: RejectionInfo):
+        self.turn = turn
+        self.msg = msg
+        self.info = info
+
+    def to_dict(self) -> Dict:
+        return {'turn': self.turn, 'speaker': 'user', 'msg': self.msg, 'info': self.info.to_dict()}
+
+
+class AgentTurn:
+    __slots__ = ('turn', 'msg', 'strategy')
+    speaker = 'agent'
+
+    def __init__(self, turn: int, msg: str, strategy: Strategy):
+        self.turn = turn
+        self.msg = msg
+        self.strategy = strategy
+
+    def to_dict(self) -> Dict:
+        return {'turn': self.turn, 'speaker': 'agent', 'msg': self.msg, 'strategy': self.strategy}
@@ -5,15 +5,46 @@ Rejection Detection Module
 import re
 from typing import Dict, List, Tuple
 from textblob import TextBlob
+from src.config import Config
+from src.records import RejectionInfo, RejectionType, SentimentLabel
+
+
+def _combine(patterns: List[str]) -> 're.Pattern':
+    # One alternation per pattern list, compiled once at import
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
+
+def resolve_rejection(rejection_type: RejectionType, confidence: float, is_curiosity: bool,
+                      sent_score: float) -> Tuple[RejectionType, float, float]:
+    """
+    Rules shared by every detector backend, applied after the raw
+    explicit/soft decision. Returns (rejection_type, confidence, sent_score).
+    """
+    if is_curiosity and rejection_type == RejectionType.NONE:
+        rejection_type = RejectionType.CURIOSITY
+        sent_score = max(0.2, sent_score)
+
+    if sent_score < -0.4 and rejection_type == RejectionType.NONE:
+        rejection_type = RejectionType.AMBIGUOUS
+        confidence = 0.5
+
+    if sent_score < -0.6 and rejection_type == RejectionType.SOFT:
+        rejection_type = RejectionType.EXPLICIT
+        confidence = 0.85
+
+    return rejection_type, confidence, sent_score
 
 
 class RejectionDetector:
+    # Detectors with the same key can share one detect_batch call
+    batch_key = 'rules'
 
     EXPLICIT_PATTERNS = [
         r'\b(no thanks|no thank you|not interested|don\'t want|won\'t donate)\b',
         r'\b(nope|nah|never|absolutely not|definitely not)\b',
         r'\b(leave me alone|stop asking|not doing|refuse)\b'
     ]
+    EXPLICIT_RE = _combine(EXPLICIT_PATTERNS)
 
     POLITE_EXIT_PATTERNS = [
         r'\b(okay thanks|ok thanks|okay thank you|ok thank you)\b',
@@ -21,6 +52,7 @@ class RejectionDetector:
         r'\b(that\'s all|that is all|nothing else)\b',
         r'\b(i\'m good|all good|we\'re good)\b'
     ]
+    POLITE_EXIT_RE = _combine(POLITE_EXIT_PATTERNS)
 
     SOFT_PATTERNS = [
         r'\b(maybe later|not now|not right now|some other time|another time)\b',
@@ -29,12 +61,14 @@ class RejectionDetector:
         r'\b(can\'t afford|no money|tight budget|broke|expensive)\b',
         r'\b(i\'ll think|let me think|need time|consider)\b'
     ]
+    SOFT_RE = _combine(SOFT_PATTERNS)
 
     TRUST_PATTERNS = [
         r'\b(pushy|aggressive|pressure|uncomfortable|sketchy|scam|fraud)\b',
         r'\b(suspicious|don\'t trust|seems fake|sounds fake)\b',
         r'\b(why are you|what\'s your motive|prove it)\b'
     ]
+    TRUST_RE = _combine(TRUST_PATTERNS)
 
     CURIOSITY_PATTERNS = [
         r'\b(tell me more|tell me about|what about|explain|how does|how do)\b',
@@ -43,6 +77,7 @@ class RejectionDetector:
         r'\b(what is|who are|where does|when|why)\b',
         r'\b(can you|could you|would you.*explain|show me)\b'
     ]
+    CURIOSITY_RE = _combine(CURIOSITY_PATTERNS)
 
     ACCEPTANCE_PATTERNS = [
         r'\b(yes.*i.*donate|i will donate|i\'ll donate|i want to donate)\b',
@@ -52,74 +87,89 @@ class RejectionDetector:
         r'\b(okay.*donate|ok.*donate|sure.*donate|let\'s do it)\b',
         r'\b(take my donation|here\'s my donation|ready to donate)\b'
     ]
+    ACCEPTANCE_RE = _combine(ACCEPTANCE_PATTERNS)
 
     def __init__(self):
         self.sentiment = None
 
-    def detect(self, user_message: str) -> Dict:
+    def detect(self, user_message: str) -> RejectionInfo:
         msg = user_message.lower().strip()
 
         # ---- Polite exit (NOT a refusal) ----
-        is_polite_exit = self._match(msg, self.POLITE_EXIT_PATTERNS)
+        is_polite_exit = self._match(msg, self.POLITE_EXIT_RE)
 
         # ---- Acceptance ----
-        if self._match(msg, self.ACCEPTANCE_PATTERNS):
-            return {
-                'rejection_type': 'none',
-                'rejection_confidence': 0.0,
-                'trust_concern': False,
-                'sentiment_score': 0.9,
-                'sentiment_label': 'positive',
-                'is_acceptance': True,
-                'is_curiosity': False,
-                'is_polite_exit': False
-            }
+        if self._match(msg, self.ACCEPTANCE_RE):
+            return RejectionInfo(
+                rejection_type=RejectionType.NONE,
+                rejection_confidence=0.0,
+                trust_concern=False,
+                sentiment_score=0.9,
+                sentiment_label=SentimentLabel.POSITIVE,
+                is_acceptance=True,
+                is_curiosity=False,
+                is_polite_exit=False
+            )
 
         # Curiosity
-        is_curiosity = self._match(msg, self.CURIOSITY_PATTERNS)
+        is_curiosity = self._match(msg, self.CURIOSITY_RE)
 
         # Rejection
-        rejection_type = 'none'
+        rejection_type = RejectionType.NONE
         confidence = 0.0
 
-        if self._match(msg, self.EXPLICIT_PATTERNS):
-            rejection_type = 'explicit'
+        if self._match(msg, self.EXPLICIT_RE):
+            rejection_type = RejectionType.EXPLICIT
             confidence = 0.9
-        elif self._match(msg, self.SOFT_PATTERNS):
-            rejection_type = 'soft'
+        elif self._match(msg, self.SOFT_RE):
+            rejection_type = RejectionType.SOFT
             confidence = 0.7
 
-        trust_concern = self._match(msg, self.TRUST_PATTERNS)
+        trust_concern = self._match(msg, self.TRUST_RE)
         sent_score, sent_label = self._get_sentiment(user_message)
 
-        if is_curiosity and rejection_type == 'none':
-            rejection_type = 'curiosity'
-            sent_score = max(0.2, sent_score)
-
-        if sent_score < -0.4 and rejection_type == 'none':
-            rejection_type = 'ambiguous'
-            confidence = 0.5
-
-        if sent_score < -0.6 and rejection_type == 'soft':
-            rejection_type = 'explicit'
-            confidence = 0.85
-
-        return {
-            'rejection_type': rejection_type,
-            'rejection_confidence': confidence,
-            'trust_concern': trust_concern,
-            'sentiment_score': sent_score,
-            'sentiment_label': sent_label,
-            'is_acceptance': False,
-            'is_curiosity': is_curiosity,
-            'is_polite_exit': is_polite_exit
-        }
-
-    def _match(self, text: str, patterns: List[str]) -> bool:
-        return any(re.search(p, text, re.IGNORECASE) for p in patterns)
-
-    def _get_sentiment(self, text: str) -> Tuple[float, str]:
+        rejection_type, confidence, sent_score = resolve_rejection(
+            rejection_type, confidence, is_curiosity, sent_score
+        )
+
+        return RejectionInfo(
+            rejection_type=rejection_type,
+            rejection_confidence=confidence,
+            trust_concern=trust_concern,
+            sentiment_score=sent_score,
+            sentiment_label=sent_label,
+            is_acceptance=False,
+            is_curiosity=is_curiosity,
+            is_polite_exit=is_polite_exit
+        )
+
+    def detect_batch(self, user_messages: List[str]) -> List[RejectionInfo]:
+        return [self.detect(m) for m in user_messages]
+
+    def _match(self, text: str, pattern: 're.Pattern') -> bool:
+        return pattern.search(text) is not None
+
+    def _get_sentiment(self, text: str) -> Tuple[float, SentimentLabel]:
         blob = TextBlob(text)
         pol = blob.sentiment.polarity
-        label = 'positive' if pol > 0 else ('negative' if pol < 0 else 'neutral')
+        if pol > 0:
+            label = SentimentLabel.POSITIVE
+        elif pol < 0:
+            label = SentimentLabel.NEGATIVE
+        else:
+            label = SentimentLabel.NEUTRAL
         return pol, label
+
+
+def make_detector(donation_ctx: Dict):
+    """Detector backend for a campaign ('rules' or 'learned')."""
+    backend = donation_ctx.get('detector_backend', Config.DETECTOR_BACKEND)
+    if backend == 'learned':
+        from src.intent_classifier import load_detector
+        try:
+            return load_detector()
+        except (OSError, ValueError) as e:
+            print(f"Learned detector unavailable, using rules: {e}")
+    elif backend != 'rules':
+        print(f"Unknown detector backend '{backend}', using rules")
+    return RejectionDetector()
@@ -0,0 +1,213 @@
+"""
+Offline Replay of Logged Sessions
+"""
+
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional
+import json
+import os
+import time
+
+from src.config import Config
+from src.dialogue_manager import DialogueManager
+from src.strategy_adapter import StrategyAdapter
+
+
+# rejection_info fields compared turn by turn
+INFO_FIELDS = (
+    'rejection_type',
+    'rejection_confidence',
+    'trust_concern',
+    'sentiment_label',
+    'sentiment_score',
+    'is_acceptance',
+    'is_curiosity',
+    'is_polite_exit',
+)
+
+
+class ReplayAgent:
+    """Stands in for LLMAgent: returns the logged agent replies in order."""
+
+    def __init__(self, replies: Iterable[str]):
+        self.replies = deque(replies)
+
+    def generate(self, strategy: str, user_msg: str, turn: int,
+                 is_recovery: bool, sentiment: str, on_delta=None) -> str:
+        return self.replies.popleft() if self.replies else ""
+
+
+class ReplayStrategyAdapter(StrategyAdapter):
+    """
+    Replays the logged strategy choices instead of sampling, so weight
+    adaptation follows the logged conversation exactly.
+    """
+
+    def __init__(self, strategies: Iterable[str], initial_weights: Optional[Iterable[float]] = None):
+        super().__init__(initial_weights=initial_weights)
+        self.script = deque(strategies)
+        self.violations: List[Dict] = []
+
+    def select(self, in_recovery: bool):
+        if not self.script:
+            return super().select(in_recovery)
+        logged = self.script.popleft()
+        if in_recovery and logged not in self.RECOVERY_ALLOWED:
+            self.violations.append({'strategy': logged})
+        idx = self.STRATEGY_INDEX[logged]
+        self._count[idx] += 1
+        return self.MEMBERS[idx]
+
+
+def _close(a, b, tol: float) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        try:
+            return abs(float(a) - float(b)) <= tol
+        except (TypeError, ValueError):
+            return False
+    return a == b
+
+
+def replay_session(log: Dict, tol: float = 1e-6) -> Dict:
+    """Re-run one logged session and return its divergences."""
+    history = log.get('history', [])
+    user_turns = [h for h in history if h.get('speaker') == 'user']
+    agent_turns = [h for h in history if h.get('speaker') == 'agent' and h.get('turn', 0) > 0]
+
+    # No speculation: ReplayAgent has no prompt/complete stages
+    dm = DialogueManager(log['condition'], log['context'], speculative=False)
+    dm.agent = ReplayAgent(h['msg'] for h in agent_turns)
+    if log['condition'] != 'C1':
+        dm.strategy = ReplayStrategyAdapter(h['strategy'] for h in agent_turns)
+    dm.start()
+
+    divergences = []
+    replayed = 0
+    for h in user_turns:
+        result = dm.process(h['msg'])
+        replayed += 1
+
+        new_info = dm.history[-2].info if not result['stop'] else dm.history[-1].info
+        for field in INFO_FIELDS:
+            old = h['info'].get(field)
+            new = new_info[field]
+            if not _close(old, new, tol):
+                divergences.append({'turn': h['turn'], 'field': field, 'logged': old, 'replayed': new})
+
+        if result['stop']:
+            break
+
+    truncated = dm.active and log.get('outcome') is not None
+    if replayed < len(user_turns):
+        divergences.append({
+            'turn': dm.turn, 'field': 'stopped_early',
+            'logged': log.get('outcome'), 'replayed': dm.outcome
+        })
+    elif not truncated and dm.outcome != log.get('outcome'):
+        divergences.append({'turn': dm.turn, 'field': 'outcome', 'logged': log.get('outcome'), 'replayed': dm.outcome})
+
+    if not truncated:
+        for field, new in (('final_belief', dm.belief.get()), ('final_trust', dm.trust.get())):
+            if field in log and not _close(float(log[field]), float(new), tol):
+                divergences.append({'turn': dm.turn, 'field': field, 'logged': log[field], 'replayed': new})
+        if log.get('turns') is not None and log['turns'] != dm.turn:
+            divergences.append({'turn': dm.turn, 'field': 'turns', 'logged': log['turns'], 'replayed': dm.turn})
+
+    if isinstance(dm.strategy, ReplayStrategyAdapter):
+        for v in dm.strategy.violations:
+            divergences.append({'turn': None, 'field': 'recovery_strategy', 'logged': v['strategy'], 'replayed': None})
+
+    return {
+        'session_id': log.get('session_id'),
+        'condition': log.get('condition'),
+        'turns': replayed,
+        'truncated': truncated,
+        'divergences': divergences
+    }
+
+
+def _replay_chunk(lines: List[str], tol: float) -> List[Dict]:
+    results = []
+    for line in lines:
+        try:
+            results.append(replay_session(json.loads(line), tol))
+        except Exception as e:
+            results.append({'session_id': None, 'error': f"{type(e).__name__}: {e}", 'divergences': []})
+    return results
+
+
+def _chunks(path: str, size: int, limit: Optional[int]) -> Iterator[List[str]]:
+    chunk = []
+    n = 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            chunk.append(line)
+            n += 1
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+            if limit is not None and n >= limit:
+                break
+    if chunk:
+        yield chunk
+
+
+def replay_log(path: str, workers: Optional[int] = None, chunk_size: int = None,
+               limit: Optional[int] = None, tol: float = 1e-6) -> Iterator[Dict]:
+    """
+    Replay every session in a dialogue log across a process pool.
+
+    Sessions are read lazily and handed out in chunks; at most two chunks
+    per worker are in flight so memory stays flat on large logs.
+    Results are yielded as chunks complete (not in file order).
+    """
+    chunk_size = chunk_size or Config.REPLAY_CHUNK_SIZE
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_pending = 2 * workers
+        pending = set()
+        for chunk in _chunks(path, chunk_size, limit):
+            pending.add(pool.submit(_replay_chunk, chunk, tol))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield from fut.result()
+        for fut in pending:
+            yield from fut.result()
+
+
+def summarize(results: Iterable[Dict], out_file: Optional[str] = None) -> Dict:
+    sessions = diverged = truncated = errors = 0
+    by_field = Counter()
+    start = time.monotonic()
+
+    out = open(out_file, 'w') if out_file else None
+    try:
+        for r in results:
+            sessions += 1
+            if r.get('error'):
+                errors += 1
+            if r.get('truncated'):
+                truncated += 1
+            if r['divergences']:
+                diverged += 1
+                by_field.update(d['field'] for d in r['divergences'])
+            if out and (r['divergences'] or r.get('error')):
+                out.write(json.dumps(r) + '\n')
+    finally:
+        if out:
+            out.close()
+
+    elapsed = time.monotonic() - start
+    return {
+        'sessions': sessions,
+        'diverged': diverged,
+        'truncated': truncated,
+        'errors': errors,
+        'by_field': dict(by_field),
+        'elapsed_sec': round(elapsed, 2),
+        'sessions_per_sec': round(sessions / elapsed, 1) if elapsed > 0 else None
+    }
@@ -0,0 +1,193 @@
+"""
+Pre-generated Response Pools
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import threading
+import zlib
+
+from src.config import Config
+from src.llm_agent import LLMAgent
+from src.priors import campaign_key
+from src.records import SentimentLabel, Strategy
+from src.serialization import dumps
+
+
+# Stand-in user messages the pooled prompts are written against
+SAMPLE_MESSAGES = {
+    SentimentLabel.POSITIVE: "Sure, tell me more.",
+    SentimentLabel.NEUTRAL: "Okay.",
+    SentimentLabel.NEGATIVE: "I'm not sure about this.",
+}
+
+# Opening words of messages that ask something, even without a '?'
+QUESTION_WORDS = {
+    'what', 'how', 'why', 'where', 'who', 'when', 'which', 'can', 'could',
+    'is', 'are', 'do', 'does', 'will', 'would', 'should', 'explain',
+}
+
+SlotKey = Tuple[Optional[str], str, bool]   # (strategy, sentiment, recovery)
+
+
+def is_generic(user_msg: str) -> bool:
+    """Short replies with no question: the prompt asks to answer questions specifically."""
+    text = user_msg.strip()
+    if not text or '?' in text:
+        return False
+    words = text.split()
+    return len(words) <= Config.POOL_MAX_WORDS and words[0].lower().strip(',.!') not in QUESTION_WORDS
+
+
+def pool_key(donation_ctx: Dict) -> str:
+    """Campaign plus every other context field the prompts quote."""
+    quoted = dumps([donation_ctx.get('amounts'), donation_ctx.get('impact')])
+    return f"{campaign_key(donation_ctx)}#{zlib.crc32(quoted):08x}"
+
+
+def slot_key(strategy: str, sentiment: str, is_recovery: bool) -> SlotKey:
+    # The recovery prompt does not depend on the strategy
+    return (None if is_recovery else strategy, sentiment, is_recovery)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class ResponsePool:
+    """
+    Pre-generated agent replies for one campaign.
+
+    Only turn 1 is pooled: its prompt has no conversation history yet, so a
+    reply generated ahead of time saw exactly the prompt a live turn would
+    (later turns quote the real exchange). Only short messages that ask
+    nothing are served from it. Each reply is handed out once; the
+    background filler tops the slot up again.
+    """
+
+    def __init__(self, donation_ctx: Dict):
+        self.ctx = donation_ctx
+        self.key = pool_key(donation_ctx)
+        self.slots: Dict[SlotKey, Deque[str]] = {}
+        self._dups: Dict[SlotKey, int] = {}
+        self._lock = threading.Lock()
+
+        # ---- Metrics ----
+        self.hits = 0
+        self.misses = 0        # eligible turn, slot empty
+        self.generated = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def depth() -> int:
+        # Greedy decoding gives the same reply every time; one is enough
+        return Config.POOL_DEPTH if Config.TEMPERATURE > 0 else 1
+
+    def all_keys(self) -> List[SlotKey]:
+        keys = []
+        for sentiment in SentimentLabel:
+            keys.extend(slot_key(s, sentiment, False) for s in Strategy)
+            keys.append(slot_key(None, sentiment, True))
+        return keys
+
+    def take(self, strategy: str, user_msg: str, turn: int, is_recovery: bool,
+             sentiment: str) -> Optional[str]:
+        if turn != 1 or not is_generic(user_msg):
+            return None
+        key = slot_key(strategy, sentiment, is_recovery)
+        with self._lock:
+            slot = self.slots.get(key)
+            if slot:
+                self.hits += 1
+                self._dups.pop(key, None)   # room again; let the filler retry
+                return slot.popleft()
+            self.misses += 1
+        return None
+
+    def wanted(self) -> Optional[Tuple[int, SlotKey]]:
+        """The emptiest slot that still needs replies, as (fill level, key)."""
+        depth = self.depth()
+        best = None
+        with self._lock:
+            for key in self.all_keys():
+                n = len(self.slots.get(key, ()))
+                if n >= depth or self._dups.get(key, 0) >= Config.POOL_MAX_DUPLICATES:
+                    continue
+                if best is None or n < best[0]:
+                    best = (n, key)
+                    if n == 0:
+                        break
+        return best
+
+    def fill(self, key: SlotKey, client=None, use_local_model: bool = False) -> bool:
+        """Generate one reply for `key`. Returns False if generation failed."""
+        strategy, sentiment, is_recovery = key
+        strategy = strategy or Strategy.Empathy
+
+        # A fresh agent has no history, like a live session on turn 1
+        agent = LLMAgent(self.ctx, use_local_model, client)
+        prompt = agent.build_prompt(strategy, SAMPLE_MESSAGES[sentiment], 1, is_recovery, sentiment)
+        text = agent.complete(prompt, strategy, is_recovery, fallback=False)
+        if not text:
+            return False
+
+        with self._lock:
+            slot = self.slots.setdefault(key, deque())
+            if _normalize(text) in {_normalize(t) for t in slot}:
+                self.duplicates += 1
+                self._dups[key] = self._dups.get(key, 0) + 1
+            else:
+                slot.append(text)
+                self.generated += 1
+                self._dups.pop(key, None)
+        return True
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            pooled = sum(len(s) for s in self.slots.values())
+        served = self.hits + self.misses
+        return {
+            'pooled': pooled,
+            'capacity': len(self.all_keys()) * self.depth(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / served, 3) if served else None,
+            'generated': self.generated,
+            'duplicates': self.duplicates
+        }
+
+
+class PoolRegistry:
+    """Process-wide response pools, one per campaign context (see pool_key)."""
+
+    def __init__(self):
+        self.campaigns: Dict[str, ResponsePool] = {}
+
+    def for_campaign(self, donation_ctx: Dict) -> ResponsePool:
+        key = pool_key(donation_ctx)
+        pool = self.campaigns.get(key)
+        if pool is None:
+            pool = self.campaigns.setdefault(key, ResponsePool(donation_ctx))
+        return pool
+
+    def next_fill(self) -> Optional[Tuple[ResponsePool, SlotKey]]:
+        """The emptiest slot across all campaigns, or None when all are full."""
+        best = None
+        for pool in list(self.campaigns.values()):
+            wanted = pool.wanted()
+            if wanted is not None and (best is None or wanted[0] < best[0]):
+                best = (wanted[0], pool, wanted[1])
+        return (best[1], best[2]) if best is not None else None
+
+    def snapshot(self) -> Dict:
+        return {key: pool.snapshot() for key, pool in list(self.campaigns.items())}
+
+
+_registry: Optional[PoolRegistry] = None
+
+
+def get_pool_registry() -> PoolRegistry:
+    global _registry
+    if _registry is None:
+        _registry = PoolRegistry()
+    return _registry
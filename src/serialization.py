@@ -0,0 +1,73 @@
+"""
+JSON Serialization (orjson with stdlib fallback)
+"""
+
+from typing import Any, List
+import json
+import numpy as np
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any):
+    # Types neither backend handles natively
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTS)
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    loads = json.loads
+
+
+def dumps_str(obj: Any) -> str:
+    return dumps(obj).decode('utf-8')
+
+
+def append_jsonl(path: str, obj: Any):
+    with open(path, 'ab') as f:
+        f.write(dumps(obj) + b'\n')
+
+
+def round_floats(values, ndigits: int = 3) -> List[float]:
+    """
+    Round a vector of floats in one pass; same results as round(v, ndigits)
+    on each element.
+    """
+    a = np.asarray(values, dtype=float)
+    scale = 10.0 ** ndigits
+    scaled = a * scale
+    out = (np.round(scaled) / scale).tolist()
+    # Near a .5 tie the scaled product can round the wrong way; use the
+    # correctly rounded builtin for those few elements
+    frac = np.abs(scaled - np.trunc(scaled))
+    for i in np.flatnonzero(np.abs(frac - 0.5) < 1e-6):
+        out[i] = round(float(a[i]), ndigits)
+    return out
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` (numpy scalars/arrays, enums, records)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,51 @@
+"""
+Session IDs and Shard Assignment
+"""
+
+import hashlib
+import os
+import re
+import time
+
+
+# Crockford base32 (no I, L, O, U): sorts the same as the numbers it encodes
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+SESSION_ID_RE = re.compile(r'^sess_[0-9A-HJKMNP-TV-Z]{26}$')
+
+
+def _b32(n: int, width: int) -> str:
+    out = []
+    for _ in range(width):
+        n, r = divmod(n, 32)
+        out.append(_ALPHABET[r])
+    return ''.join(reversed(out))
+
+
+def new_session_id() -> str:
+    """
+    ULID-style ID: 48-bit millisecond timestamp + 80 random bits.
+
+    Lexicographic order follows creation time; collisions need two IDs in
+    the same millisecond to draw the same 80 random bits.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+    return f"sess_{_b32(ms, 10)}{_b32(rand, 16)}"
+
+
+def is_session_id(value: str) -> bool:
+    return bool(SESSION_ID_RE.match(value))
+
+
+def shard_for(session_id: str, n_shards: int) -> int:
+    """
+    Jump consistent hash (Lamping & Veach): a stable shard in [0, n_shards).
+    Growing from n to n+1 shards moves only ~1/(n+1) of the sessions.
+    """
+    key = int.from_bytes(hashlib.blake2b(session_id.encode('utf-8'), digest_size=8).digest(), 'big')
+    b, j = -1, 0
+    while j < n_shards:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
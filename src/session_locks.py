@@ -0,0 +1,69 @@
+"""
+Per-Session Request Serialization
+"""
+
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable
+import asyncio
+
+
+class SessionLocks:
+    """
+    One asyncio.Lock per session, for a single event loop.
+
+    asyncio.Lock wakes waiters first-in first-out, so requests for the same
+    session run in arrival order while different sessions never wait on
+    each other. A lock exists only while some request holds or waits for
+    it, so the table never outgrows the sessions in use.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+        self.contended = 0   # acquisitions that had to wait
+
+    def _checkout(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        self._users[session_id] = self._users.get(session_id, 0) + 1
+        if lock.locked():
+            self.contended += 1
+        return lock
+
+    def _checkin(self, session_id: str):
+        n = self._users[session_id] - 1
+        if n:
+            self._users[session_id] = n
+        else:
+            del self._users[session_id]
+            del self._locks[session_id]
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        lock = self._checkout(session_id)
+        try:
+            async with lock:
+                yield
+        finally:
+            self._checkin(session_id)
+
+    @asynccontextmanager
+    async def hold_many(self, session_ids: Iterable[str]):
+        # Always acquired in sorted order, so two batches can't deadlock
+        ids = sorted(set(session_ids))
+        locks = [self._checkout(sid) for sid in ids]
+        acquired = []
+        try:
+            for lock in locks:
+                await lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+            for sid in ids:
+                self._checkin(sid)
+
+    def snapshot(self) -> Dict:
+        return {'locked_sessions': len(self._locks), 'contended': self.contended}
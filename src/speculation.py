@@ -0,0 +1,76 @@
+"""
+Speculative Generation Support
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+import threading
+from src.config import Config
+
+
+class SpeculationStats:
+    """Process-wide counters for speculative generation."""
+
+    def __init__(self):
+        self.started = 0
+        self.hits = 0
+        self.misses = 0      # prediction wrong; request reissued
+        self.discarded = 0   # guardrails stopped the turn
+        self.skipped = 0     # turn not eligible (recovery / no dominant strategy / no capacity)
+        self.running = 0     # submitted and not finished, cancelled-but-started ones included
+        self._lock = threading.Lock()
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def decr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) - 1)
+
+    def snapshot(self) -> Dict:
+        resolved = self.hits + self.misses
+        return {
+            'started': self.started,
+            'hits': self.hits,
+            'misses': self.misses,
+            'discarded': self.discarded,
+            'skipped': self.skipped,
+            'running': self.running,
+            'hit_rate': round(self.hits / resolved, 3) if resolved else None
+        }
+
+
+stats = SpeculationStats()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Returns how many more LLM calls may start now (the backend wires in the
+# admission controller's idle slots); None means unbounded
+_capacity: Optional[Callable[[], int]] = None
+
+
+def set_capacity(fn: Optional[Callable[[], int]]):
+    global _capacity
+    _capacity = fn
+
+
+def has_capacity() -> bool:
+    # Speculative calls run outside admission; a cancelled one keeps
+    # running upstream, so each counts until it finishes
+    return _capacity is None or stats.running < _capacity()
+
+
+def submit(fn, *args) -> Future:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.SPECULATION_WORKERS,
+                    thread_name_prefix="speculate"
+                )
+    stats.incr('running')
+    future = _executor.submit(fn, *args)
+    future.add_done_callback(lambda f: stats.decr('running'))
+    return future
@@ -2,50 +2,75 @@
 Strategy Adaptation Module
 """
 
-from typing import Dict
+from typing import Dict, Optional
 import numpy as np
 from src.config import Config
+from src.records import Strategy
+from src.serialization import round_floats
 
 
 class StrategyAdapter:
     # Hard allowlist for recovery mode (PDF-aligned)
     RECOVERY_ALLOWED = {'Empathy', 'Transparency'}
 
-    def __init__(self):
+    STRATEGY_INDEX = {s: i for i, s in enumerate(Config.STRATEGIES)}
+    MEMBERS = tuple(Strategy)
+    RECOVERY_MASK = np.isin(Config.STRATEGIES, list(RECOVERY_ALLOWED))
+
+    def __init__(self, seed: Optional[int] = None, initial_weights: Optional[np.ndarray] = None):
         n = len(Config.STRATEGIES)
-        self.weights = {s: 1.0/n for s in Config.STRATEGIES}
-        self.history = {s: [1.0/n] for s in Config.STRATEGIES}
-        self.count = {s: 0 for s in Config.STRATEGIES}
+        self.rng = np.random.default_rng(seed)
+
+        if initial_weights is not None:
+            self._w = np.array(initial_weights, dtype=float)
+        else:
+            self._w = np.full(n, 1.0/n)
+        self._count = np.zeros(n, dtype=np.int64)
+
+        # One row per adaptation step, grown by doubling
+        self._hist = np.empty((Config.MAX_TURNS + 1, n))
+        self._hist[0] = self._w
+        self._hist_len = 1
+
+    # ---- Dict views (API / logging compatibility) ----
+    @property
+    def weights(self) -> Dict[str, float]:
+        return dict(zip(Config.STRATEGIES, self._w.tolist()))
 
-    def select(self, in_recovery: bool) -> str:
+    def rounded_weights(self, ndigits: int = 3) -> Dict[str, float]:
+        return dict(zip(Config.STRATEGIES, round_floats(self._w, ndigits)))
+
+    @property
+    def history(self) -> Dict[str, np.ndarray]:
+        h = self._hist[:self._hist_len]
+        return {s: h[:, i] for i, s in enumerate(Config.STRATEGIES)}
+
+    @property
+    def count(self) -> Dict[str, int]:
+        return dict(zip(Config.STRATEGIES, self._count.tolist()))
+
+    def select(self, in_recovery: bool) -> Strategy:
         # -------- HARD TRUST CONSTRAINT --------
         if in_recovery:
-            available = {
-                s: self.weights[s]
-                for s in self.RECOVERY_ALLOWED
-                if s in self.weights
-            }
+            wts = np.where(self.RECOVERY_MASK, self._w, 0.0)
         else:
-            available = self.weights.copy()
+            wts = self._w
         # --------------------------------------
 
-        strats = list(available.keys())
-        wts = list(available.values())
+        cum = np.cumsum(wts)
+        total = cum[-1]
 
-        # Safety fallback (should never happen, but defensive)
-        if not strats:
-            strats = ['Empathy']
-            wts = [1.0]
+        if total <= 0:
+            # Uniform over whatever is allowed
+            allowed = self.RECOVERY_MASK if in_recovery else np.ones_like(self.RECOVERY_MASK)
+            cum = np.cumsum(allowed, dtype=float)
+            total = cum[-1]
 
-        total = sum(wts)
-        if total == 0:
-            wts = [1.0/len(strats)] * len(strats)
-        else:
-            wts = [w/total for w in wts]
+        idx = int(np.searchsorted(cum, self.rng.random() * total, side='right'))
+        idx = min(idx, len(cum) - 1)
 
-        chosen = np.random.choice(strats, p=wts)
-        self.count[chosen] += 1
-        return chosen
+        self._count[idx] += 1
+        return self.MEMBERS[idx]
 
     def adapt(self, strategy: str, rejection_info: Dict):
         # IMPORTANT: Do not adapt forbidden strategies in recovery
@@ -54,35 +79,29 @@ class StrategyAdapter:
         is_accept = rejection_info['is_acceptance']
         is_curious = rejection_info['is_curiosity']
 
+        w = self._w
+        i = self.STRATEGY_INDEX[strategy]
+
         if is_accept:
-            self.weights[strategy] = min(1.0, self.weights[strategy] * 1.5)
+            w[i] = min(1.0, w[i] * 1.5)
         elif is_curious:
-            self.weights[strategy] = min(1.0, self.weights[strategy] * 1.2)
+            w[i] = min(1.0, w[i] * 1.2)
         elif rtype == 'explicit':
-            self.weights[strategy] = max(
-                Config.MIN_STRATEGY_WEIGHT,
-                self.weights[strategy] * (1 - Config.HARD_REJECTION_PENALTY)
-            )
+            w[i] = max(Config.MIN_STRATEGY_WEIGHT, w[i] * (1 - Config.HARD_REJECTION_PENALTY))
         elif rtype == 'soft':
-            self.weights[strategy] = max(
-                Config.MIN_STRATEGY_WEIGHT,
-                self.weights[strategy] * (1 - Config.SOFT_REJECTION_PENALTY)
-            )
+            w[i] = max(Config.MIN_STRATEGY_WEIGHT, w[i] * (1 - Config.SOFT_REJECTION_PENALTY))
 
         if rejection_info['trust_concern']:
-            self.weights[strategy] = max(
-                Config.MIN_STRATEGY_WEIGHT,
-                self.weights[strategy] * 0.7
-            )
-            self.weights['Transparency'] = min(
-                1.0,
-                self.weights['Transparency'] * 1.3
-            )
+            t = self.STRATEGY_INDEX['Transparency']
+            w[i] = max(Config.MIN_STRATEGY_WEIGHT, w[i] * 0.7)
+            w[t] = min(1.0, w[t] * 1.3)
 
         # Renormalize
-        total = sum(self.weights.values())
+        total = w.sum()
         if total > 0:
-            self.weights = {s: w/total for s, w in self.weights.items()}
+            w /= total
 
-        for s in Config.STRATEGIES:
-            self.history[s].append(self.weights[s])
+        if self._hist_len == len(self._hist):
+            self._hist = np.concatenate([self._hist, np.empty_like(self._hist)])
+        self._hist[self._hist_len] = w
+        self._hist_len += 1
@@ -2,15 +2,51 @@
 Belief and Trust Tracking Modules
 """
 
-from typing import Dict
+from typing import Dict, List
 import numpy as np
 from src.config import Config
 
 
+def _clamp01(x: float) -> float:
+    return 0.0 if x < 0.0 else (1.0 if x > 1.0 else x)
+
+
+def round_score(x: float, ndigits: int = 3) -> float:
+    # numpy rounding semantics, as the np.float64 scores used to round
+    return float(np.round(x, ndigits))
+
+
+class _FloatHistory:
+    """Preallocated float history, one slot per turn (grows if ever needed)."""
+
+    __slots__ = ('_buf', '_len')
+
+    def __init__(self, first: float):
+        self._buf = np.empty(Config.MAX_TURNS + 1)
+        self._buf[0] = first
+        self._len = 1
+
+    def append(self, value: float):
+        if self._len == len(self._buf):
+            self._buf = np.concatenate([self._buf, np.empty_like(self._buf)])
+        self._buf[self._len] = value
+        self._len += 1
+
+    def tolist(self) -> List[float]:
+        return self._buf[:self._len].tolist()
+
+    def __len__(self) -> int:
+        return self._len
+
+
 class BeliefTracker:
     def __init__(self):
         self.belief = Config.INITIAL_BELIEF
-        self.history = [self.belief]
+        self._history = _FloatHistory(self.belief)
+
+    @property
+    def history(self) -> List[float]:
+        return self._history.tolist()
 
     def update(self, rejection_info: Dict, trust: float) -> float:
         rtype = rejection_info['rejection_type']
@@ -42,8 +78,8 @@ class BeliefTracker:
         if trust < Config.TRUST_THRESHOLD and delta > 0:
             delta = 0.0
 
-        self.belief = np.clip(self.belief + delta, 0, 1)
-        self.history.append(self.belief)
+        self.belief = _clamp01(self.belief + delta)
+        self._history.append(self.belief)
         return delta
 
     def get(self) -> float:
@@ -53,9 +89,13 @@ class BeliefTracker:
 class TrustTracker:
     def __init__(self):
         self.trust = Config.INITIAL_TRUST
-        self.history = [self.trust]
+        self._history = _FloatHistory(self.trust)
         self.recovery_mode = False
 
+    @property
+    def history(self) -> List[float]:
+        return self._history.tolist()
+
     def update(self, rejection_info: Dict, strategy: str):
         rtype = rejection_info['rejection_type']
         concern = rejection_info['trust_concern']
@@ -76,8 +116,8 @@ class TrustTracker:
         elif rejection_info['is_curiosity']:
             delta = Config.GAMMA * 0.3
 
-        self.trust = np.clip(self.trust + delta, 0, 1)
-        self.history.append(self.trust)
+        self.trust = _clamp01(self.trust + delta)
+        self._history.append(self.trust)
 
         # Recovery mode logic
         if self.trust < Config.TRUST_THRESHOLD:
@@ -0,0 +1,144 @@
+"""
+Pre-fork startup script: load shared assets once, then fork N workers
+
+The parent imports the backend (compiled detector patterns), warms the
+TextBlob sentiment lexicon, loads the learned intent model and, with
+USE_LOCAL_MODEL=1, the local generator weights. It then freezes the GC
+and forks one uvicorn worker per port, so every worker reads the same
+physical pages copy-on-write instead of loading its own copy. The parent
+finally serves the session router (backend/router.py) on the public port.
+
+Usage:
+  python start_backend_prefork.py [--workers 4] [--port 8000] [--base-port 8100]
+"""
+
+import argparse
+import gc
+import os
+import random
+import signal
+import sys
+import time
+import traceback
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config import Config
+
+
+def preload():
+    """Everything a worker would otherwise load on its own, loaded once here."""
+    start = time.monotonic()
+
+    # Detector patterns compile at import; the app imports every module
+    import backend.main  # noqa: F401
+
+    # TextBlob parses its sentiment lexicon on first use
+    from textblob import TextBlob
+    TextBlob("warm up the lexicon").sentiment
+
+    intent_path = os.path.join("notebooks", Config.INTENT_MODEL_FILE)
+    if os.path.exists(intent_path):
+        from src.intent_classifier import load_detector
+        load_detector(intent_path)
+        print(f"✓ Intent model loaded from {intent_path}")
+
+    from src.local_model import get_local_generator, inference_mode
+    if os.getenv("USE_LOCAL_MODEL", "0") == "1" and inference_mode() is not None:
+        import torch
+        # Keep the parent single-threaded: an OpenMP pool started before
+        # fork() is not usable in the children
+        torch.set_num_threads(1)
+        get_local_generator()
+
+    print(f"✓ Shared assets loaded in {time.monotonic() - start:.1f}s")
+
+
+def run_worker(shard: int, port: int, threads: int):
+    # Own journal file per worker; fresh random state (retry jitter etc.)
+    os.environ["SHARD_ID"] = str(shard)
+    random.seed()
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+    # A forked child must never return into the parent's code path (it would
+    # go on forking workers and start a second router), whatever happens
+    code = 1
+    try:
+        import uvicorn
+        from backend.main import app
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        # os._exit skips interpreter cleanup, including atexit handlers and
+        # stdio flushing, so the worker's strategy priors are persisted here
+        try:
+            from src.priors import persist_registry
+            persist_registry()
+        except BaseException:
+            traceback.print_exc()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-fork N backend workers behind the session router")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8000, help="public (router) port")
+    parser.add_argument("--base-port", type=int, default=Config.SHARD_BASE_PORT)
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        print("Pre-fork mode needs os.fork (Linux/macOS); use start_backend_sharded.py instead.")
+        sys.exit(1)
+    if not os.getenv("HF_TOKEN"):
+        print("WARNING: HF_TOKEN environment variable not set!")
+        print("Please set it before running the server.")
+        sys.exit(1)
+
+    preload()
+
+    # Move everything loaded so far out of the collector's reach: GC passes
+    # in the workers would otherwise write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    ports = [args.base_port + i for i in range(args.workers)]
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    children = []
+    for shard, port in enumerate(ports):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(shard, port, threads)
+        children.append(pid)
+
+    os.environ["SHARD_URLS"] = ",".join(f"http://127.0.0.1:{p}" for p in ports)
+
+    print("=" * 60)
+    print(f"Forked {args.workers} worker(s) on ports {ports[0]}-{ports[-1]} ({threads} torch thread(s) each)")
+    print(f"Router URL: http://localhost:{args.port}")
+    print("=" * 60 + "\n")
+
+    try:
+        import uvicorn
+        time.sleep(1.0)   # let workers bind before the first health check
+        uvicorn.run("backend.router:app", host="0.0.0.0", port=args.port, log_level="info")
+    except KeyboardInterrupt:
+        print("\n\nServer stopped by user.")
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
@@ -0,0 +1,68 @@
+"""
+Sharded startup script: N backend workers behind a session router
+
+Each worker is an independent backend process (own sessions, own event
+loop). The router on the public port names every new session and
+consistently hashes session IDs to workers, so a conversation always
+lands on the process that holds its state.
+
+Usage:
+  python start_backend_sharded.py [--workers 4] [--port 8000] [--base-port 8100]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config import Config
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run N backend workers behind the session router")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8000, help="public (router) port")
+    parser.add_argument("--base-port", type=int, default=Config.SHARD_BASE_PORT)
+    args = parser.parse_args()
+
+    if not os.getenv("HF_TOKEN"):
+        print("WARNING: HF_TOKEN environment variable not set!")
+        print("Please set it before running the server.")
+        sys.exit(1)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    ports = [args.base_port + i for i in range(args.workers)]
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app",
+             "--host", "127.0.0.1", "--port", str(p), "--log-level", "warning"],
+            cwd=root, env=dict(os.environ, SHARD_ID=str(i))
+        )
+        for i, p in enumerate(ports)
+    ]
+    os.environ["SHARD_URLS"] = ",".join(f"http://127.0.0.1:{p}" for p in ports)
+
+    print("=" * 60)
+    print(f"Starting {args.workers} backend worker(s) on ports {ports[0]}-{ports[-1]}")
+    print(f"Router URL: http://localhost:{args.port}")
+    print("=" * 60 + "\n")
+
+    try:
+        time.sleep(1.0)   # let workers bind before the first health check
+        uvicorn.run("backend.router:app", host="0.0.0.0", port=args.port, log_level="info")
+    except KeyboardInterrupt:
+        print("\n\nServer stopped by user.")
+    finally:
+        for w in workers:
+            w.terminate()
+        for w in workers:
+            try:
+                w.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                w.kill()
@@ -0,0 +1,19 @@
+import pytest
+
+from src.experiment import DEFAULT_CTX, StandInClient
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    """backend.main with a stand-in LLM, no startup hooks and no shared state."""
+    monkeypatch.chdir(tmp_path)
+    import backend.main as bm
+    from src.admission import AdmissionController
+    from src.session_locks import SessionLocks
+
+    monkeypatch.setattr(bm, "hf_client", StandInClient(DEFAULT_CTX))
+    monkeypatch.setattr(bm, "sessions", {})
+    monkeypatch.setattr(bm, "admission", AdmissionController())
+    monkeypatch.setattr(bm, "session_locks", SessionLocks())
+    monkeypatch.setattr(bm, "journal", None)
+    return bm
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+
+from src.aggregates import LiveAggregates, merge_counters, render_counters
+from src.serialization import dumps
+
+
+def record(agg, condition, n):
+    for i in range(n):
+        agg.session_started(condition, 0.15, 0.9)
+        agg.record_turn(condition, 1, 0.2 + i / 100, 0.8, i % 2 == 0, strategy_idx=i % 5)
+        agg.record_turn(condition, 2, 0.4, 0.7, False, strategy_idx=1,
+                        outcome="User accepted" if i % 3 else "User declined donation")
+
+
+def test_merged_counters_render_like_one_process():
+    single, a, b = LiveAggregates(), LiveAggregates(), LiveAggregates()
+    record(single, 'C3', 7)
+    record(single, 'C1', 2)
+    record(a, 'C3', 7)
+    record(b, 'C1', 2)
+
+    merged = render_counters(merge_counters([a.counters(), b.counters()]))
+    assert merged == single.snapshot()
+
+
+def test_router_sums_worker_aggregates(monkeypatch):
+    import backend.router as router
+
+    a, b = LiveAggregates(), LiveAggregates()
+    record(a, 'C2', 3)
+    record(b, 'C2', 4)
+    bodies = {"http://w0": a.counters(), "http://w1": b.counters()}
+
+    def handler(request):
+        assert request.url.params.get("raw") == "true"
+        body = bodies[f"{request.url.scheme}://{request.url.host}"]
+        return httpx.Response(200, content=dumps({k: v.tolist() for k, v in body.items()}))
+
+    async def run():
+        monkeypatch.setattr(router, "WORKERS", list(bodies))
+        monkeypatch.setattr(router, "client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        transport = httpx.ASGITransport(app=router.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://router") as c:
+            r = await c.get("/api/aggregates")
+        await router.client.aclose()
+        return r
+
+    r = asyncio.run(run())
+    assert r.status_code == 200
+    assert r.headers["x-workers-reporting"] == "2/2"
+    body = r.json()
+    assert body["C2"]["sessions_started"] == 7
+    assert body["C2"]["turns"] == 14
+    assert body["C1"]["sessions_started"] == 0
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import httpx
+
+from src.admission import AdmissionController
+from src.experiment import DEFAULT_CTX, StandInClient
+
+
+class CountingClient(StandInClient):
+    """Stand-in LLM that records the peak number of concurrent calls."""
+
+    def __init__(self):
+        super().__init__(DEFAULT_CTX, latency=0.05)
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, messages, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            return super().create(messages, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_concurrent_batches_stay_within_admission_limit(backend, monkeypatch):
+    llm = CountingClient()
+    monkeypatch.setattr(backend, "hf_client", llm)
+    monkeypatch.setattr(backend, "admission", AdmissionController(max_concurrency=3, max_queue=64, deadline=30))
+
+    async def run():
+        transport = httpx.ASGITransport(app=backend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            sids = []
+            for _ in range(24):
+                r = await client.post("/api/session/create",
+                                      json={"condition": "C1", "donation_context": DEFAULT_CTX})
+                sids.append(r.json()["session_id"])
+
+            batches = [
+                {"turns": [{"session_id": sid, "message": "Tell me about the program"} for sid in sids[i:i + 6]]}
+                for i in range(0, 18, 6)
+            ]
+            singles = [{"session_id": sid, "message": "Tell me about the program"} for sid in sids[18:]]
+            responses = await asyncio.gather(
+                *(client.post("/api/batch/turns", json=b) for b in batches),
+                *(client.post("/api/session/message", json=m) for m in singles),
+            )
+            assert all(r.status_code == 200 for r in responses)
+
+    asyncio.run(run())
+    assert llm.calls == 24
+    assert llm.peak <= 3
+    assert backend.admission.in_flight == 0
+
+
+def test_admit_grants_only_free_extra_slots():
+    async def run():
+        adm = AdmissionController(max_concurrency=4, max_queue=8, deadline=5)
+        async with adm.admit(3) as a:
+            async with adm.admit(3) as b:
+                assert (a, b) == (3, 1)
+                assert adm.in_flight == 4
+        assert adm.in_flight == 0 and adm.idle_slots == 4
+
+    asyncio.run(run())
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from src import experiment
+from src.experiment import completed_runs, run_experiment
+from src.serialization import loads
+
+
+def test_resume_ignores_indices_beyond_this_run(tmp_path):
+    out = str(tmp_path / "runs.jsonl")
+    first = asyncio.run(run_experiment(12, out, concurrency=4, seed=1, progress_every=0))
+    assert first['completed'] == 12
+
+    second = asyncio.run(run_experiment(5, out, concurrency=4, seed=1, progress_every=0))
+    assert second['previously_completed'] == 5
+    assert second['completed'] == 0
+
+    third = asyncio.run(run_experiment(15, out, concurrency=4, seed=1, progress_every=0))
+    assert third['previously_completed'] == 12 and third['completed'] == 3
+    assert completed_runs(out) == set(range(15))
+    with open(out) as f:
+        assert len([loads(line) for line in f]) == 15
+
+
+def test_concurrency_is_not_capped_by_default_executor(tmp_path, monkeypatch):
+    active, peak = 0, 0
+    lock = threading.Lock()
+    release = threading.Event()
+    real = experiment.simulate_session
+
+    def slow(*args):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+            if active >= 48:
+                release.set()
+        release.wait(2.0)
+        try:
+            return real(*args)
+        finally:
+            with lock:
+                active -= 1
+
+    monkeypatch.setattr(experiment, "simulate_session", slow)
+    asyncio.run(run_experiment(48, str(tmp_path / "runs.jsonl"), concurrency=48, progress_every=0))
+    assert peak == 48
@@ -0,0 +1,84 @@
+from src.intent_classifier import (
+    BINARY_HEADS, BIN_SLICE, REJECTION_TYPES, IntentDetector, IntentModel, evaluate, train
+)
+from src.records import RejectionType
+from src.rejection_detector import RejectionDetector
+
+
+MESSAGES = [
+    "Yes, I'll donate.",
+    "Sure, count me in!",
+    "No, I don't want to donate.",
+    "Not interested, stop asking.",
+    "Maybe later, I'm busy right now.",
+    "I'll think about it.",
+    "How does the money get used?",
+    "What exactly do you do?",
+    "No. How do I know this isn't a scam?",
+    "This is terrible and I hate these messages.",
+    "Okay.",
+    "Thanks, have a nice day.",
+    "Is this organisation registered?",
+    "I don't trust charities, they waste money.",
+]
+
+
+def check_invariants(info):
+    if info.is_acceptance:
+        assert info.rejection_type == RejectionType.NONE
+        assert not info.is_curiosity and not info.is_polite_exit
+    if info.rejection_type == RejectionType.CURIOSITY:
+        assert info.is_curiosity and info.sentiment_score >= 0.2
+    if info.is_curiosity and not info.is_acceptance:
+        assert info.rejection_type not in (RejectionType.NONE, RejectionType.AMBIGUOUS)
+    if info.rejection_type == RejectionType.NONE:
+        assert info.sentiment_score >= -0.4
+    if info.rejection_type == RejectionType.SOFT:
+        assert info.sentiment_score >= -0.6
+
+
+def forced(rejection_type, **flags):
+    # A model whose bias alone decides every head
+    model = IntentModel.empty(dim=2 ** 8)
+    model.b[:len(REJECTION_TYPES)] = -5.0
+    model.b[REJECTION_TYPES.index(rejection_type)] = 5.0
+    binary = model.b[BIN_SLICE]
+    binary[:] = -5.0
+    for head, on in flags.items():
+        binary[BINARY_HEADS.index(head)] = 5.0 if on else -5.0
+    return IntentDetector(model)
+
+
+def test_curiosity_flag_sets_curiosity_type():
+    info = forced(RejectionType.NONE, is_curiosity=True).detect("What is this for?")
+    assert info.rejection_type == RejectionType.CURIOSITY
+    assert info.is_curiosity
+    assert info.sentiment_score >= 0.2
+    check_invariants(info)
+
+
+def test_curiosity_type_needs_curiosity_flag():
+    info = forced(RejectionType.CURIOSITY).detect("Hmm.")
+    assert info.rejection_type == RejectionType.NONE
+    check_invariants(info)
+
+
+def test_trained_detector_matches_rule_invariants():
+    rules = RejectionDetector()
+    infos = [rules.detect(m).to_dict() for m in MESSAGES]
+    for m in MESSAGES:
+        check_invariants(rules.detect(m))
+
+    model = train(MESSAGES * 8, infos * 8, epochs=20, dim=2 ** 12)
+    assert evaluate(model, MESSAGES, infos)['rejection_type_acc'] >= 0.9
+
+    detector = IntentDetector(model)
+    probes = MESSAGES + ["Why should I?", "No thanks, but what is it?", "ugh awful"]
+    results = detector.detect_batch(probes)
+    assert [r.to_dict() for r in results] == [detector.detect(m).to_dict() for m in probes]
+    for info in results:
+        check_invariants(info)
+
+    labelled = {m: r for m, r in zip(MESSAGES, results)}
+    assert labelled["Yes, I'll donate."].is_acceptance
+    assert labelled["No, I don't want to donate."].rejection_type == RejectionType.EXPLICIT
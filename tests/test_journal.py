@@ -0,0 +1,97 @@
+import asyncio
+import json
+import time
+
+from src.aggregates import LiveAggregates
+from src.config import Config
+from src.dialogue_manager import DialogueManager
+from src.experiment import DEFAULT_CTX, StandInClient
+from src.journal import Journal
+from src.response_pool import ResponsePool
+
+
+MESSAGES = ["Tell me more.", "I'm not sure, how do I know it's legit?", "Hmm, okay.", "What does it fund?"]
+
+
+def state(dm):
+    return {
+        'turn': dm.turn,
+        'belief': dm.belief.get(),
+        'trust': dm.trust.get(),
+        'recovery': dm.trust.recovery_mode,
+        'weights': list(dm.strategy._w),
+        'consec_reject': dm.guard.consec_reject,
+        'active': dm.active,
+        'history': dm.history_dicts(),
+        'memory': dm.agent.conversation_memory,
+    }
+
+
+def started(journal, **kwargs):
+    dm = DialogueManager('C3', DEFAULT_CTX, StandInClient(DEFAULT_CTX), seed=7, journal=journal, **kwargs)
+    dm.start()
+    return dm
+
+
+def test_recover_rebuilds_unsaved_sessions(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = Journal(path)
+
+    live = started(journal)
+    for msg in MESSAGES:
+        live.process(msg)
+    finished = started(journal)
+    finished.process("Yes, I'll donate!")
+    assert not finished.active
+    finished.save()
+
+    # Crash mid-write: the last record is torn
+    with open(path, 'ab') as f:
+        f.write(b'{"t": "turn", "jid": "')
+
+    pool = ResponsePool(DEFAULT_CTX)
+    recovered = Journal(path).recover(pool_for=lambda ctx: pool, client=StandInClient(DEFAULT_CTX))
+    assert set(recovered) == {live.session_id}
+
+    dm = recovered[live.session_id]
+    assert state(dm) == state(live)
+    assert dm.journal_id == live.journal_id
+    assert dm.agent.pool is pool
+
+    # The recovered session keeps journaling where it left off
+    dm.process("Sounds good.")
+    again = Journal(path).recover(client=StandInClient(DEFAULT_CTX))
+    assert state(again[live.session_id]) == state(dm)
+
+
+def test_retire_sessions_saves_under_lock_and_drops_idle(backend, tmp_path, monkeypatch):
+    journal = Journal(str(tmp_path / 'notebooks' / 'journal.jsonl'))
+    aggregates = LiveAggregates()
+    monkeypatch.setattr(backend, "journal", journal)
+    monkeypatch.setattr(backend, "aggregates", aggregates)
+
+    fresh, done, idle = (started(journal, aggregates=aggregates) for _ in range(3))
+    done.process("Yes, I'll donate!")
+    idle.process("Tell me more.")
+    idle.last_active = time.monotonic() - Config.SESSION_IDLE_TTL - 1
+    backend.sessions.update({dm.session_id: dm for dm in (fresh, done, idle)})
+
+    async def run():
+        async with backend.session_locks.hold(idle.session_id):
+            task = asyncio.ensure_future(backend.retire_sessions())
+            await asyncio.sleep(0.2)
+            # Waits for the request holding the idle session
+            assert not task.done()
+            assert idle.session_id in backend.sessions
+        await task
+
+    asyncio.run(run())
+
+    assert set(backend.sessions) == {fresh.session_id, done.session_id}
+    with open(tmp_path / 'notebooks' / Config.LOG_FILE) as f:
+        logged = {json.loads(line)['session_id']: json.loads(line)['outcome'] for line in f}
+    assert logged == {done.session_id: done.outcome, idle.session_id: None}
+    assert aggregates.snapshot()['C3']['outcomes']['abandoned'] == 1
+
+    # Only the live session is left in the journal
+    assert set(Journal(journal.path).recover()) == {fresh.session_id}
@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src import llm_client
+from src.llm_client import CircuitBreaker, CircuitOpen, ResilientClient
+
+
+class HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status)
+
+
+class FakeClient:
+    """Plays back a script of results: a value, an exception, or a list (a stream)."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        self.calls += 1
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def broken_stream(chunks, error):
+    yield from chunks
+    raise error
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(llm_client.time, "monotonic", c)
+    monkeypatch.setattr(llm_client.time, "sleep", lambda s: None)
+    return c
+
+
+def make(script, threshold=2, reset=10.0):
+    breaker = CircuitBreaker(failure_threshold=threshold, reset_timeout=reset)
+    return ResilientClient(FakeClient(script), breaker, max_retries=0), breaker
+
+
+def call(client, **kwargs):
+    return client.chat.completions.create(model="m", messages=[], **kwargs)
+
+
+def test_closed_opens_after_threshold_and_short_circuits(clock):
+    client, breaker = make([HTTPError(503), HTTPError(503), "never"])
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            call(client)
+    assert breaker.state == 'open' and breaker.trips == 1
+
+    with pytest.raises(CircuitOpen):
+        call(client)
+    assert client.client.calls == 2
+    assert breaker.short_circuited == 1
+
+
+def test_half_open_probe_success_closes(clock):
+    client, breaker = make([HTTPError(503), HTTPError(503), "ok"])
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            call(client)
+    clock.now += 10.0
+    assert call(client) == "ok"
+    assert breaker.state == 'closed' and breaker.failures == 0
+
+
+def test_half_open_probe_failure_reopens(clock):
+    client, breaker = make([HTTPError(503), HTTPError(503), HTTPError(502)])
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            call(client)
+    clock.now += 10.0
+    with pytest.raises(HTTPError):
+        call(client)
+    assert breaker.state == 'open'
+    assert breaker.opened_at == clock.now
+    with pytest.raises(CircuitOpen):
+        call(client)
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5.0)
+    breaker.record_failure()
+    clock.now += 5.0
+    assert breaker.allow() is True
+    assert breaker.state == 'half_open'
+    assert breaker.allow() is False
+
+
+def test_non_transient_error_does_not_reset_failures(clock):
+    client, breaker = make([HTTPError(503), HTTPError(401), HTTPError(503)], threshold=2)
+    with pytest.raises(HTTPError):
+        call(client)
+    with pytest.raises(HTTPError):
+        call(client)          # 401: caller problem, breaker untouched
+    assert breaker.failures == 1 and breaker.state == 'closed'
+    with pytest.raises(HTTPError):
+        call(client)
+    assert breaker.state == 'open'
+
+
+def test_non_transient_error_in_half_open_keeps_it_half_open(clock):
+    client, breaker = make([HTTPError(503), HTTPError(503), HTTPError(403), "ok"])
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            call(client)
+    clock.now += 10.0
+    with pytest.raises(HTTPError):
+        call(client)
+    assert breaker.state == 'half_open'
+    assert call(client) == "ok"      # the probe slot was released
+    assert breaker.state == 'closed'
+
+
+def test_stream_outcome_recorded_after_consumption(clock):
+    client, breaker = make([["a", "b"]], threshold=1)
+    stream = call(client, stream=True)
+    breaker.record_failure()         # opened while the stream is pending...
+    assert breaker.state == 'open'
+    assert list(stream) == ["a", "b"]
+    assert breaker.state == 'closed'  # ...and closed only once it was read
+
+
+def test_stream_error_mid_stream_counts_as_failure(clock):
+    client, breaker = make([broken_stream(["a"], HTTPError(502))], threshold=1)
+    stream = call(client, stream=True)
+    with pytest.raises(HTTPError):
+        list(stream)
+    assert breaker.state == 'open' and breaker.failures == 1
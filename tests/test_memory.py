@@ -0,0 +1,66 @@
+from src.config import Config
+from src.memory import ConversationMemory, estimate_tokens
+
+
+def _fill(memory, n):
+    for i in range(n):
+        memory.add(f"Is the scheme{i} fee refundable for school program {i}",
+                   f"Yes, receipt{i} covers meals for kids and books")
+
+
+def test_folded_exchanges_keep_their_topics():
+    memory = ConversationMemory(token_budget=60, summary_budget=80)
+    memory.add("Can I get a tax receipt for this?", "Yes, every donation gets an 80G tax receipt")
+    _fill(memory, 12)
+
+    assert memory.folded > 0
+    summary = memory.summary()
+    # The first exchange is long gone from the window and digests,
+    # but its topic is still in the summary
+    assert "tax" not in "".join(u + a for u, a, _ in memory.window)
+    assert "tax" in summary.split("\n")[0]
+    assert f"Topics of {memory.folded} earlier exchange(s)" in summary
+    assert estimate_tokens(summary) <= memory.summary_budget + estimate_tokens(memory.digests[-1][0])
+
+
+def test_topic_line_ranks_repeated_words_first():
+    memory = ConversationMemory(token_budget=30, summary_budget=60)
+    _fill(memory, 20)
+    user_part = memory._topics.split("user - ")[1]
+    assert user_part.startswith("scheme") is False
+    assert user_part.split(", ")[0] in ("fee", "refundable", "school", "program")
+
+
+def test_zero_budget_is_respected():
+    memory = ConversationMemory(token_budget=0)
+    memory.add("first", "reply")
+    memory.add("second", "reply")
+    assert len(memory.window) == 1
+    assert memory.token_budget == 0
+
+
+def test_topics_stay_bounded_over_long_conversations():
+    memory = ConversationMemory(token_budget=60, summary_budget=80)
+    for i in range(2000):
+        memory.add(f"question about word{i} and repeated donation", f"answer on item{i} and repeated donation")
+
+    assert memory.folded > 1900
+    assert len(memory.user_topics) <= Config.SUMMARY_MAX_TOPICS
+    assert len(memory.agent_topics) <= Config.SUMMARY_MAX_TOPICS
+    # Frequent words survive eviction; recent rare ones displace old rare ones
+    assert "repeated" in memory.user_topics
+    assert "word0" not in memory.user_topics
+    assert f"word{memory.folded - 1}" in memory.user_topics
+
+
+def test_oversize_exchange_is_clipped_to_budget():
+    memory = ConversationMemory(token_budget=240)
+    memory.add("please " * 4000, "ok")
+    assert memory.window_tokens <= 240
+    assert estimate_tokens(memory.render()) <= 240 + 10
+    user_msg, agent_msg, _ = memory.window[0]
+    assert user_msg.endswith(" ...") and agent_msg == "ok"
+
+    memory.add("short", "long reply " * 1000)
+    assert memory.window_tokens <= 240
+    assert memory.window[-1][0] == "short"
@@ -0,0 +1,134 @@
+import json
+import multiprocessing
+
+import numpy as np
+
+from src.config import Config
+from src.dialogue_manager import DialogueManager
+from src.experiment import DEFAULT_CTX
+import src.priors as priors
+from src.priors import CONDITIONS, PriorRegistry, StrategyPriors, classify_outcome
+
+
+CTX = {'organization': 'Org', 'cause': 'Cause'}
+OTHER = {'organization': 'Other', 'cause': 'Cause'}
+
+
+def counted(path, key='Org|Cause'):
+    with open(path) as f:
+        return sum(sum(sum(sum(o) for o in s) for s in r) for r in json.load(f)[key]['counts'])
+
+
+def test_shards_sharing_a_file_keep_each_others_counts(tmp_path):
+    path = str(tmp_path / 'priors.json')
+    a, b = PriorRegistry(path), PriorRegistry(path)
+
+    a.for_campaign(CTX).submit('C3', [(0, 0, 0)] * 3)
+    b.for_campaign(CTX).submit('C3', [(0, 1, 2)] * 5)
+    b.for_campaign(OTHER).submit('C2', [(1, 2, 3)])
+    a.persist()
+    b.persist()
+    assert counted(path) == 8
+
+    # Persisting again only adds what is new since the last write
+    a.for_campaign(CTX).submit('C3', [(0, 0, 0)])
+    a.persist()
+    b.persist()
+    assert counted(path) == 9
+    assert counted(path, 'Other|Cause') == 1
+
+    # Each worker picks up the others' counts when it merges
+    assert a.campaigns['Other|Cause'].counts.sum() == 1
+    assert b.campaigns['Org|Cause'].counts.sum() == 8
+    assert PriorRegistry(path).campaigns['Org|Cause'].counts.sum() == 9
+
+
+def _worker(path, n):
+    registry = PriorRegistry(path)
+    for _ in range(n):
+        registry.for_campaign(CTX).submit('C1', [(0, 3, 1)])
+        registry.persist()
+
+
+def test_concurrent_processes_lose_no_counts(tmp_path):
+    path = str(tmp_path / 'priors.json')
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_worker, args=(path, 20)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert counted(path) == 80
+
+
+def info(rtype='none', accept=False, curious=False):
+    return {'rejection_type': rtype, 'is_acceptance': accept, 'is_curiosity': curious}
+
+
+def test_classify_outcome():
+    assert classify_outcome(info(accept=True)) == 0
+    assert classify_outcome(info('curiosity', curious=True)) == 1
+    assert classify_outcome(info('soft', curious=True)) == 1   # curiosity wins
+    assert classify_outcome(info('soft')) == 2
+    assert classify_outcome(info('explicit')) == 3
+    assert classify_outcome(info('ambiguous')) is None
+    assert classify_outcome(info()) is None
+
+
+def priors_with(rows, condition='C3', recovery=0):
+    """rows[strategy] = (accept, curiosity, soft, explicit)"""
+    priors = StrategyPriors('Org|Cause')
+    priors.counts[CONDITIONS.index(condition), recovery] = np.array(rows)
+    return priors
+
+
+def test_too_few_observations_start_uniform():
+    rows = [(5, 0, 0, 0), (0, 0, 0, 5), (2, 0, 0, 0), (0, 0, 0, 0), (0, 0, 0, 0)]
+    assert sum(map(sum, rows)) < Config.PRIOR_MIN_OBSERVATIONS
+    priors = priors_with(rows)
+    assert priors.initial_weights('C3') is None
+    assert priors.initial_weights('C3', in_recovery=True) is None
+    assert priors.initial_weights('C4') is None
+
+
+def test_laplace_smoothed_success_rates():
+    rows = [(6, 2, 2, 0), (3, 0, 3, 4), (5, 0, 0, 5), (2, 4, 2, 2), (4, 0, 4, 2)]
+    w = priors_with(rows).initial_weights('C3')
+
+    rate = np.array([(a + 0.5 * c + 1.0) / (a + c + s + e + 2.0) for a, c, s, e in rows])
+    assert np.allclose(w, rate / rate.sum())
+    assert w.argmax() == 0 and np.isclose(w.sum(), 1.0)
+
+
+def test_floor_survives_normalization():
+    rows = [(200, 0, 0, 0), (0, 0, 0, 60), (0, 0, 0, 60), (0, 0, 0, 60), (0, 0, 0, 60)]
+    w = priors_with(rows).initial_weights('C3')
+    assert np.isclose(w.sum(), 1.0)
+    assert w.min() >= Config.MIN_STRATEGY_WEIGHT - 1e-12
+    assert np.allclose(w[1:], Config.MIN_STRATEGY_WEIGHT)
+
+
+def test_new_sessions_warm_start_only_in_adaptive_conditions():
+    rows = [(30, 0, 0, 0), (0, 0, 10, 0), (0, 0, 10, 0), (0, 0, 10, 0), (0, 0, 10, 0)]
+    priors = StrategyPriors('Org|Cause')
+    for cond in CONDITIONS:
+        priors.counts[CONDITIONS.index(cond), 0] = np.array(rows)
+    expected = priors.initial_weights('C3')
+
+    uniform = np.full(len(Config.STRATEGIES), 1.0 / len(Config.STRATEGIES))
+    assert np.allclose(DialogueManager('C1', DEFAULT_CTX, priors=priors).strategy._w, uniform)
+    for cond in ('C2', 'C3'):
+        assert np.allclose(DialogueManager(cond, DEFAULT_CTX, priors=priors).strategy._w, expected)
+    assert np.allclose(DialogueManager('C3', DEFAULT_CTX).strategy._w, uniform)
+
+
+def test_persist_registry_writes_what_the_process_gathered(tmp_path, monkeypatch):
+    # Pre-forked workers leave through os._exit, which skips atexit
+    monkeypatch.setattr(priors, "_registry", None)
+    priors.persist_registry()   # nothing made, nothing to write
+
+    path = str(tmp_path / 'priors.json')
+    monkeypatch.setattr(priors, "_registry", PriorRegistry(path))
+    priors._registry.for_campaign(CTX).submit('C2', [(1, 2, 0)] * 4)
+    priors.persist_registry()
+    assert PriorRegistry(path).campaigns['Org|Cause'].counts.sum() == 4
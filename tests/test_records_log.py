@@ -0,0 +1,68 @@
+import json
+from enum import Enum
+
+import pytest
+
+from src.dialogue_manager import DialogueManager
+from src.experiment import DEFAULT_CTX, StandInClient
+from src.serialization import dumps, loads
+
+# Field order of the plain rejection_info dict the records replaced
+INFO_FIELDS = ('rejection_type', 'rejection_confidence', 'trust_concern', 'sentiment_score',
+               'sentiment_label', 'is_acceptance', 'is_curiosity', 'is_polite_exit')
+
+SCRIPT = [
+    "Hi, what does your organization do?",
+    "Hmm, I'm not sure. How do I know the money is used well?",
+    "That sounds like a scam honestly",
+    "Maybe later, I'm busy right now",
+    "Okay, tell me about the impact",
+]
+
+
+def _plain(v):
+    return v.value if isinstance(v, Enum) else v
+
+
+def legacy_history(history):
+    """The history exactly as the plain-dict implementation built it."""
+    out = []
+    for h in history:
+        if h.speaker == 'user':
+            out.append({'turn': h.turn, 'speaker': 'user', 'msg': h.msg,
+                        'info': {k: _plain(getattr(h.info, k)) for k in INFO_FIELDS}})
+        else:
+            out.append({'turn': h.turn, 'speaker': 'agent', 'msg': h.msg, 'strategy': _plain(h.strategy)})
+    return out
+
+
+@pytest.mark.parametrize("condition", ["C1", "C3"])
+def test_saved_log_bytes_match_plain_dict_log(condition, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dm = DialogueManager(condition, DEFAULT_CTX, StandInClient(DEFAULT_CTX), seed=5, speculative=False)
+    dm.start()
+    for msg in SCRIPT:
+        if dm.process(msg)['stop']:
+            break
+    dm.save()
+
+    written = (tmp_path / "notebooks" / "dialogue_log.jsonl").read_bytes()
+    assert written.count(b'\n') == 1
+    saved = loads(written)
+
+    legacy = {
+        'session_id': dm.session_id,
+        'condition': condition,
+        'timestamp': saved['timestamp'],
+        'context': DEFAULT_CTX,
+        'history': legacy_history(dm.history),
+        'final_belief': dm.belief.get(),
+        'final_trust': dm.trust.get(),
+        'turns': dm.turn,
+        'outcome': dm.outcome
+    }
+    assert written == dumps(legacy) + b'\n'
+
+    # Same through the stdlib encoder (serialization fallback, API payloads)
+    assert json.dumps(dm.history_dicts()) == json.dumps(legacy['history'])
+    assert all(type(h['speaker']) is str for h in saved['history'])
@@ -0,0 +1,73 @@
+import re
+
+from src.config import Config
+from src.dialogue_manager import DialogueManager
+from src.experiment import DEFAULT_CTX, StandInClient
+from src.rejection_detector import RejectionDetector
+from src.replay import replay_session
+
+
+MESSAGES = ["Tell me about the program", "Maybe later, I'm busy", "What do the amounts cover?", "Hmm, okay"]
+
+
+def logged_session(condition='C3', messages=MESSAGES):
+    dm = DialogueManager(condition, DEFAULT_CTX, StandInClient(DEFAULT_CTX), seed=3, speculative=False)
+    dm.start()
+    for msg in messages:
+        if dm.process(msg)['stop']:
+            break
+    return {
+        'session_id': dm.session_id, 'condition': dm.condition, 'context': dm.ctx,
+        'history': dm.history_dicts(), 'final_belief': dm.belief.get(),
+        'final_trust': dm.trust.get(), 'turns': dm.turn, 'outcome': dm.outcome
+    }
+
+
+def fields(result):
+    return {d['field'] for d in result['divergences']}
+
+
+def test_unchanged_code_replays_cleanly():
+    for condition in ('C1', 'C2', 'C3'):
+        result = replay_session(logged_session(condition))
+        assert result['divergences'] == []
+        assert result['turns'] == len(MESSAGES)
+
+
+def test_changed_learning_rate_diverges_on_final_belief(monkeypatch):
+    log = logged_session()
+    monkeypatch.setattr(Config, "ALPHA", Config.ALPHA * 2)
+    result = replay_session(log)
+
+    assert fields(result) == {'final_belief'}
+    (d,) = result['divergences']
+    assert d['logged'] == log['final_belief'] and d['replayed'] != d['logged']
+
+
+def test_changed_detector_pattern_diverges_on_rejection_info(monkeypatch):
+    log = logged_session()
+    logged = next(h['info'] for h in log['history'] if h['msg'] == MESSAGES[1])
+    assert logged['rejection_type'] == 'soft'
+
+    monkeypatch.setattr(RejectionDetector, "SOFT_RE", re.compile(r"(?!x)x"))
+    result = replay_session(log)
+
+    by_field = {d['field']: d for d in result['divergences'] if d['turn'] == 2}
+    assert by_field['rejection_type']['logged'] == 'soft'
+    assert by_field['rejection_type']['replayed'] != 'soft'
+    assert by_field['rejection_confidence']['logged'] == logged['rejection_confidence']
+    assert 'final_belief' in fields(result)
+
+
+def test_replay_that_stops_early_is_reported(monkeypatch):
+    log = logged_session()
+    assert log['outcome'] is None
+
+    # "Maybe later" now reads as acceptance, ending the session on turn 2
+    monkeypatch.setattr(RejectionDetector, "ACCEPTANCE_RE", re.compile(r"maybe", re.IGNORECASE))
+    result = replay_session(log)
+
+    assert result['turns'] == 2
+    stopped = [d for d in result['divergences'] if d['field'] == 'stopped_early']
+    assert stopped == [{'turn': 2, 'field': 'stopped_early', 'logged': None, 'replayed': 'User accepted'}]
+    assert any(d['field'] == 'is_acceptance' and d['turn'] == 2 for d in result['divergences'])
@@ -0,0 +1,57 @@
+from src.experiment import DEFAULT_CTX, StandInClient
+from src.llm_agent import LLMAgent
+from src.records import SentimentLabel, Strategy
+from src.response_pool import SAMPLE_MESSAGES, PoolRegistry, ResponsePool, pool_key, slot_key
+
+
+class RecordingClient(StandInClient):
+    def __init__(self, donation_ctx):
+        super().__init__(donation_ctx)
+        self.prompts = []
+
+    def create(self, messages, **kwargs):
+        self.prompts.append(messages[-1]['content'])
+        return super().create(messages, **kwargs)
+
+
+class FailingClient(StandInClient):
+    def create(self, messages, **kwargs):
+        raise ConnectionError("endpoint down")
+
+
+def test_pool_is_keyed_by_every_quoted_field():
+    registry = PoolRegistry()
+    base = registry.for_campaign(DEFAULT_CTX)
+    assert registry.for_campaign(dict(DEFAULT_CTX)) is base
+    for field in ('impact', 'amounts'):
+        other = dict(DEFAULT_CTX, **{field: "something else"})
+        assert pool_key(other) != pool_key(DEFAULT_CTX)
+        assert registry.for_campaign(other) is not base
+
+
+def test_filled_reply_saw_the_live_turn_one_prompt():
+    client = RecordingClient(DEFAULT_CTX)
+    pool = ResponsePool(DEFAULT_CTX)
+    key = slot_key(Strategy.Impact, SentimentLabel.NEUTRAL, False)
+    assert pool.fill(key, client)
+
+    live = LLMAgent(DEFAULT_CTX, client=client)
+    msg = SAMPLE_MESSAGES[SentimentLabel.NEUTRAL]
+    assert client.prompts == [live.build_prompt(Strategy.Impact, msg, 1, False, SentimentLabel.NEUTRAL)]
+
+    pooled = pool.slots[key][0]
+    assert pool.take(Strategy.Impact, "Hmm, okay.", 2, False, SentimentLabel.NEUTRAL) is None
+    assert pool.take(Strategy.Impact, "What is it?", 1, False, SentimentLabel.NEUTRAL) is None
+    assert pool.take(Strategy.Impact, "Hmm, okay.", 1, False, SentimentLabel.NEUTRAL) == pooled
+
+
+def test_failed_generation_is_not_pooled():
+    pool = ResponsePool(DEFAULT_CTX)
+    key = slot_key(None, SentimentLabel.NEGATIVE, True)
+    assert not pool.fill(key, FailingClient(DEFAULT_CTX))
+    assert pool.snapshot()['pooled'] == 0
+
+    agent = LLMAgent(DEFAULT_CTX, client=FailingClient(DEFAULT_CTX))
+    prompt = agent.build_prompt(Strategy.Empathy, "Okay.", 1, True, SentimentLabel.NEGATIVE)
+    assert agent.complete(prompt, Strategy.Empathy, True, fallback=False) is None
+    assert agent.complete(prompt, Strategy.Empathy, True) == agent._fallback(Strategy.Empathy, True)
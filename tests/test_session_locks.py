@@ -0,0 +1,89 @@
+import asyncio
+
+from src.session_locks import SessionLocks
+
+
+def test_same_session_runs_in_arrival_order():
+    locks = SessionLocks()
+    order = []
+
+    async def request(i):
+        async with locks.hold("s"):
+            order.append(i)
+            await asyncio.sleep(0.001 * (5 - i % 5))   # later arrivals finish faster
+
+    async def run():
+        tasks = []
+        for i in range(20):
+            tasks.append(asyncio.ensure_future(request(i)))
+            await asyncio.sleep(0)   # task i reaches the lock before task i + 1 exists
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == list(range(20))
+    assert locks.contended == 19
+    assert locks.snapshot()['locked_sessions'] == 0
+
+
+def test_other_sessions_do_not_wait():
+    locks = SessionLocks()
+
+    async def run():
+        async with locks.hold("a"):
+            await asyncio.wait_for(_hold_briefly(locks, "b"), timeout=1.0)
+
+    asyncio.run(run())
+    assert locks.contended == 0
+
+
+async def _hold_briefly(locks, session_id):
+    async with locks.hold(session_id):
+        await asyncio.sleep(0)
+
+
+def test_hold_many_with_overlapping_batches_does_not_deadlock():
+    locks = SessionLocks()
+    ids = [f"s{i}" for i in range(8)]
+    done = []
+
+    async def batch(name, session_ids):
+        async with locks.hold_many(session_ids):
+            await asyncio.sleep(0.001)
+            done.append(name)
+
+    async def single(session_id):
+        async with locks.hold(session_id):
+            await asyncio.sleep(0.001)
+            done.append(session_id)
+
+    async def run():
+        # Same sessions in opposite orders, plus duplicates and single requests
+        jobs = [batch("fwd", ids), batch("rev", list(reversed(ids))), batch("dup", ids[2:5] * 2)]
+        jobs += [single(sid) for sid in ids]
+        await asyncio.wait_for(asyncio.gather(*jobs), timeout=5.0)
+
+    asyncio.run(run())
+    assert sorted(done) == sorted(["fwd", "rev", "dup"] + ids)
+    assert locks.snapshot()['locked_sessions'] == 0
+
+
+def test_hold_many_releases_on_cancel():
+    locks = SessionLocks()
+
+    async def run():
+        async with locks.hold("b"):
+            waiter = asyncio.ensure_future(_hold_many_forever(locks, ["a", "b", "c"]))
+            await asyncio.sleep(0.01)
+            # Holding "a", waiting for "b"
+            assert locks.snapshot()['locked_sessions'] == 3
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.wait_for(_hold_briefly(locks, "a"), timeout=1.0)
+
+    asyncio.run(run())
+    assert locks.snapshot()['locked_sessions'] == 0
+
+
+async def _hold_many_forever(locks, session_ids):
+    async with locks.hold_many(session_ids):
+        await asyncio.sleep(3600)
@@ -0,0 +1,152 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src import speculation
+from src.config import Config
+from src.dialogue_manager import DialogueManager
+from src.experiment import DEFAULT_CTX, StandInClient
+from src.replay import replay_session
+
+
+@pytest.fixture
+def no_capacity():
+    speculation.set_capacity(lambda: 0)
+    yield
+    speculation.set_capacity(None)
+
+
+def _logged_session():
+    dm = DialogueManager('C3', DEFAULT_CTX, StandInClient(DEFAULT_CTX), seed=2, speculative=False)
+    dm.start()
+    for msg in ["Tell me about the program", "Hmm, maybe", "What do the amounts cover?"]:
+        if dm.process(msg)['stop']:
+            break
+    return {
+        'condition': dm.condition, 'context': dm.ctx, 'history': dm.history_dicts(),
+        'final_belief': dm.belief.get(), 'final_trust': dm.trust.get(),
+        'turns': dm.turn, 'outcome': dm.outcome
+    }
+
+
+def test_replay_works_with_speculation_enabled(monkeypatch):
+    log = _logged_session()
+    monkeypatch.setattr(Config, "SPECULATIVE_GENERATION", True)
+    result = replay_session(log)
+    assert result['divergences'] == []
+
+
+def test_no_speculation_without_idle_capacity(no_capacity):
+    dm = DialogueManager('C1', DEFAULT_CTX, StandInClient(DEFAULT_CTX), speculative=True)
+    dm.start()
+    started, skipped = speculation.stats.started, speculation.stats.skipped
+    dm.process("Tell me more about it")
+    assert speculation.stats.started == started
+    assert speculation.stats.skipped == skipped + 1
+
+
+def test_running_speculation_counts_against_capacity():
+    speculation.set_capacity(lambda: 1)
+    try:
+        dm = DialogueManager('C1', DEFAULT_CTX, StandInClient(DEFAULT_CTX, latency=0.2), speculative=True)
+        dm.start()
+        spec = dm._speculate("Tell me more")
+        assert spec is not None and speculation.stats.running >= 1
+        assert not speculation.has_capacity()
+        spec[1].result()
+        deadline = time.monotonic() + 1.0   # done-callbacks run just after result()
+        while not speculation.has_capacity() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert speculation.has_capacity()
+    finally:
+        speculation.set_capacity(None)
+
+
+class RecordingClient(StandInClient):
+    """Stand-in LLM that records every (prompt, reply) it served."""
+
+    def __init__(self):
+        super().__init__(DEFAULT_CTX)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def create(self, messages, **kwargs):
+        response = super().create(messages, **kwargs)
+        with self._lock:
+            self.calls.append((messages[-1]['content'], response.choices[0].message.content))
+        return response
+
+
+@pytest.fixture
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(speculation, "stats", speculation.SpeculationStats())
+    return speculation.stats
+
+
+def settle(client, n):
+    # A cancelled speculation that already started still finishes upstream
+    deadline = time.monotonic() + 1.0
+    while len(client.calls) < n and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_hit_reuses_the_speculative_reply(fresh_stats):
+    client = RecordingClient()
+    dm = DialogueManager('C1', DEFAULT_CTX, client, seed=1, speculative=True)
+    dm.start()
+    result = dm.process("Go on")
+
+    assert fresh_stats.snapshot()['hits'] == 1
+    assert len(client.calls) == 1   # no second LLM call
+    prompt, reply = client.calls[0]
+    assert "YOUR STRATEGY: Empathy" in prompt
+    assert result['agent_msg'] == reply
+    assert dm.agent.conversation_memory[-1] == {'user': "Go on", 'agent': reply}
+
+
+def test_miss_reissues_with_the_final_plan(fresh_stats):
+    client = RecordingClient()
+    dm = DialogueManager('C3', DEFAULT_CTX, client, seed=1, speculative=True)
+    dm.start()
+    dm.strategy._w = np.array([0.05, 0.8, 0.05, 0.05, 0.05])   # Impact clearly dominant
+
+    result = dm.process("I hate this, it is terrible")   # predicted neutral, actually negative
+    settle(client, 2)
+
+    assert fresh_stats.snapshot()['misses'] == 1
+    assert len(client.calls) == 2
+    speculative = [p for p, _ in client.calls if "User seems: neutral" in p]
+    final = [(p, r) for p, r in client.calls if "User seems: negative" in p]
+    assert len(speculative) == 1 and "YOUR STRATEGY: Impact" in speculative[0]
+    assert len(final) == 1
+    assert result['agent_msg'] == final[0][1]
+    assert dm.agent.conversation_memory[-1]['agent'] == final[0][1]
+
+
+def test_stop_turn_discards_the_speculation(fresh_stats):
+    client = RecordingClient()
+    dm = DialogueManager('C1', DEFAULT_CTX, client, seed=1, speculative=True)
+    dm.start()
+    result = dm.process("Yes, I will donate!")
+    settle(client, 1)
+
+    snap = fresh_stats.snapshot()
+    assert result['stop'] and snap['discarded'] == 1
+    assert snap['hits'] == snap['misses'] == 0 and snap['hit_rate'] is None
+    assert all(h.msg != reply for h in dm.history for _, reply in client.calls)
+    assert len(dm.agent.conversation_memory) == 0
+
+
+def test_hit_rate_counts_hits_over_resolved(fresh_stats):
+    client = RecordingClient()
+    dm = DialogueManager('C1', DEFAULT_CTX, client, seed=1, speculative=True)
+    dm.start()
+    dm.process("Go on")                          # hit
+    dm.process("I hate this, it is terrible")    # miss: sentiment changed
+    dm.process("Go on")                          # miss: predicted negative from last turn
+
+    snap = fresh_stats.snapshot()
+    assert (snap['started'], snap['hits'], snap['misses']) == (3, 1, 2)
+    assert snap['hit_rate'] == round(1 / 3, 3)
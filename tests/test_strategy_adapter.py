@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.config import Config
+from src.strategy_adapter import StrategyAdapter
+
+
+def legacy_select(weights, in_recovery, rs):
+    # Selection as it was before the array-backed adapter
+    if in_recovery:
+        available = {s: weights[s] for s in StrategyAdapter.RECOVERY_ALLOWED if s in weights}
+    else:
+        available = dict(weights)
+    strats = list(available.keys())
+    wts = list(available.values())
+    total = sum(wts)
+    wts = [1.0 / len(strats)] * len(strats) if total == 0 else [w / total for w in wts]
+    return rs.choice(strats, p=wts)
+
+
+CASES = [
+    ([0.2, 0.2, 0.2, 0.2, 0.2], False),
+    ([0.55, 0.05, 0.1, 0.25, 0.05], False),
+    ([0.55, 0.05, 0.1, 0.25, 0.05], True),
+    ([0.05, 0.4, 0.3, 0.2, 0.05], True),
+    ([0.0, 0.5, 0.5, 0.0, 0.0], True),   # nothing allowed has weight: uniform over allowed
+]
+
+
+@pytest.mark.parametrize("weights,in_recovery", CASES)
+def test_select_matches_legacy_distribution(weights, in_recovery):
+    n = 20_000
+    adapter = StrategyAdapter(seed=7, initial_weights=weights)
+    new = [adapter.select(in_recovery) for _ in range(n)]
+
+    rs = np.random.RandomState(7)
+    wdict = dict(zip(Config.STRATEGIES, weights))
+    old = [legacy_select(wdict, in_recovery, rs) for _ in range(n)]
+
+    for s in Config.STRATEGIES:
+        p_new = new.count(s) / n
+        p_old = old.count(s) / n
+        # Two-sample difference of proportions, ~5 standard errors
+        se = np.sqrt(max(p_old * (1 - p_old), 1e-12) * 2 / n)
+        assert abs(p_new - p_old) <= 5 * se + 1e-9, (s, p_new, p_old)
+        if p_old == 0:
+            assert p_new == 0, s
+
+
+def test_recovery_never_picks_forbidden_strategies():
+    adapter = StrategyAdapter(seed=3, initial_weights=[0.01, 0.9, 0.03, 0.01, 0.05])
+    picks = {adapter.select(True) for _ in range(2000)}
+    assert picks <= StrategyAdapter.RECOVERY_ALLOWED
+
+
+def test_same_seed_same_sequence():
+    a = StrategyAdapter(seed=11)
+    b = StrategyAdapter(seed=11)
+    assert [a.select(False) for _ in range(50)] == [b.select(False) for _ in range(50)]
+    assert a.count == b.count
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from src.experiment import DEFAULT_CTX, StandInClient
+
+
+def _session(client):
+    r = client.post("/api/session/create", json={"condition": "C3", "donation_context": DEFAULT_CTX})
+    assert r.status_code == 200
+    return r.json()["session_id"]
+
+
+def test_bad_frames_get_error_frames_and_keep_the_socket(backend):
+    client = TestClient(backend.app)
+    sid = _session(client)
+    with client.websocket_connect(f"/ws/session/{sid}") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "status": 400, "detail": "Frames must be JSON objects"}
+        ws.send_json([1, 2, 3])
+        assert ws.receive_json()["status"] == 400
+        ws.send_bytes(b"\xff\x00")
+        assert ws.receive_json()["status"] == 400
+        ws.send_json({"type": "message", "message": 42})
+        assert ws.receive_json()["status"] == 400
+
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+        ws.send_json({"type": "message", "message": "Tell me about the program"})
+        reply = ws.receive_json()
+        assert reply["type"] == "reply" and reply["metrics"]["turn"] == 1
+
+
+def test_unknown_session_closes_with_4404(backend):
+    client = TestClient(backend.app)
+    with client.websocket_connect("/ws/session/sess_missing") as ws:
+        assert ws.receive_json()["status"] == 404
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+        assert exc.value.code == 4404
+
+
+async def dropped_send(payload):
+    raise WebSocketDisconnect(1006)
+
+
+class SlowManager:
+    def __init__(self):
+        self.finished = threading.Event()
+
+    def process(self, message, on_delta):
+        on_delta("partial")
+        time.sleep(0.2)
+        self.finished.set()
+        return {"agent_msg": "done"}
+
+
+def test_dropped_stream_waits_for_the_turn(backend):
+    dm = SlowManager()
+
+    async def run():
+        with pytest.raises(WebSocketDisconnect):
+            await backend._process_streaming(dm, "hi", dropped_send)
+        # Only returns once dm.process is done, so the session lock is still held until then
+        return dm.finished.is_set()
+
+    assert asyncio.run(run()) is True
+
+
+def test_pings_are_answered_while_a_turn_runs(backend, monkeypatch):
+    monkeypatch.setattr(backend, "hf_client", StandInClient(DEFAULT_CTX, latency=0.5))
+    client = TestClient(backend.app)
+    sid = _session(client)
+    with client.websocket_connect(f"/ws/session/{sid}") as ws:
+        ws.send_json({"type": "message", "message": "Tell me about the program"})
+        time.sleep(0.1)   # the turn is now waiting on the LLM
+        start = time.monotonic()
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+        assert time.monotonic() - start < 0.3
+
+        reply = ws.receive_json()
+        assert reply["type"] == "reply" and reply["metrics"]["turn"] == 1
+
+        # Queued turns still run one at a time, in order
+        ws.send_json({"type": "message", "message": "Hmm, okay"})
+        ws.send_json({"type": "message", "message": "What does it fund?"})
+        assert [ws.receive_json()["metrics"]["turn"] for _ in range(2)] == [2, 3]
+
+
+def test_disconnect_during_a_turn_finishes_it(backend, monkeypatch):
+    monkeypatch.setattr(backend, "hf_client", StandInClient(DEFAULT_CTX, latency=0.3))
+    client = TestClient(backend.app)
+    sid = _session(client)
+    with client.websocket_connect(f"/ws/session/{sid}") as ws:
+        ws.send_json({"type": "message", "message": "Tell me about the program"})
+        time.sleep(0.1)
+    deadline = time.monotonic() + 2.0
+    while backend.sessions[sid].turn < 1 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert backend.sessions[sid].turn == 1
+    assert backend.session_locks.snapshot()['locked_sessions'] == 0
+
+
+@pytest.fixture
+def stub_worker():
+    # A bare websockets server standing in for a worker: echoes frames as
+    # they came, and closes with 4404 on "bye"
+    import websockets
+
+    async def handler(conn):
+        async for frame in conn:
+            if frame == "bye":
+                await conn.close(4404, "Session not found")
+                return
+            await conn.send(frame)
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    async def serve():
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            state["port"] = server.sockets[0].getsockname()[1]
+            state["stop"] = loop.create_future()
+            ready.set()
+            await state["stop"]
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(serve(),), daemon=True)
+    thread.start()
+    ready.wait(5)
+    yield f"http://127.0.0.1:{state['port']}"
+    loop.call_soon_threadsafe(state["stop"].set_result, None)
+    thread.join(5)
+    loop.close()
+
+
+def test_router_relays_text_bytes_and_the_close_code(stub_worker, monkeypatch):
+    import backend.router as router
+
+    monkeypatch.setattr(router, "WORKERS", [stub_worker])
+    with TestClient(router.app).websocket_connect("/ws/session/sess_any") as ws:
+        ws.send_text("hello")
+        assert ws.receive_text() == "hello"
+        ws.send_bytes(b"\xff\x00")
+        assert ws.receive_bytes() == b"\xff\x00"
+
+        ws.send_text("bye")
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_text()
+        assert exc.value.code == 4404
+        assert exc.value.reason == "Session not found"
@@ -0,0 +1,69 @@
+"""
+Train the learned intent classifier (detector backend 'learned')
+
+Reads labelled user turns (message + rejection_info) from one or more
+dialogue logs, fits the hashed n-gram linear model, reports held-out
+accuracy per head and writes notebooks/intent_model.npz.
+
+Usage:
+  python train_intent_classifier.py [--log notebooks/dialogue_log.jsonl ...] [--epochs 8] [--out notebooks/intent_model.npz]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from src.config import Config
+from src.intent_classifier import evaluate, train
+
+
+def load_turns(paths):
+    msgs, infos = [], []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                for h in json.loads(line).get('history', []):
+                    if h.get('speaker') == 'user' and h.get('info'):
+                        msgs.append(h['msg'])
+                        infos.append(h['info'])
+    return msgs, infos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the hashed n-gram intent classifier")
+    parser.add_argument("--log", nargs="+", default=[os.path.join("notebooks", Config.LOG_FILE)])
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--lr", type=float, default=0.5)
+    parser.add_argument("--holdout", type=float, default=0.1, help="fraction of turns held out for evaluation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=os.path.join("notebooks", Config.INTENT_MODEL_FILE))
+    args = parser.parse_args()
+
+    for path in args.log:
+        if not os.path.exists(path):
+            print(f"Log file not found: {path}")
+            sys.exit(1)
+
+    msgs, infos = load_turns(args.log)
+    if not msgs:
+        print("No labelled user turns found")
+        sys.exit(1)
+
+    order = np.random.default_rng(args.seed).permutation(len(msgs))
+    n_test = int(len(msgs) * args.holdout)
+    test, fit = order[:n_test], order[n_test:]
+    print(f"Training on {len(fit)} turns, evaluating on {len(test)}")
+
+    model = train([msgs[i] for i in fit], [infos[i] for i in fit], epochs=args.epochs, lr=args.lr, seed=args.seed)
+    if n_test:
+        print(json.dumps(evaluate(model, [msgs[i] for i in test], [infos[i] for i in test]), indent=2))
+
+    model.save(args.out)
+    print(f"✓ Model written to {args.out}")